@@ -9,8 +9,40 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.core.handlers.asgi import ASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+# URLconf có thêm các view bất đồng bộ; chỉ dùng trong tiến trình ASGI
+ASGI_URLCONF = 'config.asgi_urls'
+
+
+class LearningASGIHandler(ASGIHandler):
+    """ASGIHandler của Django, dùng URLconf của ASGI cho mọi request."""
+
+    async def get_response_async(self, request):
+        request.urlconf = ASGI_URLCONF
+        return await super().get_response_async(request)
+
+
+django.setup(set_prefix=False)
+django_application = LearningASGIHandler()
+
+
+async def lifespan(receive, send):
+    """Giao thức lifespan của ASGI: không có tài nguyên riêng nào cần mở hay đóng, chỉ xác nhận."""
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    # Django không xử lý giao thức lifespan (ASGIHandler báo lỗi với scope 'lifespan')
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    return await django_application(scope, receive, send)
@@ -0,0 +1,11 @@
+"""
+URLconf của tiến trình ASGI (config/asgi.py): toàn bộ URL của config/urls.py cùng các view
+bất đồng bộ (learning/async_urls.py), vốn không được mount dưới WSGI.
+"""
+from django.urls import include, path
+from .urls import urlpatterns as wsgi_urlpatterns
+
+urlpatterns = [
+    path('', include('learning.async_urls')),
+    *wsgi_urlpatterns,
+]
@@ -1,8 +1,6 @@
 from pathlib import Path
 from decouple import config 
 from datetime import timedelta
-# THIẾT YẾU: Cần import mongoengine để sử dụng MONGOENGINE_DATABASES
-import mongoengine 
 
 # --- CẤU HÌNH CƠ BẢN ---
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -59,6 +57,16 @@ DISABLE_AUTH_PERMISSIONS = True
 
 
 MIDDLEWARE = [
+    # Kết nối MongoDB thuộc về tiến trình hiện tại (phát hiện fork qua PID, learning/connection.py)
+    'learning.connection.ConnectionMiddleware',
+
+    # Số đo Prometheus theo URL (learning/metrics.py, xem /metrics)
+    'learning.metrics.PrometheusMiddleware',
+
+    # 0. Đo lệnh MongoDB của mỗi request: Server-Timing + log (đặt trước các middleware của Django để tính
+    #    cả lệnh của session/auth; hai middleware phía trên không gửi lệnh MongoDB nào)
+    'learning.db_instrumentation.MongoTimingMiddleware',
+
     # 1. Django Security
     'django.middleware.security.SecurityMiddleware',
     
@@ -102,7 +110,7 @@ TEMPLATES = [
 WSGI_APPLICATION = 'config.wsgi.application'
 
 
-# Database (Vẫn giữ SQLite cho Django Sessions và Admin)
+# Database (Vẫn giữ SQLite cho Admin; Sessions đã chuyển sang MongoDB, xem SESSION_ENGINE)
 
 DATABASES = {
     'default': {
@@ -118,26 +126,20 @@ MONGOENGINE_DATABASES = {
     }
 }
 
-# --- DEBUGGING: BẮT BUỘC THỰC HIỆN KẾT NỐI SỚM ĐỂ BẮT LỖI ---
-# Dùng thư viện mongoengine trực tiếp để kết nối và kiểm tra URI.
-if MONGO_URI:
-    try:
-        # Tên database thường là phần cuối cùng của chuỗi URI trước dấu '?'
-        db_name = MONGO_URI.split('/')[-1].split('?')[0]
-        # Sử dụng connect() để buộc kiểm tra kết nối ngay khi file settings được đọc
-        mongoengine.connect(host=MONGO_URI, db=db_name)
-        print(f"✅ Kết nối MongoDB thành công với DB: {db_name}")
-    except Exception as e:
-        # Nếu DEBUG=True, ta cho phép nó crash để thấy lỗi chi tiết
-        if DEBUG:
-            raise Exception(f"LỖI KHỞI TẠO MONGODB (LOCAL/DEV): {e}") 
-        # Nếu DEBUG=False (Production), ta ghi log và không làm crash máy chủ ngay lập tức
-        # nhưng lỗi này sẽ xuất hiện rõ ràng trong log Render.
-        else:
-            print(f"❌ LỖI KẾT NỐI MONGODB (RENDER/PROD): Vui lòng kiểm tra MONGO_URI và Network Access. Lỗi: {e}")
-# -------------------------------------------------------------
+# Kết nối MongoDB được đăng ký trong LearningConfig.ready() và chỉ mở ở lần truy vấn đầu tiên của
+# mỗi tiến trình (learning/connection.py), không mở khi đọc settings (trước khi Gunicorn fork worker).
+MONGO_MAX_POOL_SIZE = config('MONGO_MAX_POOL_SIZE', default=50, cast=int)
+# Số kết nối pymongo giữ sẵn trong pool của mỗi worker
+MONGO_MIN_POOL_SIZE = config('MONGO_MIN_POOL_SIZE', default=2, cast=int)
+MONGO_SERVER_SELECTION_TIMEOUT_MS = config('MONGO_SERVER_SELECTION_TIMEOUT_MS', default=5000, cast=int)
+MONGO_READ_PREFERENCE = config('MONGO_READ_PREFERENCE', default='secondaryPreferred')
+# Thời gian (giây) dùng lại kết quả ping của /health/ready/
+READINESS_CACHE_SECONDS = config('READINESS_CACHE_SECONDS', default=5, cast=int)
 
 
+# Session lưu trong MongoDB (TTL index), không dùng SQLite để các worker/instance không tranh khóa file
+SESSION_ENGINE = 'learning.sessions'
+
 # Cấu hình User và Backend cho MongoEngine
 MONGOENGINE_USER_DOCUMENT = 'learning.documents.User' 
 AUTHENTICATION_BACKENDS = (
@@ -146,6 +148,61 @@ AUTHENTICATION_BACKENDS = (
     # 'django.contrib.auth.backends.ModelBackend',
 )
 
+# Cache User trong bộ nhớ của mỗi worker (learning/user_cache.py)
+# tránh 1 truy vấn MongoDB cho request.user ở mỗi request
+USER_CACHE_TTL = config('USER_CACHE_TTL', default=60, cast=int)
+USER_CACHE_MAX_SIZE = config('USER_CACHE_MAX_SIZE', default=1024, cast=int)
+
+# Cân bằng tải ngày ôn tập: dời ngày ôn của các khoảng >= 3 ngày trong một cửa sổ nhỏ
+# sang ngày có ít từ đến hạn nhất (xem learning/schedulers.py)
+SR_LOAD_BALANCING = config('SR_LOAD_BALANCING', default=True, cast=bool)
+
+# Độ trễ an toàn (giây) của watermark đồng bộ (learning/sync.py): thời gian tối đa giữa lúc cấp revision
+# và lúc lần ghi tương ứng hoàn tất; revision mới hơn chưa được coi là đã đồng bộ
+SYNC_SAFETY_LAG_SECONDS = config('SYNC_SAFETY_LAG_SECONDS', default=5, cast=int)
+
+# Thời gian (giây) cache trang thống kê chi tiết của mỗi người dùng; khóa cache đổi theo revision của bộ từ
+STATS_CACHE_TTL = config('STATS_CACHE_TTL', default=600, cast=int)
+
+# Cache của Django: 'default' (thống kê, learning/stats.py) và 'fragments' (HTML đã render của các trang
+# danh sách, learning/fragment_cache.py). FRAGMENT_CACHE_BACKEND = 'locmem' (riêng mỗi worker, loại bỏ
+# mục ít dùng gần đây nhất - LRU) hoặc 'file' (dùng chung giữa các worker trên cùng máy).
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+}
+FRAGMENT_CACHE_BACKEND = config('FRAGMENT_CACHE_BACKEND', default='locmem')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS['locmem'],
+    },
+    'fragments': {
+        'BACKEND': CACHE_BACKENDS[FRAGMENT_CACHE_BACKEND],
+        'LOCATION': config(
+            'FRAGMENT_CACHE_LOCATION',
+            default=str(BASE_DIR / '.cache' / 'fragments') if FRAGMENT_CACHE_BACKEND == 'file' else 'fragments',
+        ),
+        # Khóa có revision của bộ từ nên không cần xóa khi ghi; TTL chỉ để giải phóng các mục cũ
+        'TIMEOUT': config('FRAGMENT_CACHE_TTL', default=3600, cast=int),
+        'OPTIONS': {
+            # Số mục tối đa; khi đầy, 1/CULL_FREQUENCY số mục bị loại bỏ
+            'MAX_ENTRIES': config('FRAGMENT_CACHE_MAX_ENTRIES', default=2000, cast=int),
+            'CULL_FREQUENCY': 4,
+        },
+    },
+}
+
+# Đo lệnh MongoDB theo request (learning/db_instrumentation.py):
+# tỉ lệ request được đo (0..1), ngưỡng request chậm (ms, log WARNING), và header Server-Timing
+# (mặc định chỉ khi DEBUG, vì header cho thấy cấu trúc truy vấn)
+MONGO_TIMING_SAMPLE_RATE = config('MONGO_TIMING_SAMPLE_RATE', default=1.0, cast=float)
+MONGO_SLOW_REQUEST_MS = config('MONGO_SLOW_REQUEST_MS', default=500, cast=int)
+MONGO_SERVER_TIMING = config('MONGO_SERVER_TIMING', default=DEBUG, cast=bool)
+
+# Trang /metrics (Prometheus): request phải gửi header "Authorization: Bearer <token>".
+# Không đặt token: /metrics chỉ mở khi DEBUG=True, ngược lại trả về 404
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
 # Thêm path cho LOGIN
 LOGIN_URL = '/login/' 
 LOGIN_REDIRECT_URL = '/' 
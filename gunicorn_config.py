@@ -2,13 +2,22 @@
 
 import os
 import sys
-import django
+import glob
+import tempfile
 import logging
 
-# Thiết lập Django trước để có thể import settings và thư viện
+# Số đo Prometheus gộp trên các worker (learning/metrics.py): mỗi worker ghi vào thư mục chung này.
+# Phải được đặt TRƯỚC khi prometheus_client được import (trong django.setup()), và được dọn
+# khi master khởi động để không cộng dồn số đo của lần chạy trước.
+metrics_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'korean-srs-metrics'))
+os.makedirs(metrics_dir, exist_ok=True)
+for path in glob.glob(os.path.join(metrics_dir, '*.db')):
+    os.remove(path)
+
+# Django được nạp trong master qua preload_app (không gọi django.setup() ở đây):
+# settings không còn mở kết nối MongoDB, nên việc nạp trước khi fork là an toàn (learning/connection.py)
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
-django.setup()
 
 logger = logging.getLogger(__name__)
 
@@ -16,45 +25,42 @@ logger = logging.getLogger(__name__)
 # Tăng số lượng worker để xử lý nhiều request đồng thời
 workers = 4 
 threads = 2
+# Worker mặc định: đồng bộ (WSGI, config.wsgi:application).
+# Để phục vụ các async views (learning/async_views.py) chạy:
+#   GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn -c gunicorn_config.py config.asgi:application
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
 timeout = 30
 # Bind tới port 10000 hoặc 8000 (tùy thuộc vào thiết lập của Render)
 bind = '0.0.0.0:10000' 
+# Nạp ứng dụng MỘT lần trong master rồi fork: các worker dùng chung code đã import (copy-on-write)
+# thay vì mỗi worker tự import Django, views và template lúc khởi động
+preload_app = True
+
+
+def when_ready(server):
+    """Master đã nạp ứng dụng, chưa fork worker: nạp trước URLconf, views và template để các worker dùng chung."""
+    from learning import connection
+
+    logger.info("Preloaded application in master: %s", connection.preload())
+
 
-# ====================================================================
-# HOOK QUAN TRỌNG: KHẮC PHỤC LỖI "MongoClient opened before fork"
-# ====================================================================
 def post_fork(server, worker):
     """
-    Hàm này được gọi ngay sau khi mỗi Worker Process được Gunicorn tạo ra (fork).
-    Đây là NƠI DUY NHẤT AN TOÀN để tạo kết nối database, đảm bảo mỗi worker
-    có một kết nối MongoEngine mới và hợp lệ, không bị hỏng do quá trình fork.
+    Được gọi trong mỗi worker ngay sau khi fork, trước khi worker nhận request:
+    đăng ký kết nối MongoDB cho tiến trình mới (phát hiện fork qua PID), ping, tạo index
+    và giữ sẵn kết nối trong pool (MONGO_MIN_POOL_SIZE), để request đầu tiên không phải chờ.
+    Nếu MongoDB chưa sẵn sàng, worker vẫn khởi động; /health/ready/ trả 503 cho đến khi kết nối được.
     """
-    logger.info("Gunicorn Worker starting. Initializing MongoEngine connection...")
-    
-    # Imports phải được đặt ở đây để chắc chắn chúng chạy trong Worker Process
-    from django.conf import settings
-    import mongoengine
+    from learning import connection
 
     try:
-        # 1. Ngắt kết nối cũ nếu có (an toàn)
-        try:
-            mongoengine.disconnect(alias='default') 
-        except Exception:
-            pass
-
-        mongo_uri = settings.MONGO_URI
-        
-        # 2. Kết nối lại MongoEngine trong Worker Process mới
-        mongoengine.connect(
-            host=mongo_uri, 
-            alias='default', 
-            maxPoolSize=50, 
-            serverSelectionTimeoutMS=5000,
-            readPreference='secondaryPreferred' # Tăng tính ổn định trong môi trường cloud
-        )
-        logger.info("MongoEngine connected successfully in worker process.")
-        
+        logger.info("Worker %s warmed up: %s", worker.pid, connection.warm_up())
     except Exception as e:
-        # Nếu không thể kết nối DB, worker này phải dừng lại để tránh lỗi 500
-        logger.critical(f"FATAL: Failed to connect MongoEngine in worker process: {e}")
-        worker.exit()
+        logger.error(f"Worker {worker.pid}: MongoDB warm-up failed: {e}")
+
+
+def child_exit(server, worker):
+    """Worker đã thoát: bỏ các gauge 'livesum' (kết nối đang dùng/đang mở) của nó khỏi /metrics."""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
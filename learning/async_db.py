@@ -0,0 +1,18 @@
+# File: learning/async_db.py
+#
+# Truy vấn MongoDB từ các async views (learning/async_views.py) mà không chặn event loop:
+# các thao tác pymongo (client của mongoengine, learning/connection.py) chạy trong thread pool của loop
+# qua sync_to_async(thread_sensitive=False). Khi đó request đang chờ MongoDB không giữ thread của worker
+# ASGI, còn số lệnh chạy đồng thời bị giới hạn bởi thread pool và maxPoolSize (MONGO_MAX_POOL_SIZE).
+#
+# Không dùng Motor: Motor 2.x không import được trên Python >= 3.11 (asyncio.coroutine đã bị bỏ),
+# còn Motor 3 cần pymongo 4, không tương thích với bản pymongo~=3.12 mà mongoengine của dự án đang dùng.
+# Dùng chung client với code đồng bộ nên không có client riêng nào phải đóng khi server tắt.
+
+from asgiref.sync import sync_to_async
+
+
+async def run(func, *args, **kwargs):
+    """Chạy `func` (có truy vấn MongoDB) trong thread pool và trả về kết quả."""
+    # contextvars được sao chép sang thread: số lệnh MongoDB vẫn được tính vào request (db_instrumentation)
+    return await sync_to_async(func, thread_sensitive=False)(*args, **kwargs)
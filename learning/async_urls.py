@@ -0,0 +1,15 @@
+# File: learning/async_urls.py
+#
+# Phiên bản bất đồng bộ của Dashboard và luồng ôn tập. Chỉ được mount khi chạy dưới ASGI
+# (config/asgi_urls.py): dưới WSGI Django chạy mỗi async view trong một event loop tạm trên thread
+# của request, nên thread vẫn bị giữ suốt request và view async chỉ thêm chi phí.
+
+from django.urls import path
+from . import async_views
+
+urlpatterns = [
+    path('async/', async_views.home_view_async, name='home_async'),
+    path('async/review/', async_views.review_session_async, name='review_session_async'),
+    path('async/review/<str:word_id>/', async_views.word_detail_view_async, name='word_detail_async'),
+    path('async/api/check/<str:word_id>/<str:result>/', async_views.check_word_view_async, name='check_word_async'),
+]
@@ -0,0 +1,129 @@
+# File: learning/async_views.py
+#
+# Phiên bản bất đồng bộ của các endpoint ôn tập và Dashboard. Các truy vấn MongoDB chạy trong
+# thread pool (learning/async_db.py) thay vì chặn thread của worker, nên khi chạy dưới worker ASGI
+# số request đồng thời không còn bị giới hạn bởi workers × threads của Gunicorn.
+#
+# Logic dùng lại đúng các hàm của learning/views.py: quy tắc SR (sr_logic.apply_review_atomic),
+# thống kê (deck_stats), phân trang cursor (pagination) và các template.
+
+from datetime import date
+from asgiref.sync import sync_to_async
+from bson import ObjectId
+from django.http import Http404, JsonResponse
+from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
+from . import deck_stats, metrics
+from .async_db import run
+from .documents import Vocabulary
+from .middleware import get_user_from_session
+from .pagination import KeysetQuery
+from .rows import VocabularyRow
+from .schedulers import get_scheduler
+from .sr_logic import apply_review_atomic, to_mongo_date
+from .views import PAGE_SIZE
+
+
+async def _aget_user(request):
+    """
+    Lấy user của request mà không chặn event loop.
+    Việc đọc session + user (thường trúng cache trong bộ nhớ) chạy trong thread pool;
+    thread_sensitive=False để các request không phải xếp hàng trên cùng một thread.
+    """
+    return await sync_to_async(get_user_from_session, thread_sensitive=False)(request)
+
+
+def _due_rows_html(request, user_id, today):
+    """Bảng các từ đến hạn của một trang (chuỗi rỗng nếu không còn từ nào), như review_session."""
+    query = KeysetQuery(request.GET.get('cursor'), 'next_review_date')
+    cursor = (
+        Vocabulary._get_collection()
+        .find(
+            {'user': user_id, 'next_review_date': {'$lte': to_mongo_date(today)}, **query.filter},
+            {field: True for field in VocabularyRow.FIELDS},
+        )
+        .sort(query.sort)
+        .limit(PAGE_SIZE + 1)
+    )
+    page_obj = query.build_page([VocabularyRow.from_son(son) for son in cursor], PAGE_SIZE)
+    if not page_obj and not query.cursor:
+        return ''
+    return render_to_string('learning/review_list_table.html', {
+        'page_obj': page_obj,
+        'total_words': deck_stats.get_deck_stats(user_id, today)['due_count'],
+    }, request)
+
+
+async def home_view_async(request):
+    """Trang chủ (async), hiển thị tổng quan và số từ cần ôn tập."""
+    user = await _aget_user(request)
+    if not user.is_authenticated:
+        return redirect('login')
+
+    stats = await run(deck_stats.get_deck_stats, user.id)
+    context = {
+        'total_words': stats['total_words'],
+        'words_to_review_count': stats['due_count'],
+        'user_name': user.full_name or user.email,
+    }
+    return render(request, 'learning/home.html', context)
+
+
+async def review_session_async(request):
+    """Danh sách từ cần ôn tập hôm nay (async), phân trang theo cursor (next_review_date, _id)."""
+    user = await _aget_user(request)
+    if not user.is_authenticated:
+        return redirect('login')
+
+    rows_html = await run(_due_rows_html, request, user.id, date.today())
+    if not rows_html:
+        return render(request, 'learning/review_done.html')
+    return render(request, 'learning/review_list_dashboard.html', {'rows_html': rows_html})
+
+
+async def word_detail_view_async(request, word_id):
+    """Xem chi tiết một từ vựng (async)."""
+    user = await _aget_user(request)
+    if not user.is_authenticated:
+        return redirect('login')
+
+    try:
+        object_id = ObjectId(word_id)
+    except Exception:
+        raise Http404("Word ID không hợp lệ.")
+
+    son = await run(Vocabulary._get_collection().find_one, {'_id': object_id, 'user': user.id})
+    if not son:
+        raise Http404("Word not found or unauthorized.")
+
+    # Chỉ 1 document: dùng lại Document để template hiển thị giống hệt bản đồng bộ
+    return render(request, 'learning/word_detail.html', {'word': Vocabulary._from_son(son)})
+
+
+async def check_word_view_async(request, word_id, result):
+    """API Endpoint (async) cập nhật cấp độ SR của một từ vựng bằng một update nguyên tử."""
+    user = await _aget_user(request)
+    if not user.is_authenticated:
+        return JsonResponse({'error': 'Unauthorized'}, status=401)
+
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed. Use POST.'}, status=405)
+
+    try:
+        is_correct = result.lower() == 'correct'
+        object_id = ObjectId(word_id)
+    except Exception:
+        return JsonResponse({'error': 'Invalid Word ID format'}, status=400)
+
+    updated = await run(apply_review_atomic, user.id, object_id, is_correct, scheduler=get_scheduler(user.scheduler))
+    if updated is None:
+        return JsonResponse({'error': 'Word not found or unauthorized'}, status=404)
+    metrics.record_reviews('check_async')
+    new_state = updated[1]
+
+    return JsonResponse({
+        'success': True,
+        'new_level': new_state['level'],
+        'next_review_date': new_state['next_review_date'].isoformat(),
+        'message': f'Cấp độ mới: {new_state["level"]}. Ôn tập lại vào ngày: {new_state["next_review_date"].strftime("%Y-%m-%d")}'
+    })
@@ -1,5 +1,6 @@
 from django.contrib.auth.backends import BaseBackend
 from .documents import User # Import model User của MongoEngine
+from .user_cache import user_cache
 from bson import ObjectId
 import logging
 
@@ -42,6 +43,7 @@ class CustomMongoEngineBackend(BaseBackend):
         """
         Lấy đối tượng User (document) dựa trên user_id (được lưu trong session).
         user_id ở đây là ObjectId dạng chuỗi.
+        Ưu tiên đọc từ cache trong bộ nhớ của worker để tránh 1 truy vấn MongoDB mỗi request.
         """
         if not user_id:
             return None
@@ -53,9 +55,15 @@ class CustomMongoEngineBackend(BaseBackend):
             logger.error(f"User ID {user_id} không phải là ObjectId hợp lệ: {e}")
             return None
 
+        son = user_cache.get(object_id)
+        if son is not None:
+            return User._from_son(dict(son))
+
         try:
             # Tìm kiếm người dùng theo ObjectId
             user = User.objects(id=object_id).first()
+            if user is not None:
+                user_cache.set(object_id, user.to_mongo().to_dict())
             return user
         except Exception as e:
             logger.error(f"Lỗi khi lấy User theo ID {user_id}: {e}")
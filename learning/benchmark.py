@@ -0,0 +1,332 @@
+# File: learning/benchmark.py
+#
+# Bộ benchmark tái lập được cho các route thật của ứng dụng (learning/urls.py):
+#   1. tạo các user tổng hợp với bộ từ có kích thước cấu hình được (ví dụ 10.000 từ/user) trong MongoDB;
+#   2. mỗi user ảo (một thread) đăng nhập rồi lặp lại kịch bản: Dashboard, danh sách từ (trang đầu + trang sau),
+#      tìm kiếm, danh sách ôn tập, trang chi tiết một từ đến hạn và API check;
+#   3. tổng hợp throughput và p50/p95/p99 theo từng endpoint, lưu thành JSON để so sánh giữa các commit.
+#
+# Request được gửi trong cùng process qua django.test.Client (đủ middleware, không cần server),
+# hoặc qua HTTP tới một server đang chạy (base_url) dùng cùng database với lệnh này.
+# Dùng bởi `manage.py benchmark`.
+
+import json
+import platform
+import random
+import re
+import subprocess
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from http.cookies import SimpleCookie
+from urllib.parse import quote, urlencode, urlsplit
+import http.client
+import django
+from django.conf import settings
+from pymongo import uri_parser
+from .documents import User, Vocabulary
+from .loadtest import summarize_latencies
+from . import deck_stats
+
+# Số từ mỗi lần insert_many khi tạo dữ liệu
+SEED_BATCH_SIZE = 1000
+# Mật khẩu của các user tổng hợp
+SEED_PASSWORD = 'benchmark-password'
+# Từ khóa tìm kiếm (nghĩa của các từ tổng hợp là "nghĩa <số>", xem seed_users)
+SEARCH_TERMS = ('nghia', 'nghĩa 1', 'ㄱ', '가')
+# Thời gian tối đa (giây) một user ảo chờ các user khác xong vòng warmup trước khi bắt đầu đo
+BARRIER_TIMEOUT = 300
+# Máy chủ MongoDB được coi là cục bộ: có thể tạo dữ liệu tổng hợp mà không cần xác nhận database
+LOCAL_HOSTS = frozenset(('localhost', '127.0.0.1', '::1'))
+
+_CURSOR_PATTERN = re.compile(r'\?cursor=([^"&]+)"')
+
+
+class BenchmarkError(Exception):
+    """Lần chạy benchmark không hoàn tất (user ảo bị lỗi hoặc không cùng bắt đầu đo được)."""
+
+
+def is_local_uri(uri):
+    """True nếu mọi máy chủ trong URI MongoDB là máy cục bộ (mongodb+srv luôn được coi là máy chủ từ xa)."""
+    if uri.startswith('mongodb+srv://'):
+        return False
+    return all(host in LOCAL_HOSTS for host, _ in uri_parser.parse_uri(uri)['nodelist'])
+
+
+def _hangul_word(rng, index):
+    syllables = ''.join(chr(0xAC00 + rng.randrange(11172)) for _ in range(rng.randint(1, 3)))
+    # Số thứ tự giữ cho khóa chuẩn hóa (word_key) không trùng trong bộ từ
+    return f'{syllables}{index}'
+
+
+def seed_users(count, deck_size, due_fraction=0.2, seed=0, log=None):
+    """
+    Tạo `count` user tổng hợp, mỗi user `deck_size` từ (insert_many theo batch), với cấp độ và ngày ôn tập
+    ngẫu nhiên (cố định theo `seed`); khoảng `due_fraction` số từ đến hạn hôm nay hoặc trước đó.
+    Trả về danh sách tài khoản {'email', 'password', 'user_id', 'due_ids', 'word_ids'}.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    run_id = uuid.uuid4().hex[:8]
+    collection = Vocabulary._get_collection()
+    accounts = []
+
+    for number in range(count):
+        user = User(email=f'bench-{run_id}-{number}@example.com', full_name=f'Benchmark {number}')
+        user.set_password(SEED_PASSWORD)
+        user.save()
+
+        now = datetime.now()
+        first_rev = deck_stats.reserve_revisions(user.id, deck_size)
+        due_ids, word_ids, batch = [], [], []
+        for index in range(deck_size):
+            due = rng.random() < due_fraction
+            word = Vocabulary(
+                user=user,
+                korean_word=_hangul_word(rng, index),
+                vietnamese_meaning=f'nghĩa {index}',
+                level=rng.randint(1, 7),
+                added_at=now - timedelta(minutes=index),
+                next_review_date=today - timedelta(days=rng.randint(0, 10)) if due else today + timedelta(days=rng.randint(1, 60)),
+                rev=first_rev + index,
+            )
+            word.update_search_tokens()
+            son = word.to_mongo().to_dict()
+            batch.append(son)
+            if len(batch) >= SEED_BATCH_SIZE:
+                word_ids += collection.insert_many(batch).inserted_ids
+                batch = []
+            if due:
+                due_ids.append(index)
+        if batch:
+            word_ids += collection.insert_many(batch).inserted_ids
+        deck_stats.rebuild_deck_stats(user.id)
+
+        accounts.append({
+            'email': user.email,
+            'password': SEED_PASSWORD,
+            'user_id': user.id,
+            'word_ids': [str(word_id) for word_id in word_ids],
+            'due_ids': [str(word_ids[index]) for index in due_ids],
+        })
+        if log:
+            log(f'Đã tạo {user.email} với {deck_size} từ ({len(due_ids)} từ đến hạn).')
+    return accounts
+
+
+def delete_users(accounts):
+    """Xóa các user tổng hợp và toàn bộ dữ liệu của họ."""
+    from .documents import DeckStats, ReviewQueue, VocabularyTombstone
+
+    for account in accounts:
+        user_id = account['user_id']
+        Vocabulary._get_collection().delete_many({'user': user_id})
+        VocabularyTombstone._get_collection().delete_many({'user': user_id})
+        DeckStats._get_collection().delete_one({'_id': user_id})
+        ReviewQueue._get_collection().delete_many({'_id': user_id})
+        User.objects(id=user_id).delete()
+
+
+class InProcessSession:
+    """Phiên của một user ảo qua django.test.Client (toàn bộ middleware, không qua mạng)."""
+
+    def __init__(self):
+        from django.test import Client
+
+        self.client = Client()
+
+    def request(self, method, path, data=None, json_body=None):
+        if json_body is not None:
+            response = self.client.generic(method, path, json.dumps(json_body), content_type='application/json')
+        elif method == 'POST':
+            response = self.client.post(path, data or {})
+        else:
+            response = self.client.get(path)
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+        return response.status_code, content.decode('utf-8', 'replace')
+
+
+class HttpSession:
+    """Phiên của một user ảo qua HTTP (keep-alive), tự giữ cookie session / CSRF."""
+
+    def __init__(self, base_url, timeout=30):
+        parts = urlsplit(base_url)
+        self.base_url = base_url.rstrip('/')
+        self.netloc = parts.netloc
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.timeout = timeout
+        self.connection = self.connection_class(self.netloc, timeout=timeout)
+        self.cookies = {}
+
+    def request(self, method, path, data=None, json_body=None):
+        headers = {}
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+        body = None
+        if method == 'POST':
+            csrf_token = self.cookies.get(settings.CSRF_COOKIE_NAME, '')
+            headers['X-CSRFToken'] = csrf_token
+            # Django kiểm tra Referer cho request HTTPS
+            headers['Referer'] = self.base_url + path
+            if json_body is not None:
+                body = json.dumps(json_body)
+                headers['Content-Type'] = 'application/json'
+            else:
+                body = urlencode(dict(data or {}, csrfmiddlewaretoken=csrf_token))
+                headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            content = response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = self.connection_class(self.netloc, timeout=self.timeout)
+            return 599, ''
+        for header in response.headers.get_all('Set-Cookie') or []:
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+        return response.status, content.decode('utf-8', 'replace')
+
+    def close(self):
+        self.connection.close()
+
+
+class _Recorder:
+    """Độ trễ và số lỗi theo endpoint, dùng chung cho các thread."""
+
+    def __init__(self, users):
+        self.latencies = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+        # Các user ảo chờ nhau sau warmup; thời gian đo bắt đầu khi tất cả đã sẵn sàng
+        self.started_at = None
+        self.barrier = threading.Barrier(users, action=self._start)
+
+    def _start(self):
+        self.started_at = time.perf_counter()
+
+    def timed(self, session, name, method, path, record=True, **kwargs):
+        start = time.perf_counter()
+        status, text = session.request(method, path, **kwargs)
+        latency = time.perf_counter() - start
+        if record:
+            with self._lock:
+                if status < 400:
+                    self.latencies.setdefault(name, []).append(latency)
+                else:
+                    self.errors[name] = self.errors.get(name, 0) + 1
+                    self.latencies.setdefault(name, [])
+        return status, text
+
+
+def _scenario(session, account, iterations, recorder, rng, warmup=0):
+    """Kịch bản của một user ảo: đăng nhập, rồi `iterations` vòng duyệt + ôn tập (vòng warmup không được ghi)."""
+    recorder.timed(session, 'login_page', 'GET', '/login/')
+    recorder.timed(session, 'login', 'POST', '/login/', data={'email': account['email'], 'password': account['password']})
+
+    due_ids = list(account['due_ids'])
+    rng.shuffle(due_ids)
+    for iteration in range(warmup + iterations):
+        if iteration == warmup:
+            recorder.barrier.wait(timeout=BARRIER_TIMEOUT)
+        record = iteration >= warmup
+        recorder.timed(session, 'home', 'GET', '/', record)
+        status, html = recorder.timed(session, 'vocabulary_list', 'GET', '/words/', record)
+        match = _CURSOR_PATTERN.search(html)
+        if match:
+            recorder.timed(session, 'vocabulary_list_next', 'GET', f'/words/?cursor={quote(match.group(1), safe="")}', record)
+        recorder.timed(session, 'search', 'GET', f'/words/?q={quote(rng.choice(SEARCH_TERMS))}', record)
+        recorder.timed(session, 'review_session', 'GET', '/review/', record)
+
+        word_id = due_ids.pop() if due_ids else rng.choice(account['word_ids'])
+        recorder.timed(session, 'word_detail', 'GET', f'/review/{word_id}/', record)
+        result = 'correct' if rng.random() < 0.8 else 'incorrect'
+        recorder.timed(session, 'check', 'POST', f'/api/check/{word_id}/{result}/', record)
+
+
+def _git_commit():
+    try:
+        completed = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        )
+        return completed.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmark(accounts, iterations=20, warmup=1, base_url=None, seed=0, deck_size=None):
+    """
+    Chạy kịch bản cho mỗi tài khoản trên một thread riêng (số user đồng thời = số tài khoản).
+    Trả về kết quả dạng JSON được: thông tin lần chạy, tổng hợp và số liệu theo endpoint.
+    """
+    recorder = _Recorder(len(accounts))
+    if not base_url and '*' not in settings.ALLOWED_HOSTS and 'testserver' not in settings.ALLOWED_HOSTS:
+        # django.test.Client dùng host 'testserver'
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+
+    failures = []
+
+    def user_thread(number, account):
+        session = HttpSession(base_url) if base_url else InProcessSession()
+        try:
+            _scenario(session, account, iterations, recorder, random.Random(seed + number), warmup)
+        except Exception as e:
+            failures.append(e)
+            # Giải phóng các user ảo đang chờ ở barrier (chúng nhận BrokenBarrierError và dừng)
+            recorder.barrier.abort()
+        finally:
+            if base_url:
+                session.close()
+
+    threads = [threading.Thread(target=user_thread, args=(number, account)) for number, account in enumerate(accounts)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if failures:
+        # Lỗi gốc của user ảo đầu tiên thất bại; BrokenBarrierError chỉ là hệ quả (trừ khi hết thời gian chờ)
+        original = [e for e in failures if not isinstance(e, threading.BrokenBarrierError)]
+        if original:
+            raise original[0]
+        raise BenchmarkError(f'Các user ảo không cùng xong vòng warmup trong {BARRIER_TIMEOUT} giây.')
+    if recorder.started_at is None:
+        raise BenchmarkError('Các user ảo chưa bắt đầu vòng đo nào.')
+    elapsed = time.perf_counter() - recorder.started_at
+
+    all_latencies = [latency for latencies in recorder.latencies.values() for latency in latencies]
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'mode': 'http' if base_url else 'in-process',
+            'base_url': base_url,
+            'users': len(accounts),
+            'deck_size': deck_size,
+            'iterations': iterations,
+            'warmup': warmup,
+            'seed': seed,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+        },
+        'total': summarize_latencies(all_latencies, elapsed, sum(recorder.errors.values())),
+        'endpoints': {
+            name: summarize_latencies(latencies, elapsed, recorder.errors.get(name, 0))
+            for name, latencies in sorted(recorder.latencies.items())
+        },
+    }
+
+
+def compare_results(baseline: dict, current: dict) -> list:
+    """Các dòng (endpoint, chỉ số, giá trị cũ, giá trị mới, % thay đổi) giữa hai kết quả."""
+    rows = []
+    for name in sorted(set(baseline['endpoints']) | set(current['endpoints'])):
+        old, new = baseline['endpoints'].get(name), current['endpoints'].get(name)
+        if not old or not new:
+            continue
+        for metric in ('throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms'):
+            change = (new[metric] - old[metric]) / old[metric] * 100 if old[metric] else 0.0
+            rows.append((name, metric, old[metric], new[metric], change))
+    return rows
@@ -0,0 +1,62 @@
+# File: learning/conditional.py
+#
+# GET có điều kiện (ETag / Last-Modified) cho các trang bộ từ của người dùng.
+# Trang chỉ thay đổi khi bộ từ thay đổi, và mọi luồng ghi từ vựng đều tăng bộ đếm revision của
+# người dùng (DeckStats.revision, xem deck_stats.reserve_revisions). Vì vậy ETag được tính từ
+# revision bằng 1 lần đọc theo _id; request có If-None-Match khớp nhận 304 trước khi view truy vấn
+# từ vựng hay render template.
+
+import hashlib
+from datetime import date, datetime
+from functools import wraps
+from django.conf import settings
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+from . import deck_stats
+
+
+def deck_revision(request):
+    """(revision, revised_at) của bộ từ, đọc một lần cho mỗi request (dùng chung cho ETag và Last-Modified)."""
+    if not hasattr(request, '_deck_revision'):
+        request._deck_revision = deck_stats.get_revision(request.user.id)
+    return request._deck_revision
+
+
+def deck_etag(request, *args, **kwargs):
+    """
+    ETag của trang: người dùng + revision bộ từ + ngày hôm nay (số từ đến hạn đổi theo ngày)
+    + cookie CSRF (trang có form POST phải chứa token còn hợp lệ).
+    """
+    if not request.user.is_authenticated:
+        return None
+    revision, _ = deck_revision(request)
+    csrf = hashlib.sha1(request.COOKIES.get(settings.CSRF_COOKIE_NAME, '').encode()).hexdigest()[:8]
+    return f'{request.user.id}-{revision}-{date.today().isoformat()}-{csrf}'
+
+
+def deck_last_modified(request, *args, **kwargs):
+    """Thời điểm ghi gần nhất vào bộ từ, nhưng không sớm hơn 00:00 hôm nay (số từ đến hạn đổi theo ngày)."""
+    if not request.user.is_authenticated:
+        return None
+    _, revised_at = deck_revision(request)
+    if revised_at is None:
+        return None
+    return max(revised_at, datetime.combine(date.today(), datetime.min.time()))
+
+
+def deck_conditional(view):
+    """
+    Decorator cho các trang chỉ phụ thuộc vào bộ từ của người dùng: thêm ETag / Last-Modified,
+    trả 304 khi trình duyệt đã có bản mới nhất. Trang riêng của từng người dùng nên được đánh dấu
+    private và luôn được kiểm tra lại (no-cache) thay vì dùng bản cũ.
+    """
+    conditional_view = condition(etag_func=deck_etag, last_modified_func=deck_last_modified)(view)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = conditional_view(request, *args, **kwargs)
+        if request.user.is_authenticated:
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ('Cookie',))
+        return response
+    return wrapper
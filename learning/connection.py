@@ -0,0 +1,181 @@
+# File: learning/connection.py
+#
+# Quản lý kết nối MongoDB (mongoengine, alias 'default') cho mọi loại tiến trình:
+# runserver, manage.py, worker Gunicorn (WSGI/ASGI).
+#
+#   - configure() (gọi trong LearningConfig.ready) chỉ ĐĂNG KÝ thông số kết nối: MongoClient được
+#     mongoengine tạo ở lần truy vấn đầu tiên của tiến trình. Vì vậy master của Gunicorn
+#     (preload_app) không mở client nào trước khi fork ("MongoClient opened before fork").
+#   - ensure_connected() (ConnectionMiddleware, warm_up) phát hiện fork qua PID: nếu tiến trình
+#     hiện tại không phải tiến trình đã đăng ký kết nối, client thừa hưởng từ tiến trình cha bị bỏ
+#     và kết nối được đăng ký lại cho tiến trình con.
+#   - preload() nạp trước URLconf, views, documents và template (trong master, trước khi fork,
+#     để các worker dùng chung qua copy-on-write); warm_up() (post_fork) mở kết nối, tạo index
+#     và ping để request đầu tiên của worker không phải trả các chi phí này.
+#   - readiness() là kết quả ping có cache (READINESS_CACHE_SECONDS) cho health check.
+#
+# Các listener của pymongo (learning/db_instrumentation.py, learning/metrics.py) được đăng ký
+# trước khi đăng ký kết nối, tức là trước khi client đầu tiên được tạo.
+
+import inspect
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+import mongoengine
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from .db_instrumentation import register_command_listener
+from .metrics import register_pool_listener
+
+logger = logging.getLogger(__name__)
+
+ALIAS = 'default'
+
+_lock = threading.Lock()
+# PID của tiến trình đã đăng ký kết nối (None: chưa cấu hình)
+_configured_pid = None
+# (thời điểm kiểm tra, kết quả) của readiness()
+_readiness = (0.0, None)
+_readiness_lock = threading.Lock()
+
+
+def database_name():
+    # Tên database là phần cuối cùng của chuỗi URI trước dấu '?'
+    return settings.MONGO_URI.split('/')[-1].split('?')[0]
+
+
+def client_options():
+    """Tùy chọn của MongoClient (pymongo), dùng chung cho view đồng bộ và async (learning/async_db.py)."""
+    return {
+        'maxPoolSize': settings.MONGO_MAX_POOL_SIZE,
+        'minPoolSize': settings.MONGO_MIN_POOL_SIZE,
+        'serverSelectionTimeoutMS': settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        'readPreference': settings.MONGO_READ_PREFERENCE,
+    }
+
+
+def _register():
+    global _configured_pid
+    register_command_listener()
+    register_pool_listener()
+    mongoengine.register_connection(ALIAS, db=database_name(), host=settings.MONGO_URI, **client_options())
+    _configured_pid = os.getpid()
+
+
+def configure():
+    """Đăng ký kết nối (chưa mở client) cho tiến trình hiện tại."""
+    with _lock:
+        _register()
+
+
+def ensure_connected():
+    """
+    Đảm bảo kết nối thuộc về tiến trình hiện tại; gọi ở đầu mỗi request (chi phí: so sánh PID).
+    Sau fork, client của tiến trình cha (nếu đã được tạo) bị bỏ và kết nối được đăng ký lại.
+    """
+    global _readiness
+    if _configured_pid == os.getpid():
+        return
+    with _lock:
+        if _configured_pid == os.getpid():
+            return
+        if _configured_pid is not None:
+            logger.info('Tiến trình %s được fork sau khi cấu hình MongoDB: đăng ký lại kết nối.', os.getpid())
+            mongoengine.disconnect(ALIAS)
+            _readiness = (0.0, None)
+        _register()
+
+
+def _documents():
+    from . import documents
+
+    return [
+        member for _, member in inspect.getmembers(documents, inspect.isclass)
+        if issubclass(member, mongoengine.Document) and member.__module__ == documents.__name__
+        and not member._meta.get('abstract')
+    ]
+
+
+def preload():
+    """Nạp trước URLconf (và toàn bộ views), documents và template; trả về thời gian (ms)."""
+    from django.template.loader import get_template
+    from django.urls import get_resolver
+
+    start = time.perf_counter()
+    get_resolver().url_patterns
+    _documents()
+    template_dir = Path(__file__).resolve().parent / 'templates'
+    for path in sorted(template_dir.rglob('*.html')):
+        get_template(path.relative_to(template_dir).as_posix())
+    return {'preload_ms': round((time.perf_counter() - start) * 1000, 1)}
+
+
+def warm_up():
+    """
+    Chuẩn bị worker trước request đầu tiên: mở kết nối (ping), tạo index của các document
+    (auto_create_index, vốn chạy ở lần truy vấn đầu tiên của mỗi document). Trả về thời gian từng bước (ms).
+    """
+    timings = {}
+    ensure_connected()
+
+    start = time.perf_counter()
+    mongoengine.get_db(ALIAS).command('ping')
+    timings['connect_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+    start = time.perf_counter()
+    for document in _documents():
+        document._get_collection()
+    timings['indexes_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return timings
+
+
+def readiness(max_age=None):
+    """
+    Trạng thái sẵn sàng của tiến trình: {'ready', 'mongo_ms', 'error'} từ một lệnh ping.
+    Kết quả được cache `max_age` giây (READINESS_CACHE_SECONDS); chỉ một thread ping tại một thời điểm,
+    các thread khác dùng kết quả trước đó, để health check dồn dập không tạo tải lên MongoDB.
+    """
+    global _readiness
+    if max_age is None:
+        max_age = settings.READINESS_CACHE_SECONDS
+
+    checked_at, result = _readiness
+    if result is not None and time.monotonic() - checked_at < max_age:
+        return result
+    if not _readiness_lock.acquire(blocking=result is None):
+        return result
+    try:
+        # Một thread khác có thể vừa ping xong trong lúc chờ khóa
+        checked_at, cached = _readiness
+        if cached is not None and time.monotonic() - checked_at < max_age:
+            return cached
+        ensure_connected()
+        start = time.perf_counter()
+        try:
+            mongoengine.get_db(ALIAS).command('ping')
+            result = {'ready': True, 'mongo_ms': round((time.perf_counter() - start) * 1000, 1), 'error': None}
+        except Exception as e:
+            result = {'ready': False, 'mongo_ms': None, 'error': str(e)}
+        _readiness = (time.monotonic(), result)
+        return result
+    finally:
+        _readiness_lock.release()
+
+
+class ConnectionMiddleware:
+    """Kiểm tra PID trước mỗi request để worker được fork không dùng client của tiến trình cha."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        ensure_connected()
+        # Dưới ASGI get_response là coroutine: trả về coroutine để server await
+        return self.get_response(request)
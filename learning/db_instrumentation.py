@@ -0,0 +1,217 @@
+# File: learning/db_instrumentation.py
+#
+# Đo các lệnh MongoDB của từng request bằng pymongo CommandListener:
+# số lệnh, tổng thời gian DB, lệnh chậm nhất, và phân bổ theo (collection, lệnh).
+# MongoTimingMiddleware bật việc đo cho request (có lấy mẫu), rồi ghi kết quả vào header
+# Server-Timing và một dòng log JSON (WARNING nếu request chậm hơn ngưỡng).
+#
+# Listener phải được đăng ký (register_command_listener) TRƯỚC khi MongoClient đầu tiên được tạo,
+# vì pymongo chỉ gắn các listener toàn cục vào client tạo sau đó (xem learning/connection.py).
+# Các lệnh được gán cho request qua contextvars, nên chỉ các lệnh chạy trong context của request được
+# tính: thread của request và sync_to_async (cả thread pool của async views) đều chạy với bản sao
+# context; nội dung của StreamingHttpResponse (xuất file) được tạo sau khi middleware trả về nên không được tính.
+#
+# Các khối đo có thể lồng nhau (ví dụ: test giới hạn số lệnh bao quanh một request mà middleware cũng đo):
+# mỗi lệnh được tính cho khối trong cùng và mọi khối bao ngoài.
+#
+# Module này không import model của Django để có thể được nạp từ settings.
+
+import json
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# Số đo của request đang chạy trên context hiện tại (None: không đo)
+_current = ContextVar('mongo_command_stats', default=None)
+
+
+class CommandStats:
+    """Số đo các lệnh MongoDB trong một request (hoặc một khối `capture_mongo_commands`)."""
+
+    def __init__(self, keep_commands=False, parent=None):
+        # Khối đo bao ngoài (nếu có) cũng nhận mọi lệnh của khối này
+        self.parent = parent
+        self.count = 0
+        self.total_ms = 0.0
+        self.failed = 0
+        # (lệnh, collection, ms) của lệnh chậm nhất
+        self.slowest = None
+        # (collection, lệnh) -> [số lệnh, tổng ms]
+        self.breakdown = defaultdict(lambda: [0, 0.0])
+        # Danh sách (lệnh, collection, ms) từng lệnh, chỉ giữ khi cần (test)
+        self.commands = [] if keep_commands else None
+        # (connection_id, request_id) -> (lệnh, collection) của các lệnh đang chạy
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = ''
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (event.command_name, collection)
+
+    def finished(self, event, failed=False):
+        with self._lock:
+            command, collection = self._pending.pop((event.connection_id, event.request_id), (event.command_name, ''))
+        self.record(command, collection, event.duration_micros / 1000, failed)
+
+    def record(self, command, collection, duration_ms, failed=False):
+        with self._lock:
+            self.count += 1
+            self.total_ms += duration_ms
+            self.failed += failed
+            entry = self.breakdown[(collection, command)]
+            entry[0] += 1
+            entry[1] += duration_ms
+            if self.slowest is None or duration_ms > self.slowest[2]:
+                self.slowest = (command, collection, duration_ms)
+            if self.commands is not None:
+                self.commands.append((command, collection, duration_ms))
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'total_ms': round(self.total_ms, 2),
+            'failed': self.failed,
+            'slowest': {
+                'command': self.slowest[0], 'collection': self.slowest[1], 'ms': round(self.slowest[2], 2),
+            } if self.slowest else None,
+            'breakdown': {
+                f'{collection}.{command}' if collection else command: {'count': count, 'ms': round(ms, 2)}
+                for (collection, command), (count, ms) in sorted(self.breakdown.items())
+            },
+        }
+
+
+def _active_stats():
+    """Các khối đo đang mở trên context hiện tại, từ trong ra ngoài."""
+    stats = _current.get()
+    while stats is not None:
+        yield stats
+        stats = stats.parent
+
+
+class RequestCommandListener(monitoring.CommandListener):
+    """Chuyển các sự kiện lệnh của pymongo tới các CommandStats của context hiện tại (nếu đang đo)."""
+
+    def started(self, event):
+        for stats in _active_stats():
+            stats.started(event)
+
+    def succeeded(self, event):
+        for stats in _active_stats():
+            stats.finished(event)
+
+    def failed(self, event):
+        for stats in _active_stats():
+            stats.finished(event, failed=True)
+
+
+def record_command(command: str, collection: str, duration_ms: float = 0.0, failed: bool = False):
+    """Ghi một lệnh cho các khối đo đang mở; dùng cho client không phát sự kiện của pymongo (ví dụ mongomock trong test)."""
+    for stats in _active_stats():
+        stats.record(command, collection, duration_ms, failed)
+
+
+_registered = False
+
+
+def register_command_listener():
+    """Đăng ký listener toàn cục của pymongo (một lần). Gọi trước khi tạo MongoClient."""
+    global _registered
+    if not _registered:
+        monitoring.register(RequestCommandListener())
+        _registered = True
+
+
+@contextmanager
+def capture_mongo_commands(keep_commands=True):
+    """Đo các lệnh MongoDB chạy trong khối `with` (trên context hiện tại); trả về CommandStats."""
+    stats = CommandStats(keep_commands=keep_commands, parent=_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def server_timing(stats: CommandStats, app_ms: float) -> str:
+    """Giá trị header Server-Timing: thời gian DB (kèm số lệnh), lệnh chậm nhất và tổng thời gian xử lý."""
+    metrics = [f'db;dur={stats.total_ms:.1f};desc="{stats.count} mongo commands"']
+    if stats.slowest:
+        command, collection, duration_ms = stats.slowest
+        metrics.append(f'db-slowest;dur={duration_ms:.1f};desc="{collection}.{command}"' if collection else
+                       f'db-slowest;dur={duration_ms:.1f};desc="{command}"')
+    metrics.append(f'app;dur={app_ms:.1f}')
+    return ', '.join(metrics)
+
+
+class MongoTimingMiddleware:
+    """
+    Đo các lệnh MongoDB của mỗi request (theo tỉ lệ lấy mẫu MONGO_TIMING_SAMPLE_RATE),
+    thêm header Server-Timing (MONGO_SERVER_TIMING) và ghi một dòng log JSON;
+    request chậm hơn MONGO_SLOW_REQUEST_MS được ghi ở mức WARNING.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        from django.conf import settings
+
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'MONGO_TIMING_SAMPLE_RATE', 1.0)
+        self.slow_request_ms = getattr(settings, 'MONGO_SLOW_REQUEST_MS', 500)
+        self.server_timing = getattr(settings, 'MONGO_SERVER_TIMING', False)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _sampled(self):
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with capture_mongo_commands(keep_commands=False) as stats:
+            response = self.get_response(request)
+        return self._finish(request, response, stats, start)
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+
+        start = time.perf_counter()
+        with capture_mongo_commands(keep_commands=False) as stats:
+            response = await self.get_response(request)
+        return self._finish(request, response, stats, start)
+
+    def _finish(self, request, response, stats, start):
+        app_ms = (time.perf_counter() - start) * 1000
+
+        if self.server_timing:
+            response['Server-Timing'] = server_timing(stats, app_ms)
+
+        slow = app_ms >= self.slow_request_ms
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(app_ms, 2),
+            'slow': slow,
+            'mongo': stats.as_dict(),
+        }
+        logger.log(logging.WARNING if slow else logging.INFO, json.dumps(record, ensure_ascii=False))
+        return response
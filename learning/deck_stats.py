@@ -0,0 +1,199 @@
+# File: learning/deck_stats.py
+#
+# Thống kê bộ từ vựng theo người dùng (tổng số từ, số từ theo cấp độ, histogram ngày đến hạn).
+# Được cập nhật bằng $inc trong cùng các luồng ghi (thêm từ, cập nhật SR) nên Dashboard
+# chỉ cần 1 lần đọc theo khóa chính, bất kể bộ từ lớn đến đâu.
+# Nếu thống kê bị lệch, chạy `manage.py rebuild_deck_stats`.
+
+from collections import Counter
+from datetime import date, datetime, timedelta
+from django.conf import settings
+from pymongo import ReturnDocument
+from .documents import DeckStats, Vocabulary
+
+
+def day_key(value) -> str:
+    """Khóa của histogram theo ngày: 'YYYY-MM-DD'."""
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.isoformat()
+
+
+def _apply_increments(user_id, increments):
+    """Ghi các thay đổi bằng một lệnh $inc (upsert nếu chưa có document)."""
+    increments = {key: delta for key, delta in increments.items() if delta}
+    if not increments:
+        return
+    DeckStats._get_collection().update_one({'_id': user_id}, {'$inc': increments}, upsert=True)
+
+
+# Revision được cấp TRƯỚC lần ghi tương ứng, nên một lần ghi đang diễn ra có thể xuất hiện sau một revision lớn hơn.
+# Revision được coi là "ổn định" (mọi lần ghi <= revision đó đã xong) khi được cấp từ SYNC_SAFETY_LAG_SECONDS
+# giây trước. Thời điểm cấp của từng revision không được lưu; thay vào đó mỗi lần cấp cập nhật một mốc
+# (checkpoint_revision: mọi revision <= giá trị này được cấp trước checkpoint_at), mốc cũ hơn độ trễ
+# trở thành settled_revision. Vì vậy settled_revision() chậm sau revision hiện tại tối đa khoảng 2 lần độ trễ.
+_EPOCH = datetime(1970, 1, 1)
+
+
+def reserve_update(count, now: datetime = None, lag_seconds: float = None):
+    """Update (pipeline) của DeckStats cấp `count` revision lúc `now`; dùng chung cho bản đồng bộ và bất đồng bộ."""
+    now = now or datetime.now()
+    if lag_seconds is None:
+        lag_seconds = settings.SYNC_SAFETY_LAG_SECONDS
+    # Mốc hiện tại đã cũ hơn độ trễ: nó trở thành revision ổn định, mốc mới là revision trước lần cấp này
+    rolled = {'$lte': [{'$ifNull': ['$checkpoint_at', _EPOCH]}, now - timedelta(seconds=lag_seconds)]}
+    revision = {'$ifNull': ['$revision', 0]}
+    return [{'$set': {
+        # Thứ tự các trường: các biểu thức đọc checkpoint_at / revision trước khi chúng được ghi
+        'settled_revision': {'$cond': [rolled, {'$ifNull': ['$checkpoint_revision', 0]}, {'$ifNull': ['$settled_revision', 0]}]},
+        'checkpoint_revision': {'$cond': [rolled, revision, {'$ifNull': ['$checkpoint_revision', 0]}]},
+        'checkpoint_at': {'$cond': [rolled, {'$literal': now}, '$checkpoint_at']},
+        'revision': {'$add': [revision, count]},
+        'revised_at': {'$literal': now},
+    }}]
+
+
+def reserve_revisions(user_id, count=1) -> int:
+    """
+    Cấp `count` revision liên tiếp (tăng dần, không dùng lại) cho các lần ghi từ vựng của người dùng.
+    Trả về revision đầu tiên của khoảng đã cấp.
+    """
+    stats = DeckStats._get_collection().find_one_and_update(
+        {'_id': user_id}, reserve_update(count),
+        projection={'revision': True}, upsert=True, return_document=ReturnDocument.AFTER,
+    )
+    return stats['revision'] - count + 1
+
+
+def settled_revision(user_id, now: datetime = None) -> int:
+    """
+    Revision cao nhất mà mọi lần ghi có revision nhỏ hơn hoặc bằng nó đã hoàn tất (xem reserve_update),
+    bằng 1 lần đọc theo _id. Đây là watermark lớn nhất có thể trả về cho client đồng bộ.
+    """
+    stats = DeckStats._get_collection().find_one({'_id': user_id}, {
+        'revision': True, 'revised_at': True, 'settled_revision': True, 'checkpoint_revision': True, 'checkpoint_at': True,
+    }) or {}
+    cutoff = (now or datetime.now()) - timedelta(seconds=settings.SYNC_SAFETY_LAG_SECONDS)
+    if (stats.get('revised_at') or _EPOCH) <= cutoff:
+        return stats.get('revision', 0)
+    if (stats.get('checkpoint_at') or _EPOCH) <= cutoff:
+        return stats.get('checkpoint_revision', 0)
+    return stats.get('settled_revision', 0)
+
+
+def get_revision(user_id):
+    """(revision, thời điểm ghi gần nhất) của bộ từ, bằng 1 lần đọc theo _id chỉ chiếu 2 trường."""
+    stats = DeckStats._get_collection().find_one({'_id': user_id}, {'revision': True, 'revised_at': True}) or {}
+    return stats.get('revision', 0), stats.get('revised_at')
+
+
+def record_added(user_id, words):
+    """
+    Ghi nhận các từ mới được thêm.
+    `words` là danh sách cặp (level, next_review_date).
+    """
+    increments = Counter()
+    for level, next_review_date in words:
+        increments['total_words'] += 1
+        increments[f'level_counts.{level}'] += 1
+        increments[f'due_histogram.{day_key(next_review_date)}'] += 1
+    _apply_increments(user_id, increments)
+
+
+def review_increments(transitions) -> dict:
+    """
+    Các thay đổi ($inc) ứng với các lần cập nhật SR.
+    `transitions` là danh sách cặp (trạng thái trước, trạng thái sau), mỗi trạng thái
+    là dict có `level` và `next_review_date`; trạng thái sau có thêm `last_reviewed_at` và
+    `consecutive_correct_count` (> 0 nếu trả lời đúng) để đếm lượt ôn theo ngày (review_days).
+    """
+    increments = Counter()
+    for before, after in transitions:
+        increments[f'level_counts.{before.get("level", 1)}'] -= 1
+        increments[f'level_counts.{after["level"]}'] += 1
+        if before.get('next_review_date'):
+            increments[f'due_histogram.{day_key(before["next_review_date"])}'] -= 1
+        increments[f'due_histogram.{day_key(after["next_review_date"])}'] += 1
+        if after.get('last_reviewed_at'):
+            day = day_key(after['last_reviewed_at'])
+            increments[f'review_days.{day}.reviews'] += 1
+            if after.get('consecutive_correct_count', 0) > 0:
+                increments[f'review_days.{day}.correct'] += 1
+    return {key: delta for key, delta in increments.items() if delta}
+
+
+def record_reviews(user_id, transitions):
+    """Ghi nhận các lần cập nhật SR (xem `review_increments`)."""
+    _apply_increments(user_id, review_increments(transitions))
+
+
+def reserve_revisions_with_due_counts(user_id, count=1, days=None):
+    """
+    Như reserve_revisions, đồng thời đọc số từ đến hạn theo ngày (date -> số từ) từ due_histogram trong CÙNG
+    lệnh findAndModify (cho cân bằng tải). Nếu có `days`, chỉ các ngày này được chiếu (projection) từ document.
+    Trả về (revision đầu tiên, số từ đến hạn theo ngày).
+    """
+    if days is None:
+        projection = {'due_histogram': True}
+    else:
+        projection = {f'due_histogram.{day_key(day)}': True for day in days}
+    stats = DeckStats._get_collection().find_one_and_update(
+        {'_id': user_id}, reserve_update(count),
+        projection={'revision': True, **projection}, upsert=True, return_document=ReturnDocument.AFTER,
+    )
+    counts = {date.fromisoformat(day): value for day, value in stats.get('due_histogram', {}).items()}
+    return stats['revision'] - count + 1, counts
+
+
+def rebuild_deck_stats(user_id):
+    """Tính lại toàn bộ thống kê của một người dùng bằng một lệnh aggregation ($facet)."""
+    pipeline = [
+        {'$match': {'user': user_id}},
+        {'$facet': {
+            'total': [{'$count': 'n'}],
+            'levels': [{'$group': {'_id': {'$ifNull': ['$level', 1]}, 'n': {'$sum': 1}}}],
+            'due': [
+                {'$match': {'next_review_date': {'$ne': None}}},
+                {'$group': {
+                    '_id': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$next_review_date'}},
+                    'n': {'$sum': 1},
+                }},
+            ],
+        }},
+    ]
+    result = next(Vocabulary._get_collection().aggregate(pipeline))
+
+    stats = {
+        'total_words': result['total'][0]['n'] if result['total'] else 0,
+        'level_counts': {str(row['_id']): row['n'] for row in result['levels']},
+        'due_histogram': {row['_id']: row['n'] for row in result['due']},
+        'built': True,
+        'rebuilt_at': datetime.now(),
+    }
+    # $set (không replace) để giữ bộ đếm revision
+    DeckStats._get_collection().update_one({'_id': user_id}, {'$set': stats}, upsert=True)
+    return stats
+
+
+def get_deck_stats(user_id, today: date = None) -> dict:
+    """
+    Đọc thống kê của người dùng (1 lần đọc theo _id) và tính số từ đến hạn tới `today`.
+    Người dùng chưa có thống kê đầy đủ sẽ được tính lại một lần.
+    """
+    stats = DeckStats._get_collection().find_one({'_id': user_id})
+    if not stats or not stats.get('built'):
+        stats = rebuild_deck_stats(user_id)
+    return summarize(stats, today)
+
+
+def summarize(stats: dict, today: date = None) -> dict:
+    """Chuyển document thống kê thô thành số liệu cho Dashboard (bỏ các mục bằng 0)."""
+    today_key = day_key(today or date.today())
+    due_histogram = {day: count for day, count in stats.get('due_histogram', {}).items() if count > 0}
+    return {
+        'total_words': stats.get('total_words', 0),
+        'level_counts': {level: count for level, count in stats.get('level_counts', {}).items() if count > 0},
+        'due_histogram': due_histogram,
+        # Khóa 'YYYY-MM-DD' so sánh chuỗi đúng theo thứ tự ngày
+        'due_count': sum(count for day, count in due_histogram.items() if day <= today_key),
+    }
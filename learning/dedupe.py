@@ -0,0 +1,97 @@
+# File: learning/dedupe.py
+#
+# Phát hiện và gộp từ vựng trùng của một người dùng theo khóa chuẩn hóa Vocabulary.word_key
+# (xem hangul.word_key; index unique (user, word_key)). Dùng chung cho form thêm/sửa từ
+# ("gộp / bỏ qua") và lệnh `manage.py dedupe_vocabulary`.
+
+from datetime import datetime
+from .documents import Vocabulary, VocabularyTombstone
+from .hangul import build_search_tokens, word_key
+from . import deck_stats
+
+# Các trường SR được lấy từ bản có trạng thái học tốt nhất
+SR_STATE_FIELDS = (
+    'level', 'consecutive_correct_count', 'current_interval_days', 'ease_factor',
+    'next_review_date', 'last_reviewed_at',
+)
+
+# Hành động khi thêm/sửa một từ đã có
+MERGE = 'merge'
+SKIP = 'skip'
+DUPLICATE_ACTIONS = (MERGE, SKIP)
+
+
+def find_duplicate(user_id, korean_word, exclude_id=None):
+    """Từ vựng (dict thô) của người dùng có cùng khóa chuẩn hóa, hoặc None."""
+    query = {'user': user_id, 'word_key': word_key(korean_word)}
+    if exclude_id is not None:
+        query['_id'] = {'$ne': exclude_id}
+    return Vocabulary._get_collection().find_one(query)
+
+
+def _sr_rank(son):
+    """Trạng thái học "tốt hơn": cấp độ cao hơn, khoảng ôn dài hơn, đúng liên tiếp nhiều hơn, ôn gần đây hơn."""
+    return (
+        son.get('level', 1),
+        son.get('current_interval_days', 1),
+        son.get('consecutive_correct_count', 0),
+        son.get('last_reviewed_at') or datetime.min,
+    )
+
+
+def _distinct(values):
+    seen, result = set(), []
+    for value in values:
+        value = (value or '').strip()
+        if value and value not in seen:
+            seen.add(value)
+            result.append(value)
+    return result
+
+
+def merged_fields(survivor, others) -> dict:
+    """
+    Các trường ($set) của bản được giữ lại sau khi gộp `others` vào `survivor`:
+    trạng thái SR tốt nhất, nghĩa/câu ví dụ/ghi chú được nối (không lặp), Hán tự đầu tiên có giá trị,
+    ngày thêm sớm nhất.
+    """
+    words = [survivor, *others]
+    best = max(words, key=_sr_rank)
+    fields = {field: best[field] for field in SR_STATE_FIELDS if field in best}
+
+    fields['vietnamese_meaning'] = '; '.join(_distinct(word.get('vietnamese_meaning') for word in words))
+    fields['example_sentence'] = '\n'.join(_distinct(word.get('example_sentence') for word in words))
+    fields['notes'] = '\n'.join(_distinct(word.get('notes') for word in words))
+    fields['hanja'] = next(iter(_distinct(word.get('hanja') for word in words)), survivor.get('hanja'))
+    added_at = [word['added_at'] for word in words if word.get('added_at')]
+    if added_at:
+        fields['added_at'] = min(added_at)
+
+    # Từ được giữ lại có thể vừa được sửa (form sửa từ): ghi lại cả từ tiếng Hàn để word_key luôn khớp với nó
+    fields['korean_word'] = survivor.get('korean_word')
+    fields['word_key'] = word_key(survivor.get('korean_word'))
+    fields['search_tokens'] = build_search_tokens(survivor.get('korean_word'), fields['vietnamese_meaning'], fields['hanja'])
+    return fields
+
+
+def merge_words(user_id, survivor, others):
+    """
+    Gộp `others` (dict thô từ DB, hoặc dữ liệu form chưa được lưu) vào `survivor` rồi xóa các bản đã gộp.
+    Trả về số bản đã xóa. Người gọi cập nhật lại thống kê bộ từ nếu có bản bị xóa.
+    """
+    collection = Vocabulary._get_collection()
+    removed_ids = [word['_id'] for word in others if word.get('_id') and word['_id'] != survivor['_id']]
+    fields = merged_fields(survivor, others)
+    # Revision cho bản được giữ lại và cho dấu xóa (tombstone) của từng bản bị xóa, để client đồng bộ được
+    rev = deck_stats.reserve_revisions(user_id, 1 + len(removed_ids))
+    removed = 0
+    if removed_ids:
+        # Xóa các bản đã gộp TRƯỚC khi ghi word_key cho bản được giữ lại: bản giữ lại có thể chưa có khóa
+        # (từ cũ) hoặc vừa được sửa sang khóa của bản trùng, và index unique (user, word_key) sẽ chặn
+        VocabularyTombstone._get_collection().insert_many([
+            {'user': user_id, 'word_id': word_id, 'rev': rev + offset, 'deleted_at': datetime.now()}
+            for offset, word_id in enumerate(removed_ids, start=1)
+        ])
+        removed = collection.delete_many({'_id': {'$in': removed_ids}, 'user': user_id}).deleted_count
+    collection.update_one({'_id': survivor['_id'], 'user': user_id}, {'$set': dict(fields, rev=rev)})
+    return removed
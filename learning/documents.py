@@ -1,6 +1,8 @@
 from mongoengine import Document, fields, CASCADE 
 from datetime import datetime, date # <-- Đã thêm 'date' vào import
 from django.contrib.auth.hashers import make_password, check_password
+from .schedulers import DEFAULT_SCHEDULER, SCHEDULERS
+from .hangul import build_search_tokens, word_key
 
 # --- User Document ---
 
@@ -20,6 +22,9 @@ class User(Document):
     last_login = fields.DateTimeField(default=datetime.now) 
     created_at = fields.DateTimeField(default=datetime.now)
 
+    # Thuật toán lập lịch ôn tập người dùng đã chọn (xem learning/schedulers.py)
+    scheduler = fields.StringField(default=DEFAULT_SCHEDULER, choices=tuple(SCHEDULERS))
+
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['full_name']
     
@@ -44,6 +49,18 @@ class User(Document):
     def has_module_perms(self, app_label):
         return self.is_active and self.is_superuser 
 
+    def save(self, *args, **kwargs):
+        result = super().save(*args, **kwargs)
+        # Xóa bản cache cũ để request sau đọc lại dữ liệu mới
+        from .user_cache import user_cache
+        user_cache.invalidate(self.id)
+        return result
+
+    def delete(self, *args, **kwargs):
+        from .user_cache import user_cache
+        user_cache.invalidate(self.id)
+        return super().delete(*args, **kwargs)
+
     meta = {'collection': 'users'}
 
 
@@ -65,8 +82,126 @@ class Vocabulary(Document):
     last_reviewed_at = fields.DateTimeField(default=datetime.now)
     current_interval_days = fields.IntField(default=1) 
     consecutive_correct_count = fields.IntField(default=0)
+    # Hệ số dễ của thẻ (chỉ scheduler SM-2 thay đổi giá trị này)
+    ease_factor = fields.FloatField(default=2.5)
+
+    # Khóa chuẩn hóa của korean_word, duy nhất trong bộ từ của mỗi người dùng (xem learning/dedupe.py)
+    word_key = fields.StringField()
+    # Token tìm kiếm (jamo, 초성, Hán tự, nghĩa bỏ dấu), tính lại mỗi khi lưu (xem learning/hangul.py)
+    search_tokens = fields.ListField(fields.StringField())
+    # Revision của lần ghi gần nhất (bộ đếm theo người dùng, xem learning/sync.py)
+    rev = fields.IntField()
+
+    def update_search_tokens(self):
+        self.word_key = word_key(self.korean_word)
+        self.search_tokens = build_search_tokens(self.korean_word, self.vietnamese_meaning, self.hanja)
+
+    def clean(self):
+        # Được gọi bởi validate() trong save(); insert_many (nhập file) gọi update_search_tokens() trực tiếp
+        self.update_search_tokens()
     
     meta = {
         'collection': 'vocabularies',
-        'indexes': ['user', 'next_review_date', ]
+        'indexes': [
+            # Hàng đợi ôn tập và số từ đến hạn: lọc theo user + khoảng ngày ôn tập.
+            # _id ở cuối để phân trang theo cursor (next_review_date, _id) không phải sort trong bộ nhớ.
+            ('user', 'next_review_date', 'id'),
+            # Danh sách từ vựng: lọc theo user, sắp xếp từ mới nhất, cursor (added_at, _id)
+            ('user', '-added_at', '-id'),
+            # Tìm kiếm: token (multikey) theo user, kết quả mới nhất trước không cần sort trong bộ nhớ
+            ('user', 'search_tokens', '-added_at'),
+            # Mỗi từ chỉ có một lần trong bộ từ; từ cũ chưa có word_key (trước `dedupe_vocabulary`) không bị ràng buộc
+            {
+                'fields': ('user', 'word_key'),
+                'unique': True,
+                'partialFilterExpression': {'word_key': {'$exists': True}},
+            },
+            # Đồng bộ: các thay đổi sau một revision
+            ('user', 'rev'),
+        ]
+    }
+
+
+# --- Vocabulary Tombstone Document ---
+
+class VocabularyTombstone(Document):
+    """Dấu vết của một từ vựng đã bị xóa, để API đồng bộ báo cho client xóa bản sao của nó."""
+    user = fields.ObjectIdField(required=True)
+    word_id = fields.ObjectIdField(required=True)
+    # Revision của lần xóa (cùng bộ đếm với Vocabulary.rev)
+    rev = fields.IntField(required=True)
+    deleted_at = fields.DateTimeField(default=datetime.now)
+
+    meta = {
+        'collection': 'vocabulary_tombstones',
+        'indexes': [('user', 'rev')],
     }
+
+
+# --- Deck Statistics Document ---
+
+class DeckStats(Document):
+    """
+    Thống kê bộ từ vựng của một người dùng, được cập nhật tăng dần ($inc) trong các luồng ghi
+    để Dashboard chỉ cần đọc 1 document theo khóa chính. Xem learning/deck_stats.py.
+    """
+    # _id chính là ObjectId của User
+    user_id = fields.ObjectIdField(primary_key=True)
+    total_words = fields.IntField(default=0)
+    # Số từ theo cấp độ: {'1': 10, '2': 5, ...}
+    level_counts = fields.DictField()
+    # Số từ đến hạn theo ngày: {'2026-01-31': 7, ...}
+    due_histogram = fields.DictField()
+    # Số lượt ôn và số lượt trả lời đúng theo ngày: {'2026-01-31': {'reviews': 12, 'correct': 10}, ...}
+    # (chuỗi ngày học và tỉ lệ nhớ của trang thống kê); không tính lại được từ vocabularies
+    review_days = fields.DictField()
+    # True khi document đã được tính lại đầy đủ từ collection vocabularies
+    built = fields.BooleanField(default=False)
+    rebuilt_at = fields.DateTimeField()
+    # Bộ đếm revision của bộ từ, tăng ở mỗi lần ghi từ vựng (xem deck_stats.reserve_revisions)
+    revision = fields.IntField(default=0)
+    # Thời điểm cấp revision gần nhất (Last-Modified của các trang bộ từ)
+    revised_at = fields.DateTimeField()
+    # Mốc cho watermark của đồng bộ: mọi revision <= checkpoint_revision được cấp trước checkpoint_at;
+    # settled_revision là mốc đã cũ hơn SYNC_SAFETY_LAG_SECONDS (xem deck_stats.reserve_update)
+    checkpoint_revision = fields.IntField(default=0)
+    checkpoint_at = fields.DateTimeField()
+    settled_revision = fields.IntField(default=0)
+
+    meta = {'collection': 'deck_stats'}
+
+
+# --- Session Document ---
+
+class MongoSession(Document):
+    """Session của Django lưu trong MongoDB (xem learning/sessions.py)."""
+    session_key = fields.StringField(primary_key=True)
+    # Dữ liệu session đã serialize (JSON), nén zlib nếu compressed=True
+    data = fields.BinaryField()
+    compressed = fields.BooleanField(default=False)
+    expire_date = fields.DateTimeField(required=True)
+
+    meta = {
+        'collection': 'sessions',
+        'indexes': [
+            # TTL index: MongoDB tự xóa session khi quá expire_date
+            {'fields': ['expire_date'], 'expireAfterSeconds': 0},
+        ],
+    }
+
+
+# --- Review Queue Document ---
+
+class ReviewQueue(Document):
+    """
+    Hàng đợi ôn tập phía server: danh sách id các từ đến hạn được chụp lại MỘT lần
+    khi bắt đầu buổi ôn tập, sau đó phát dần theo batch (xem learning/review_queue.py).
+    """
+    # _id chính là ObjectId của User (mỗi người dùng có 1 hàng đợi)
+    user_id = fields.ObjectIdField(primary_key=True)
+    card_ids = fields.ListField(fields.ObjectIdField())
+    # Vị trí của thẻ tiếp theo sẽ được phát trong card_ids
+    cursor = fields.IntField(default=0)
+    created_at = fields.DateTimeField(default=datetime.now)
+
+    meta = {'collection': 'review_queues'}
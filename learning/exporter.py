@@ -0,0 +1,106 @@
+# File: learning/exporter.py
+#
+# Xuất bộ từ vựng của người dùng (kèm các trường SR) ra CSV hoặc JSONL.
+# Dữ liệu được đọc bằng cursor pymongo có projection và batch_size cố định, và được sinh ra
+# theo từng khối (chunk), nên bộ nhớ sử dụng không phụ thuộc vào kích thước bộ từ.
+# Cùng một generator được dùng cho StreamingHttpResponse và lệnh export_vocabulary.
+
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from .documents import Vocabulary
+
+# Các trường được xuất, theo thứ tự cột của CSV (_id được xuất dưới tên 'id')
+EXPORT_FIELDS = (
+    'id', 'korean_word', 'hanja', 'vietnamese_meaning', 'example_sentence', 'notes', 'added_at',
+    'level', 'next_review_date', 'last_reviewed_at', 'current_interval_days', 'consecutive_correct_count', 'ease_factor',
+)
+# Các trường là DateField (lưu dạng datetime 00:00), được xuất dưới dạng YYYY-MM-DD
+DATE_FIELDS = ('next_review_date',)
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+CONTENT_TYPES = {'csv': 'text/csv; charset=utf-8', 'jsonl': 'application/x-ndjson; charset=utf-8'}
+
+# Số document mỗi lần driver lấy từ server
+EXPORT_CURSOR_BATCH_SIZE = 500
+# Kích thước tối thiểu (byte) của mỗi khối gửi đi
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def _export_value(field, value):
+    if value is None:
+        return None
+    if field in DATE_FIELDS and isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def iter_export_rows(user_id):
+    """
+    Đọc từng từ vựng của người dùng (dict theo EXPORT_FIELDS), theo thứ tự thêm vào.
+    Thứ tự (added_at, _id) đi ngược trên index (user, -added_at, -_id): không cần sort trong bộ nhớ.
+    """
+    projection = {field: True for field in EXPORT_FIELDS if field != 'id'}
+    cursor = (
+        Vocabulary._get_collection()
+        .find({'user': user_id}, projection, batch_size=EXPORT_CURSOR_BATCH_SIZE)
+        .sort([('added_at', 1), ('_id', 1)])
+    )
+    for son in cursor:
+        son['id'] = str(son.pop('_id'))
+        yield {field: _export_value(field, son.get(field)) for field in EXPORT_FIELDS}
+
+
+def _iter_lines(rows, fmt):
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+    else:
+        for row in rows:
+            yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def iter_export(user_id, fmt='csv', compress=False, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Sinh nội dung file xuất dưới dạng các khối bytes (UTF-8, gzip nếu compress=True).
+    Các dòng nhỏ được gom lại thành khối >= chunk_size để giảm số lần ghi ra socket/file.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f'Unsupported export format: {fmt}')
+
+    # wbits=31: định dạng gzip (header + CRC), nén dần từng khối
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    pending, size = [], 0
+
+    for line in _iter_lines(iter_export_rows(user_id), fmt):
+        data = line.encode('utf-8')
+        pending.append(data)
+        size += len(data)
+        if size >= chunk_size:
+            chunk = b''.join(pending)
+            pending, size = [], 0
+            if compressor:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+
+    chunk = b''.join(pending)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+
+def export_filename(fmt, compress=False, prefix='vocabulary'):
+    return f"{prefix}-{date.today().isoformat()}.{fmt}" + ('.gz' if compress else '')
@@ -2,6 +2,7 @@
 
 from django import forms
 from .documents import User
+from .schedulers import SCHEDULER_CHOICES
 from django.core.exceptions import ValidationError
 
 # ========================
@@ -89,4 +90,38 @@ class VocabularyForm(forms.Form):
         label='Ghi chú cá nhân', 
         required=False, 
         widget=forms.Textarea(attrs={'class': 'form-control', 'rows': 2})
-    )
\ No newline at end of file
+    )
+
+# ========================
+# IMPORT FORM
+# ========================
+
+class ImportVocabularyForm(forms.Form):
+    file = forms.FileField(
+        label='File từ vựng (CSV, TSV hoặc Anki "Notes in Plain Text")',
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control'})
+    )
+    format = forms.ChoiceField(
+        label='Định dạng',
+        choices=[('auto', 'Tự nhận dạng'), ('csv', 'CSV'), ('tsv', 'TSV'), ('anki', 'Anki')],
+        initial='auto',
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+
+
+# ========================
+# SCHEDULER SETTINGS FORM
+# ========================
+
+class SchedulerForm(forms.Form):
+    scheduler = forms.ChoiceField(
+        label='Thuật toán lập lịch ôn tập',
+        choices=SCHEDULER_CHOICES,
+        widget=forms.RadioSelect
+    )
+    reschedule = forms.BooleanField(
+        label='Tính lại lịch ôn tập của toàn bộ bộ từ theo thuật toán này',
+        required=False,
+        initial=True,
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
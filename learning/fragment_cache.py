@@ -0,0 +1,68 @@
+# File: learning/fragment_cache.py
+#
+# Cache HTML đã render của phần danh sách (bảng + phân trang) trên các trang danh sách từ vựng.
+# Khóa gồm người dùng, revision của bộ từ (DeckStats.revision, tăng ở mọi luồng ghi), cursor của trang
+# và các tham số khác của trang, nên một lần ghi làm các mục cũ không bao giờ được đọc lại nữa, không cần
+# xóa; các mục cũ bị loại bỏ dần theo TTL / MAX_ENTRIES của cache 'fragments' (xem CACHES trong settings).
+# Khi trúng cache, view không truy vấn từ vựng và không render lại các dòng của bảng.
+
+import hashlib
+import threading
+from django.core.cache import caches
+from django.utils.safestring import mark_safe
+from .conditional import deck_revision
+from .metrics import record_cache_lookup
+
+FRAGMENT_CACHE_ALIAS = 'fragments'
+
+
+class FragmentCache:
+    """Đọc/ghi fragment HTML trong cache của Django, kèm bộ đếm hit/miss của worker hiện tại."""
+
+    def __init__(self, alias=FRAGMENT_CACHE_ALIAS):
+        self.alias = alias
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, name, user_id, revision, *parts):
+        """Khóa của fragment; các tham số của trang được băm để khóa có độ dài cố định."""
+        digest = hashlib.sha1('\x1f'.join(str(part) for part in parts).encode()).hexdigest()[:16]
+        return f'learning:fragment:{name}:{user_id}:{revision}:{digest}'
+
+    def get_or_render(self, request, name, render, *parts):
+        """
+        Fragment `name` của người dùng hiện tại cho các tham số `parts`; gọi `render()` (trả về chuỗi HTML)
+        rồi lưu vào cache nếu chưa có. Chuỗi rỗng cũng được cache (ví dụ: không còn từ nào đến hạn).
+        """
+        revision, _ = deck_revision(request)
+        key = self.key(name, request.user.id, revision, *parts)
+        cache = caches[self.alias]
+
+        html = cache.get(key)
+        with self._lock:
+            if html is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        record_cache_lookup('fragment', html is not None)
+        if html is None:
+            html = str(render())
+            cache.set(key, html)
+        return mark_safe(html)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+
+fragment_cache = FragmentCache()
@@ -0,0 +1,123 @@
+# File: learning/hangul.py
+#
+# Xử lý văn bản cho tìm kiếm từ vựng (thuần Python, không truy vấn DB):
+#   - tách âm tiết Hangul thành jamo (한 -> ㅎㅏㄴ) để tìm theo tiền tố cả khi đang gõ dở âm tiết;
+#   - lấy phụ âm đầu (초성) của từ (한국어 -> ㅎㄱㅇ) để tìm kiểu "ㅎㄱㅇ";
+#   - bỏ dấu tiếng Việt (Quốc -> quoc) để tìm không cần gõ dấu.
+# build_search_tokens() tạo danh sách token được lưu vào Vocabulary.search_tokens khi ghi;
+# query_tokens() chuyển chuỗi tìm kiếm thành các token tương ứng.
+
+import unicodedata
+
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+
+# Jamo tương thích (Hangul Compatibility Jamo) theo thứ tự của Unicode
+CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+JUNGSEONG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+JONGSEONG = ('', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ',
+             'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ')
+# Phụ âm cuối ghép được tách thành 2 phụ âm để khớp với việc đang gõ dở (핥 = ㅎㅏㄹㅌ)
+COMPOUND_JONGSEONG = {'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ',
+                      'ㄽ': 'ㄹㅅ', 'ㄾ': 'ㄹㅌ', 'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ'}
+
+# Tiền tố của token theo loại, để các loại không trùng nhau trong cùng một index
+KOREAN = 'k:'
+INITIALS = 'c:'
+HANJA = 'h:'
+VIETNAMESE = 'v:'
+
+# Độ dài tối đa của một tiền tố được lưu (tìm kiếm dài hơn được cắt về độ dài này)
+MAX_PREFIX_LENGTH = 16
+
+
+def _is_syllable(char):
+    return HANGUL_BASE <= ord(char) <= HANGUL_LAST
+
+
+def is_hangul(char):
+    return _is_syllable(char) or 'ㄱ' <= char <= 'ㆎ' or 'ᄀ' <= char <= 'ᇿ'
+
+
+def is_hanja(char):
+    return '一' <= char <= '鿿' or '㐀' <= char <= '䶿' or '豈' <= char <= '﫿'
+
+
+def decompose(text: str) -> str:
+    """Tách các âm tiết Hangul thành jamo tương thích: '한국' -> 'ㅎㅏㄴㄱㅜㄱ'."""
+    result = []
+    for char in unicodedata.normalize('NFC', text):
+        if _is_syllable(char):
+            index = ord(char) - HANGUL_BASE
+            jongseong = JONGSEONG[index % 28]
+            result.append(CHOSEONG[index // 588] + JUNGSEONG[(index % 588) // 28] + COMPOUND_JONGSEONG.get(jongseong, jongseong))
+        else:
+            result.append(COMPOUND_JONGSEONG.get(char, char))
+    return ''.join(result)
+
+
+def initials(text: str) -> str:
+    """Phụ âm đầu (초성) của các âm tiết: '한국어' -> 'ㅎㄱㅇ'. Ký tự khác được bỏ qua."""
+    return ''.join(CHOSEONG[(ord(char) - HANGUL_BASE) // 588] for char in unicodedata.normalize('NFC', text) if _is_syllable(char))
+
+
+def word_key(korean_word: str) -> str:
+    """Khóa chuẩn hóa để phát hiện từ trùng: NFC, bỏ khoảng trắng và dấu câu, chữ thường ('한국 어!' -> '한국어')."""
+    return ''.join(char for char in unicodedata.normalize('NFC', korean_word or '') if char.isalnum()).lower()
+
+
+def fold_vietnamese(text: str) -> str:
+    """Bỏ dấu và chữ hoa: 'Tiếng Hàn Quốc' -> 'tieng han quoc'."""
+    text = unicodedata.normalize('NFD', text.lower()).replace('đ', 'd')
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+
+def _prefixes(kind, value):
+    value = value[:MAX_PREFIX_LENGTH]
+    return {kind + value[:length] for length in range(1, len(value) + 1)}
+
+
+def _words(text):
+    return [word for word in ''.join(char if char.isalnum() else ' ' for char in text).split() if word]
+
+
+def build_search_tokens(korean_word, vietnamese_meaning='', hanja='') -> list:
+    """
+    Các token tìm kiếm của một từ vựng (lưu vào Vocabulary.search_tokens, index multikey):
+    tiền tố jamo và tiền tố 초성 của từng từ tiếng Hàn, tiền tố của chữ Hán và từng chữ Hán,
+    tiền tố (n-gram từ đầu từ) của từng từ trong nghĩa tiếng Việt đã bỏ dấu.
+    """
+    tokens = set()
+    for word in _words(unicodedata.normalize('NFC', korean_word or '')):
+        tokens |= _prefixes(KOREAN, decompose(word))
+        tokens |= _prefixes(INITIALS, initials(word))
+    hanja = ''.join(char for char in unicodedata.normalize('NFC', hanja or '') if is_hanja(char))
+    tokens |= _prefixes(HANJA, hanja)
+    tokens |= {HANJA + char for char in hanja}
+    for word in _words(fold_vietnamese(vietnamese_meaning or '')):
+        tokens |= _prefixes(VIETNAMESE, word)
+    return sorted(tokens)
+
+
+def term_token(term: str):
+    """Token của một từ trong chuỗi tìm kiếm (None nếu không tìm được), theo loại ký tự của từ đó."""
+    term = unicodedata.normalize('NFC', term.strip())
+    if not term:
+        return None
+    if all(char in CHOSEONG for char in term):
+        return INITIALS + term[:MAX_PREFIX_LENGTH]
+    if any(is_hangul(char) for char in term):
+        return KOREAN + decompose(term)[:MAX_PREFIX_LENGTH]
+    if any(is_hanja(char) for char in term):
+        return HANJA + term[:MAX_PREFIX_LENGTH]
+    return VIETNAMESE + fold_vietnamese(term)[:MAX_PREFIX_LENGTH]
+
+
+def query_tokens(query: str) -> list:
+    """Các token mà một từ vựng phải có tất cả để khớp với chuỗi tìm kiếm."""
+    tokens = []
+    for term in _words(unicodedata.normalize('NFC', query or '')):
+        token = term_token(term)
+        if token and token not in tokens:
+            tokens.append(token)
+    return tokens
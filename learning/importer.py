@@ -0,0 +1,217 @@
+# File: learning/importer.py
+#
+# Nhập hàng loạt từ vựng từ file CSV / TSV / Anki (File > Export > "Notes in Plain Text").
+# File được đọc theo luồng (từng dòng), mỗi dòng được kiểm tra bằng đúng VocabularyForm,
+# bỏ qua các từ đã có trong bộ từ của người dùng, và ghi bằng insert_many theo từng batch,
+# nên bộ nhớ sử dụng không phụ thuộc vào kích thước file.
+
+import csv
+import io
+from datetime import date
+from django.utils.html import strip_tags
+from pymongo.errors import BulkWriteError
+from .documents import Vocabulary
+from .hangul import word_key
+from .forms import VocabularyForm
+from . import deck_stats
+
+# Số dòng mỗi lần insert_many
+IMPORT_BATCH_SIZE = 1000
+# Số lỗi tối đa giữ lại trong bộ nhớ để hiển thị (file lỗi đầy đủ được ghi qua on_error)
+MAX_KEPT_ERRORS = 100
+
+# Thứ tự cột mặc định khi file không có dòng tiêu đề
+DEFAULT_COLUMNS = ('korean_word', 'vietnamese_meaning', 'hanja', 'example_sentence', 'notes')
+
+# Các tên cột được chấp nhận trong dòng tiêu đề
+COLUMN_ALIASES = {
+    'korean_word': 'korean_word', 'korean': 'korean_word', 'word': 'korean_word', 'front': 'korean_word',
+    'từ tiếng hàn': 'korean_word',
+    'vietnamese_meaning': 'vietnamese_meaning', 'meaning': 'vietnamese_meaning', 'back': 'vietnamese_meaning',
+    'nghĩa tiếng việt': 'vietnamese_meaning',
+    'hanja': 'hanja', 'hán tự': 'hanja',
+    'example_sentence': 'example_sentence', 'example': 'example_sentence', 'câu ví dụ': 'example_sentence',
+    'notes': 'notes', 'note': 'notes', 'ghi chú': 'notes',
+}
+
+FORMATS = ('auto', 'csv', 'tsv', 'anki')
+
+# Mã lỗi MongoDB khi vi phạm index unique (user, word_key)
+DUPLICATE_KEY_ERROR = 11000
+
+
+class ImportWriteError(Exception):
+    """
+    Lỗi ghi MongoDB không phải do từ trùng (việc nhập dừng lại ở batch bị lỗi).
+    `report` là kết quả tới thời điểm lỗi, kể cả các từ của batch lỗi đã được ghi.
+    """
+
+    def __init__(self, report, write_errors):
+        super().__init__(write_errors[0].get('errmsg', 'Write failed'))
+        self.report = report
+        self.write_errors = write_errors
+
+
+class ImportReport:
+    """Kết quả của một lần nhập."""
+
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.duplicates = 0
+        self.invalid = 0
+        # Tối đa MAX_KEPT_ERRORS lỗi đầu tiên: (số dòng, nội dung dòng, thông báo lỗi)
+        self.errors = []
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'imported': self.imported,
+            'duplicates': self.duplicates,
+            'invalid': self.invalid,
+        }
+
+
+def _detect_format(first_line: str, filename: str = '') -> str:
+    if first_line.startswith('#'):
+        return 'anki'
+    if filename.lower().endswith(('.tsv', '.txt')) or '\t' in first_line:
+        return 'tsv'
+    return 'csv'
+
+
+def iter_rows(stream, fmt='auto', filename=''):
+    """
+    Đọc từng dòng của file, trả về (số dòng, dict theo tên trường, nội dung dòng thô).
+    Hỗ trợ dòng tiêu đề tùy chọn và các dòng header '#key:value' của Anki.
+    """
+    lines = iter(stream)
+    line_no = 0
+    pending = []
+
+    # Đọc các dòng header của Anki (#separator:tab, #html:true, #columns:...)
+    delimiter, html, columns = None, False, None
+    for line in lines:
+        line_no += 1
+        if fmt == 'auto':
+            fmt = _detect_format(line, filename)
+        if not line.startswith('#'):
+            pending.append(line)
+            break
+        key, _, value = line[1:].strip().partition(':')
+        key, value = key.strip().lower(), value.strip()
+        if key == 'separator':
+            delimiter = {'tab': '\t', 'comma': ',', 'semicolon': ';', 'pipe': '|', 'space': ' '}.get(value.lower(), value[:1])
+        elif key == 'html':
+            html = value.lower() == 'true'
+        elif key == 'columns':
+            columns = [COLUMN_ALIASES.get(column.strip().lower()) for column in value.split(delimiter or '\t')]
+
+    if delimiter is None:
+        delimiter = ',' if fmt == 'csv' else '\t'
+
+    header_lines = line_no - len(pending)
+    reader = csv.reader(_chain(pending, lines), delimiter=delimiter)
+    for cells in reader:
+        # reader.line_num đếm cả các trường nhiều dòng trong dấu ngoặc kép
+        current_line = header_lines + reader.line_num
+        if not any(cell.strip() for cell in cells):
+            continue
+
+        if columns is None:
+            # Dòng đầu tiên là tiêu đề nếu có ít nhất một tên cột được nhận ra
+            mapped = [COLUMN_ALIASES.get(cell.strip().lower()) for cell in cells]
+            if 'korean_word' in mapped:
+                columns = mapped
+                continue
+            columns = list(DEFAULT_COLUMNS)
+
+        row = {}
+        for column, cell in zip(columns, cells):
+            if column and column not in row:
+                row[column] = strip_tags(cell).strip() if html else cell.strip()
+        yield current_line, row, delimiter.join(cells)
+
+
+def _chain(first, rest):
+    yield from first
+    yield from rest
+
+
+def import_vocabulary(user_id, stream, fmt='auto', filename='', batch_size=IMPORT_BATCH_SIZE,
+                      on_error=None, on_progress=None):
+    """
+    Nhập từ vựng cho người dùng `user_id` từ `stream` (file văn bản, đọc theo dòng).
+
+    - on_error(line_no, raw_line, message): được gọi cho mỗi dòng lỗi (ví dụ: ghi file lỗi).
+    - on_progress(report): được gọi sau mỗi batch đã ghi.
+    Trả về ImportReport; ImportWriteError nếu MongoDB từ chối một lần ghi vì lý do khác trùng từ.
+    """
+    report = ImportReport()
+    collection = Vocabulary._get_collection()
+
+    # Khóa chuẩn hóa các từ đã có của người dùng (chỉ lấy korean_word) để bỏ qua từ trùng
+    existing = {word_key(doc.get('korean_word')) for doc in collection.find({'user': user_id}, {'korean_word': True})}
+
+    def record_error(line_no, raw_line, message):
+        report.invalid += 1
+        if len(report.errors) < MAX_KEPT_ERRORS:
+            report.errors.append((line_no, raw_line, message))
+        if on_error:
+            on_error(line_no, raw_line, message)
+
+    today = date.today()
+    batch = []
+
+    def flush():
+        if not batch:
+            return
+        first_rev = deck_stats.reserve_revisions(user_id, len(batch))
+        for offset, doc in enumerate(batch):
+            doc['rev'] = first_rev + offset
+        try:
+            inserted = len(collection.insert_many(batch, ordered=False).inserted_ids)
+            other_errors = []
+        except BulkWriteError as e:
+            # Từ được thêm cùng lúc từ nơi khác sau khi đọc `existing`: index unique từ chối, tính là trùng
+            inserted = e.details['nInserted']
+            other_errors = [error for error in e.details['writeErrors'] if error['code'] != DUPLICATE_KEY_ERROR]
+            report.duplicates += len(e.details['writeErrors']) - len(other_errors)
+        if inserted:
+            deck_stats.record_added(user_id, [(1, today)] * inserted)
+        report.imported += inserted
+        if other_errors:
+            raise ImportWriteError(report, other_errors)
+        batch.clear()
+        if on_progress:
+            on_progress(report)
+
+    for line_no, row, raw_line in iter_rows(stream, fmt, filename):
+        report.rows += 1
+
+        # Kiểm tra bằng đúng các quy tắc của form thêm từ
+        form = VocabularyForm(data=row)
+        if not form.is_valid():
+            message = '; '.join(f'{field}: {" ".join(errors)}' for field, errors in form.errors.items())
+            record_error(line_no, raw_line, message)
+            continue
+
+        key = word_key(form.cleaned_data['korean_word'])
+        if key in existing:
+            report.duplicates += 1
+            continue
+        existing.add(key)
+
+        word = Vocabulary(user=user_id, **form.cleaned_data)
+        word.update_search_tokens()
+        batch.append(word.to_mongo().to_dict())
+        if len(batch) >= batch_size:
+            flush()
+
+    flush()
+    return report
+
+
+def open_text(binary_file):
+    """Bọc file nhị phân (ví dụ file upload) thành luồng văn bản UTF-8 (bỏ BOM nếu có)."""
+    return io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
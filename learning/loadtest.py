@@ -0,0 +1,85 @@
+# File: learning/loadtest.py
+#
+# Công cụ tạo tải HTTP đơn giản (chỉ dùng thư viện chuẩn) để đo throughput và độ trễ
+# của các endpoint khi có nhiều request đồng thời.
+
+import http.client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+
+def percentile(sorted_values, fraction):
+    """Percentile theo phương pháp nearest-rank trên danh sách đã sắp xếp."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize_latencies(latencies, elapsed, errors=0):
+    """Tổng hợp danh sách độ trễ (giây) thành throughput và p50/p95/p99 (ms)."""
+    values = sorted(latencies)
+    return {
+        'requests': len(values),
+        'errors': errors,
+        'throughput_rps': len(values) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(values, 0.50) * 1000,
+        'p95_ms': percentile(values, 0.95) * 1000,
+        'p99_ms': percentile(values, 0.99) * 1000,
+        'max_ms': (values[-1] * 1000) if values else 0.0,
+    }
+
+
+def run_load(url, total_requests, concurrency, method='GET', headers=None, body=None, timeout=30):
+    """
+    Gửi `total_requests` request tới `url` với `concurrency` kết nối song song
+    (mỗi thread giữ một kết nối keep-alive). Trả về kết quả của `summarize_latencies`.
+    """
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    remaining = [total_requests]
+
+    def worker():
+        nonlocal errors
+        connection = connection_class(parts.netloc, timeout=timeout)
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    break
+                remaining[0] -= 1
+
+            start = time.perf_counter()
+            try:
+                connection.request(method, path, body=body, headers=headers or {})
+                response = connection.getresponse()
+                response.read()
+                ok = response.status < 500
+            except (OSError, http.client.HTTPException):
+                ok = False
+                connection.close()
+                connection = connection_class(parts.netloc, timeout=timeout)
+            latency = time.perf_counter() - start
+
+            with lock:
+                if ok:
+                    latencies.append(latency)
+                else:
+                    errors += 1
+        connection.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    elapsed = time.perf_counter() - start
+
+    return summarize_latencies(latencies, elapsed, errors)
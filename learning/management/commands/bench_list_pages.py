@@ -0,0 +1,138 @@
+# File: learning/management/commands/bench_list_pages.py
+
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from bson import BSON
+from django.core.management.base import BaseCommand, CommandError
+from django.core.cache import caches
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+import pymongo.errors
+from learning.documents import User, Vocabulary
+from learning.fragment_cache import fragment_cache
+from learning.rows import VocabularyRow
+from learning.views import PAGE_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        'So sánh CPU và số byte đọc từ MongoDB cho mỗi trang danh sách: '
+        'Document đầy đủ, projection + as_pymongo, và fragment lấy từ cache (không truy vấn).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', default=None, help='Đo trên bộ từ vựng của user này.')
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Tạo một user tạm với N từ (có notes/example_sentence dài), xóa sau khi đo.',
+        )
+        parser.add_argument('--repeat', type=int, default=50, help='Số lần lặp cho mỗi trang.')
+
+    def handle(self, *args, **options):
+        seeded_user = None
+        try:
+            if options['seed']:
+                seeded_user = self._seed(options['seed'])
+                user = seeded_user
+            elif options['email']:
+                user = User.objects(email=options['email']).first()
+                if not user:
+                    raise CommandError(f"Không tìm thấy user '{options['email']}'.")
+            else:
+                raise CommandError('Cần --email hoặc --seed N.')
+
+            pages = {
+                'vocabulary_list': (
+                    'learning/vocabulary_list.html',
+                    'learning/vocabulary_table.html',
+                    Vocabulary.objects(user=user).order_by('-added_at', '-id'),
+                ),
+                'review_session': (
+                    'learning/review_list_dashboard.html',
+                    'learning/review_list_table.html',
+                    Vocabulary.objects(user=user, next_review_date__lte=date.today()).order_by('next_review_date', 'id'),
+                ),
+            }
+
+            self.stdout.write(f"{'page':<18} {'mode':<10} {'CPU ms/page':>12} {'bytes/page':>12}")
+            for name, (template, fragment, queryset) in pages.items():
+                queryset = queryset.limit(PAGE_SIZE + 1)
+                before = self._measure(
+                    template, fragment, options['repeat'],
+                    lambda: list(queryset.clone()),
+                    queryset.as_pymongo(),
+                )
+                after = self._measure(
+                    template, fragment, options['repeat'],
+                    lambda: [VocabularyRow.from_son(son) for son in queryset.only(*VocabularyRow.FIELDS).as_pymongo()],
+                    queryset.only(*VocabularyRow.FIELDS).as_pymongo(),
+                )
+                cached = self._measure_cached(
+                    template, fragment, options['repeat'],
+                    [VocabularyRow.from_son(son) for son in queryset.only(*VocabularyRow.FIELDS).as_pymongo()],
+                )
+                self.stdout.write(f"{name:<18} {'document':<10} {before[0]:>12.2f} {before[1]:>12}")
+                self.stdout.write(f"{name:<18} {'row':<10} {after[0]:>12.2f} {after[1]:>12}")
+                self.stdout.write(f"{name:<18} {'cached':<10} {cached:>12.2f} {0:>12}")
+
+            # Bộ đếm của worker hiện tại (trong lệnh này: thường là 0, trừ khi các view đã chạy trong cùng tiến trình)
+            stats = fragment_cache.stats()
+            self.stdout.write(self.style.NOTICE(
+                f"Fragment cache: {stats['hits']} hit / {stats['misses']} miss (hit rate {stats['hit_rate']:.0%})"
+            ))
+
+        except pymongo.errors.ConnectionFailure as e:
+            raise CommandError(f'Lỗi kết nối MongoDB: Vui lòng kiểm tra MONGO_URI và kết nối mạng: {e}')
+        finally:
+            if seeded_user is not None:
+                Vocabulary.objects(user=seeded_user).delete()
+                seeded_user.delete()
+
+    def _measure(self, template, fragment, repeat, load_rows, raw_queryset):
+        """Trả về (CPU ms trung bình mỗi trang gồm truy vấn + render, số byte BSON của kết quả)."""
+        wire_bytes = sum(len(BSON.encode(son)) for son in raw_queryset)
+
+        start = time.process_time()
+        for _ in range(repeat):
+            rows_html = render_to_string(fragment, {'page_obj': load_rows(), 'total_words': 0})
+            render_to_string(template, {'rows_html': rows_html})
+        cpu_ms = (time.process_time() - start) * 1000 / repeat
+        return cpu_ms, wire_bytes
+
+    def _measure_cached(self, template, fragment, repeat, rows):
+        """CPU ms trung bình mỗi trang khi fragment có sẵn trong cache (1 lần đọc cache + render khung trang)."""
+        cache = caches[fragment_cache.alias]
+        key = f'bench:{fragment}'
+        cache.set(key, render_to_string(fragment, {'page_obj': rows, 'total_words': 0}))
+
+        start = time.process_time()
+        for _ in range(repeat):
+            render_to_string(template, {'rows_html': mark_safe(cache.get(key))})
+        cpu_ms = (time.process_time() - start) * 1000 / repeat
+        cache.delete(key)
+        return cpu_ms
+
+    def _seed(self, count):
+        """Tạo user tạm và `count` từ vựng bằng insert_many."""
+        user = User(email=f'bench-{uuid.uuid4().hex}@example.com', full_name='Benchmark')
+        user.set_password(uuid.uuid4().hex)
+        user.save()
+
+        now = datetime.now()
+        blob = 'Ghi chú dài để mô phỏng dữ liệu thật. ' * 20
+        docs = [
+            Vocabulary(
+                user=user,
+                korean_word=f'단어{i}',
+                vietnamese_meaning=f'nghĩa {i}',
+                example_sentence=blob,
+                notes=blob,
+                added_at=now - timedelta(minutes=i),
+                next_review_date=date.today() - timedelta(days=i % 30),
+            ).to_mongo()
+            for i in range(count)
+        ]
+        Vocabulary._get_collection().insert_many(docs)
+        self.stdout.write(self.style.NOTICE(f'Đã tạo {count} từ cho user tạm {user.email}.'))
+        return user
@@ -0,0 +1,110 @@
+# File: learning/management/commands/benchmark.py
+
+import json
+from datetime import datetime
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+import pymongo.errors
+from learning.benchmark import (
+    BenchmarkError, compare_results, delete_users, is_local_uri, run_benchmark, seed_users,
+)
+from learning.connection import database_name
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark đầu-cuối các route thật: tạo user tổng hợp với bộ từ lớn trong MongoDB, chạy nhiều user ảo '
+        'đồng thời (đăng nhập, danh sách, tìm kiếm, ôn tập, check), in throughput và p50/p95/p99 theo endpoint '
+        'và lưu kết quả JSON để so sánh giữa các commit.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=4, help='Số user ảo đồng thời (mỗi user một bộ từ riêng).')
+        parser.add_argument('--deck-size', type=int, default=10000, help='Số từ của mỗi user.')
+        parser.add_argument('--due-fraction', type=float, default=0.2, help='Tỉ lệ từ đến hạn ôn tập.')
+        parser.add_argument('--iterations', type=int, default=20, help='Số vòng kịch bản được đo của mỗi user.')
+        parser.add_argument('--warmup', type=int, default=1, help='Số vòng chạy trước, không được đo.')
+        parser.add_argument('--seed', type=int, default=0, help='Seed của dữ liệu và kịch bản (để tái lập).')
+        parser.add_argument(
+            '--base-url', default=None,
+            help='Gửi request qua HTTP tới server này (phải dùng cùng MongoDB); mặc định: chạy trong process.',
+        )
+        parser.add_argument(
+            '--output', default=None,
+            help='File JSON kết quả (mặc định: benchmarks/<thời gian>-<commit>.json).',
+        )
+        parser.add_argument('--compare', default=None, help='File JSON của một lần chạy trước để so sánh.')
+        parser.add_argument('--keep', action='store_true', help='Không xóa các user tổng hợp sau khi đo.')
+        parser.add_argument(
+            '--database', default=None,
+            help='Tên database của MONGO_URI, bắt buộc khi MongoDB không chạy trên máy cục bộ '
+                 '(xác nhận nơi dữ liệu tổng hợp được tạo, tránh tạo nhầm vào database production).',
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['deck_size'] < 1 or options['iterations'] < 1 or options['warmup'] < 0:
+            raise CommandError('--users, --deck-size, --iterations phải >= 1 và --warmup phải >= 0.')
+
+        # Dữ liệu tổng hợp được ghi vào database của MONGO_URI: với máy chủ từ xa, tên database phải được
+        # nêu rõ bằng --database
+        database = database_name()
+        if options['database'] is not None and options['database'] != database:
+            raise CommandError(f"--database '{options['database']}' khác database của MONGO_URI ('{database}').")
+        if options['database'] is None and not is_local_uri(settings.MONGO_URI):
+            raise CommandError(
+                f"MONGO_URI trỏ tới máy chủ MongoDB không phải máy cục bộ. Benchmark sẽ tạo dữ liệu tổng hợp "
+                f"trong database '{database}': chạy lại với --database {database} nếu đây là database dành cho benchmark."
+            )
+
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Không đọc được file so sánh '{options['compare']}': {e}")
+
+        accounts = []
+        try:
+            accounts = seed_users(
+                options['users'], options['deck_size'], options['due_fraction'], options['seed'],
+                log=lambda message: self.stdout.write(message),
+            )
+            result = run_benchmark(
+                accounts, options['iterations'], options['warmup'],
+                base_url=options['base_url'], seed=options['seed'], deck_size=options['deck_size'],
+            )
+        except pymongo.errors.ConnectionFailure as e:
+            raise CommandError(f'Lỗi kết nối MongoDB: Vui lòng kiểm tra MONGO_URI và kết nối mạng: {e}')
+        except BenchmarkError as e:
+            raise CommandError(str(e))
+        finally:
+            if accounts and not options['keep']:
+                delete_users(accounts)
+
+        self.stdout.write(
+            f"{'endpoint':<22} {'requests':>9} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}"
+        )
+        for name, row in [*result['endpoints'].items(), ('TOTAL', result['total'])]:
+            self.stdout.write(
+                f"{name:<22} {row['requests']:>9} {row['throughput_rps']:>9.1f} {row['p50_ms']:>9.1f} "
+                f"{row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['errors']:>7}"
+            )
+
+        output = options['output']
+        if output is None:
+            directory = settings.BASE_DIR / 'benchmarks'
+            directory.mkdir(exist_ok=True)
+            stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+            output = directory / f"{stamp}-{result['meta']['commit'] or 'nocommit'}.json"
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Đã lưu kết quả vào {output}'))
+
+        if baseline is not None:
+            self.stdout.write(
+                f"\nSo với {options['compare']} (commit {baseline.get('meta', {}).get('commit')}):"
+            )
+            self.stdout.write(f"{'endpoint':<22} {'metric':<15} {'old':>10} {'new':>10} {'change':>9}")
+            for name, metric, old, new, change in compare_results(baseline, result):
+                self.stdout.write(f'{name:<22} {metric:<15} {old:>10.1f} {new:>10.1f} {change:>+8.1f}%')
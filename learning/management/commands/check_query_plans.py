@@ -0,0 +1,72 @@
+# File: learning/management/commands/check_query_plans.py
+
+from datetime import date
+from bson import ObjectId
+from django.core.management.base import BaseCommand, CommandError
+import pymongo.errors
+from learning.documents import User, Vocabulary
+from learning.query_shapes import build_query_shapes
+
+# Các stage bị coi là lỗi: quét toàn bộ collection và sắp xếp trong bộ nhớ
+FORBIDDEN_STAGES = {'COLLSCAN', 'SORT'}
+
+
+def iter_plan_stages(plan):
+    """Duyệt đệ quy tất cả các stage trong một winningPlan của explain()."""
+    if not isinstance(plan, dict):
+        return
+    if 'stage' in plan:
+        yield plan['stage']
+    for key in ('inputStage', 'queryPlan', 'outerStage', 'innerStage'):
+        if key in plan:
+            yield from iter_plan_stages(plan[key])
+    for child in plan.get('inputStages', []):
+        yield from iter_plan_stages(child)
+
+
+class Command(BaseCommand):
+    help = 'Chạy explain() trên mọi dạng truy vấn của views và báo lỗi nếu có COLLSCAN hoặc SORT trong bộ nhớ.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ensure-indexes', action='store_true',
+            help='Tạo các index khai báo trong Vocabulary.meta trước khi kiểm tra.',
+        )
+        parser.add_argument(
+            '--email', default=None,
+            help='Dùng user này làm giá trị mẫu (mặc định: user đầu tiên, hoặc một ObjectId giả).',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options['ensure_indexes']:
+                Vocabulary.ensure_indexes()
+                self.stdout.write(self.style.NOTICE('Đã tạo các index của Vocabulary.'))
+
+            user = User.objects(email=options['email']).first() if options['email'] else User.objects.first()
+            user_id = user.id if user else ObjectId()
+
+            db = Vocabulary._get_db()
+            failures = []
+            for name, description, command in build_query_shapes(user_id, ObjectId(), date.today()):
+                explain = db.command('explain', command, verbosity='queryPlanner')
+                winning_plan = explain.get('queryPlanner', {}).get('winningPlan', {})
+                stages = list(iter_plan_stages(winning_plan))
+                bad_stages = sorted(FORBIDDEN_STAGES.intersection(stages))
+
+                line = f'{name:<20} {" > ".join(reversed(stages))}'
+                if bad_stages:
+                    failures.append(name)
+                    self.stdout.write(self.style.ERROR(f'❌ {line}  ({description})'))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'✅ {line}'))
+
+        except pymongo.errors.ConnectionFailure as e:
+            raise CommandError(f'Lỗi kết nối MongoDB: Vui lòng kiểm tra MONGO_URI và kết nối mạng: {e}')
+
+        if failures:
+            raise CommandError(
+                f'{len(failures)} dạng truy vấn không dùng được index: {", ".join(failures)}. '
+                'Hãy thêm index phù hợp vào Vocabulary.meta["indexes"].'
+            )
+        self.stdout.write(self.style.SUCCESS('Tất cả các dạng truy vấn đều dùng index.'))
@@ -0,0 +1,83 @@
+# File: learning/management/commands/dedupe_vocabulary.py
+
+from django.core.management.base import BaseCommand, CommandError
+import pymongo.errors
+from pymongo import UpdateOne
+from learning.documents import User, Vocabulary
+from learning.hangul import word_key
+from learning.dedupe import merge_words
+from learning import deck_stats
+
+# Số từ mỗi lần bulk_write
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Gộp các từ vựng trùng (cùng khóa chuẩn hóa) trong bộ từ của mỗi người dùng, ghi Vocabulary.word_key '
+        'cho các từ cũ và tạo index unique (user, word_key). Chạy một lần sau khi nâng cấp.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', default=None, help='Chỉ xử lý bộ từ của user này (mặc định: tất cả).')
+        parser.add_argument('--dry-run', action='store_true', help='Chỉ báo cáo các nhóm trùng, không ghi gì.')
+
+    def handle(self, *args, **options):
+        if options['email']:
+            user = User.objects(email=options['email']).first()
+            if not user:
+                raise CommandError(f"Không tìm thấy user '{options['email']}'.")
+            user_ids = [user.id]
+        else:
+            user_ids = None
+
+        try:
+            collection = Vocabulary._get_collection()
+            if user_ids is None:
+                user_ids = collection.distinct('user')
+
+            merged = removed = backfilled = 0
+            for user_id in user_ids:
+                groups = {}
+                # Từ cũ nhất trước: từ được giữ lại của mỗi nhóm là từ được thêm sớm nhất
+                cursor = collection.find({'user': user_id}, {'search_tokens': False}, batch_size=BATCH_SIZE)
+                for son in cursor.sort([('added_at', 1), ('_id', 1)]):
+                    groups.setdefault(word_key(son.get('korean_word')), []).append(son)
+
+                duplicates = {key: words for key, words in groups.items() if len(words) > 1}
+                for key, words in duplicates.items():
+                    self.stdout.write(self.style.NOTICE(
+                        f"{user_id}: '{words[0].get('korean_word')}' x{len(words)}"
+                    ))
+                merged += len(duplicates)
+                if options['dry_run']:
+                    continue
+
+                user_removed = 0
+                for words in duplicates.values():
+                    user_removed += merge_words(user_id, words[0], words[1:])
+                if user_removed:
+                    deck_stats.rebuild_deck_stats(user_id)
+                removed += user_removed
+
+                # Ghi word_key cho các từ còn lại chưa có (hoặc có khóa cũ)
+                operations = [
+                    UpdateOne({'_id': words[0]['_id']}, {'$set': {'word_key': key}})
+                    for key, words in groups.items()
+                    if key not in duplicates and words[0].get('word_key') != key
+                ]
+                for start in range(0, len(operations), BATCH_SIZE):
+                    backfilled += collection.bulk_write(operations[start:start + BATCH_SIZE], ordered=False).modified_count
+
+            if options['dry_run']:
+                self.stdout.write(self.style.WARNING(f'Chạy thử: tìm thấy {merged} nhóm từ trùng, không có thay đổi nào được ghi.'))
+                return
+
+            # Không còn từ trùng: tạo index unique (nếu chưa có)
+            Vocabulary.ensure_indexes()
+        except pymongo.errors.ConnectionFailure as e:
+            raise CommandError(f'Lỗi kết nối MongoDB: Vui lòng kiểm tra MONGO_URI và kết nối mạng: {e}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Đã gộp {merged} nhóm từ trùng (xóa {removed} từ), ghi khóa chuẩn hóa cho {backfilled} từ.'
+        ))
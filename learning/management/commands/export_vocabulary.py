@@ -0,0 +1,66 @@
+# File: learning/management/commands/export_vocabulary.py
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.core.management.base import BaseCommand, CommandError
+import pymongo.errors
+from learning.documents import User
+from learning.exporter import EXPORT_FORMATS, export_filename, iter_export
+
+
+class Command(BaseCommand):
+    help = (
+        'Xuất bộ từ vựng (kèm trường SR) của tất cả người dùng, hoặc một người dùng với --email, '
+        'ra mỗi người một file CSV/JSONL. Các người dùng được xuất song song.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', default='exports', help='Thư mục chứa các file xuất.')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='jsonl')
+        parser.add_argument('--gzip', action='store_true', help='Nén gzip các file xuất.')
+        parser.add_argument('--email', default=None, help='Chỉ xuất bộ từ của user này.')
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Số thread xuất đồng thời (MongoClient dùng chung, an toàn giữa các thread).',
+        )
+
+    def handle(self, *args, **options):
+        os.makedirs(options['output_dir'], exist_ok=True)
+        start = time.perf_counter()
+
+        try:
+            users = User.objects(email=options['email']) if options['email'] else User.objects
+            # Chỉ cần _id và email để đặt tên file
+            users = [(user['_id'], user['email']) for user in users.only('email').as_pymongo()]
+            if options['email'] and not users:
+                raise CommandError(f"Không tìm thấy user '{options['email']}'.")
+
+            total_bytes = 0
+            with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+                futures = {
+                    pool.submit(self._export_user, user_id, options): email
+                    for user_id, email in users
+                }
+                for future in as_completed(futures):
+                    path, size = future.result()
+                    total_bytes += size
+                    self.stdout.write(f'{futures[future]}: {path} ({size} bytes)')
+        except pymongo.errors.ConnectionFailure as e:
+            raise CommandError(f'Lỗi kết nối MongoDB: Vui lòng kiểm tra MONGO_URI và kết nối mạng: {e}')
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Đã xuất {len(users)} người dùng ({total_bytes} bytes) vào {options["output_dir"]} trong {elapsed:.1f}s.'
+        ))
+
+    def _export_user(self, user_id, options):
+        """Ghi bộ từ của một người dùng ra file; trả về (đường dẫn, số byte đã ghi)."""
+        filename = export_filename(options['format'], options['gzip'], prefix=f'vocabulary-{user_id}')
+        path = os.path.join(options['output_dir'], filename)
+        size = 0
+        with open(path, 'wb') as output:
+            for chunk in iter_export(user_id, options['format'], options['gzip']):
+                output.write(chunk)
+                size += len(chunk)
+        return path, size
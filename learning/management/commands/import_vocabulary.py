@@ -0,0 +1,66 @@
+# File: learning/management/commands/import_vocabulary.py
+
+import csv
+import time
+from django.core.management.base import BaseCommand, CommandError
+import pymongo.errors
+from learning.documents import User
+from learning.importer import FORMATS, IMPORT_BATCH_SIZE, ImportWriteError, import_vocabulary
+
+
+class Command(BaseCommand):
+    help = 'Nhập hàng loạt từ vựng cho một người dùng từ file CSV / TSV / Anki (đọc theo luồng).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Đường dẫn file cần nhập.')
+        parser.add_argument('--email', required=True, help='Email của người dùng nhận bộ từ.')
+        parser.add_argument('--format', choices=FORMATS, default='auto')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help='Số từ mỗi lần insert_many.')
+        parser.add_argument('--errors-file', default=None, help='Ghi các dòng lỗi ra file CSV này.')
+
+    def handle(self, *args, **options):
+        user = User.objects(email=options['email']).first()
+        if not user:
+            raise CommandError(f"Không tìm thấy user '{options['email']}'.")
+
+        errors_file = open(options['errors_file'], 'w', newline='', encoding='utf-8') if options['errors_file'] else None
+        error_writer = None
+        if errors_file:
+            error_writer = csv.writer(errors_file)
+            error_writer.writerow(['line', 'content', 'error'])
+
+        start = time.perf_counter()
+
+        def on_progress(report):
+            self.stdout.write(
+                f'... {report.rows} dòng, đã thêm {report.imported} '
+                f'({report.imported / (time.perf_counter() - start):.0f} từ/giây)'
+            )
+
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                report = import_vocabulary(
+                    user.id, stream,
+                    fmt=options['format'],
+                    filename=options['path'],
+                    batch_size=options['batch_size'],
+                    on_error=(lambda *error: error_writer.writerow(error)) if error_writer else None,
+                    on_progress=on_progress,
+                )
+        except OSError as e:
+            raise CommandError(f'Không đọc được file: {e}')
+        except pymongo.errors.ConnectionFailure as e:
+            raise CommandError(f'Lỗi kết nối MongoDB: Vui lòng kiểm tra MONGO_URI và kết nối mạng: {e}')
+        except ImportWriteError as e:
+            raise CommandError(f'Lỗi ghi dữ liệu sau khi đã thêm {e.report.imported} từ, việc nhập đã dừng lại: {e}')
+        finally:
+            if errors_file:
+                errors_file.close()
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {report.rows} dòng trong {elapsed:.1f}s: thêm {report.imported}, '
+            f'trùng {report.duplicates}, lỗi {report.invalid}.'
+        ))
+        if report.invalid and options['errors_file']:
+            self.stdout.write(self.style.WARNING(f"Các dòng lỗi đã được ghi vào {options['errors_file']}."))
@@ -0,0 +1,50 @@
+# File: learning/management/commands/loadtest.py
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from learning.loadtest import run_load
+
+# Cặp endpoint đồng bộ / bất đồng bộ tương ứng
+ENDPOINT_PAIRS = [
+    ('home', '/', '/async/'),
+    ('review_session', '/review/', '/async/review/'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Tạo tải HTTP lên server đang chạy và so sánh khả năng phục vụ request đồng thời '
+        'của các view đồng bộ với các view async (ví dụ: gunicorn gthread và gunicorn + UvicornWorker).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:10000', help='Địa chỉ server cần đo.')
+        parser.add_argument(
+            '--async-base-url', default=None,
+            help='Địa chỉ server ASGI cho các view async (mặc định: giống --base-url).',
+        )
+        parser.add_argument('--session', required=True, help='Giá trị cookie session của một user đã đăng nhập.')
+        parser.add_argument('--concurrency', default='8,32,128', help='Các mức đồng thời, phân cách bằng dấu phẩy.')
+        parser.add_argument('--requests', type=int, default=500, help='Số request cho mỗi lần đo.')
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options['concurrency'].split(',')]
+        except ValueError:
+            raise CommandError('--concurrency phải là danh sách số nguyên, ví dụ 8,32,128.')
+
+        sync_base = options['base_url'].rstrip('/')
+        async_base = (options['async_base_url'] or options['base_url']).rstrip('/')
+        headers = {'Cookie': f"{settings.SESSION_COOKIE_NAME}={options['session']}"}
+
+        self.stdout.write(
+            f"{'endpoint':<16} {'mode':<6} {'conc':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}"
+        )
+        for name, sync_path, async_path in ENDPOINT_PAIRS:
+            for level in levels:
+                for mode, url in (('sync', sync_base + sync_path), ('async', async_base + async_path)):
+                    result = run_load(url, options['requests'], level, headers=headers)
+                    self.stdout.write(
+                        f"{name:<16} {mode:<6} {level:>5} {result['throughput_rps']:>9.1f} "
+                        f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f} {result['errors']:>7}"
+                    )
@@ -0,0 +1,100 @@
+# File: learning/management/commands/measure_startup.py
+
+import json
+import statistics
+import subprocess
+import sys
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Chạy trong một tiến trình Python mới (khởi động lạnh), in ra thời gian từng bước dưới dạng JSON
+PROBE = r'''
+import json, os, sys, time
+start = time.perf_counter()
+path, warm = sys.argv[1], sys.argv[2] == '1'
+timings = {}
+
+import django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+timings['django_setup_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+from learning import connection
+if warm:
+    timings.update(connection.preload())
+    timings.update(connection.warm_up())
+
+from django.conf import settings
+from django.test import Client
+if '*' not in settings.ALLOWED_HOSTS and 'testserver' not in settings.ALLOWED_HOSTS:
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+client = Client()
+for name in ('first_request_ms', 'second_request_ms'):
+    request_start = time.perf_counter()
+    response = client.get(path)
+    timings[name] = round((time.perf_counter() - request_start) * 1000, 1)
+    if response.status_code >= 500:
+        sys.exit(f'{path} trả về {response.status_code}')
+
+timings['ready_ms'] = round((time.perf_counter() - start) * 1000, 1)
+print(json.dumps(timings))
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        'Đo thời gian khởi động lạnh của một tiến trình ứng dụng (django.setup, nạp trước, kết nối MongoDB, '
+        'request đầu tiên), có và không có bước warm-up của worker (learning/connection.py).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Số tiến trình được khởi động cho mỗi chế độ.')
+        parser.add_argument('--path', default='/login/', help='URL của request đầu tiên.')
+        parser.add_argument('--json', action='store_true', help='In kết quả thô dạng JSON.')
+        parser.add_argument(
+            '--mode', choices=('lazy', 'warm-up', 'both'), default='both',
+            help="Chế độ được đo; 'lazy' không cần MongoDB nếu request đầu tiên không truy vấn database.",
+        )
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError('--runs phải >= 1.')
+
+        results = {}
+        for mode, warm in (('lazy', False), ('warm-up', True)):
+            if options['mode'] not in (mode, 'both'):
+                continue
+            results[mode] = [self._probe(options['path'], warm) for _ in range(options['runs'])]
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(f"{'mode':<8} {'phase':<20} {'median ms':>10} {'min ms':>9} {'max ms':>9}")
+        for mode, runs in results.items():
+            for phase in runs[0]:
+                values = [run[phase] for run in runs]
+                self.stdout.write(
+                    f'{mode:<8} {phase:<20} {statistics.median(values):>10.1f} {min(values):>9.1f} {max(values):>9.1f}'
+                )
+
+    def _probe(self, path, warm):
+        """Khởi động một tiến trình mới; trả về thời gian từng bước, kèm thời gian của cả tiến trình (process_ms)."""
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, '-c', PROBE, path, '1' if warm else '0'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        process_ms = round((time.perf_counter() - start) * 1000, 1)
+        if completed.returncode != 0:
+            error = completed.stderr.strip().splitlines()[-1:] or ['']
+            if error[0].startswith('pymongo.errors.'):
+                raise CommandError(f'Lỗi kết nối MongoDB: Vui lòng kiểm tra MONGO_URI và kết nối mạng: {error[0]}')
+            raise CommandError(f'Tiến trình đo bị lỗi:\n{completed.stderr.strip()[-2000:]}')
+        try:
+            timings = json.loads(completed.stdout.strip().splitlines()[-1])
+        except (IndexError, ValueError):
+            raise CommandError(f'Không đọc được kết quả của tiến trình đo:\n{completed.stdout[-2000:]}')
+        timings['process_ms'] = process_ms
+        return timings
@@ -0,0 +1,29 @@
+# File: learning/management/commands/rebuild_deck_stats.py
+
+from django.core.management.base import BaseCommand, CommandError
+import pymongo.errors
+from learning.documents import User
+from learning.deck_stats import rebuild_deck_stats
+
+
+class Command(BaseCommand):
+    help = 'Tính lại thống kê bộ từ (DeckStats) từ collection vocabularies để sửa sai lệch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', default=None, help='Chỉ tính lại cho user này (mặc định: tất cả).')
+
+    def handle(self, *args, **options):
+        try:
+            users = User.objects(email=options['email']) if options['email'] else User.objects
+            rebuilt = 0
+            for user_id in users.scalar('id'):
+                stats = rebuild_deck_stats(user_id)
+                rebuilt += 1
+                self.stdout.write(f"{user_id}: {stats['total_words']} từ")
+
+        except pymongo.errors.ConnectionFailure as e:
+            raise CommandError(f'Lỗi kết nối MongoDB: Vui lòng kiểm tra MONGO_URI và kết nối mạng: {e}')
+
+        if options['email'] and not rebuilt:
+            raise CommandError(f"Không tìm thấy user '{options['email']}'.")
+        self.stdout.write(self.style.SUCCESS(f'✅ Đã tính lại thống kê cho {rebuilt} người dùng.'))
@@ -0,0 +1,49 @@
+# File: learning/management/commands/rebuild_search_index.py
+
+from django.core.management.base import BaseCommand, CommandError
+import pymongo.errors
+from pymongo import UpdateOne
+from learning.documents import User, Vocabulary
+from learning.hangul import build_search_tokens
+
+# Số từ mỗi lần bulk_write
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Tính lại token tìm kiếm (Vocabulary.search_tokens) cho các từ vựng đã có, ví dụ sau khi nâng cấp.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', default=None, help='Chỉ xử lý bộ từ của user này (mặc định: tất cả).')
+
+    def handle(self, *args, **options):
+        query = {}
+        if options['email']:
+            user = User.objects(email=options['email']).first()
+            if not user:
+                raise CommandError(f"Không tìm thấy user '{options['email']}'.")
+            query['user'] = user.id
+
+        try:
+            # Đảm bảo index tìm kiếm tồn tại trước khi các truy vấn dùng đến
+            Vocabulary.ensure_indexes()
+            collection = Vocabulary._get_collection()
+            operations, updated = [], 0
+            cursor = collection.find(
+                query, {'korean_word': True, 'vietnamese_meaning': True, 'hanja': True, 'search_tokens': True},
+                batch_size=BATCH_SIZE,
+            )
+            for son in cursor:
+                tokens = build_search_tokens(son.get('korean_word'), son.get('vietnamese_meaning'), son.get('hanja'))
+                if son.get('search_tokens') == tokens:
+                    continue
+                operations.append(UpdateOne({'_id': son['_id']}, {'$set': {'search_tokens': tokens}}))
+                if len(operations) >= BATCH_SIZE:
+                    updated += collection.bulk_write(operations, ordered=False).modified_count
+                    operations = []
+            if operations:
+                updated += collection.bulk_write(operations, ordered=False).modified_count
+        except pymongo.errors.ConnectionFailure as e:
+            raise CommandError(f'Lỗi kết nối MongoDB: Vui lòng kiểm tra MONGO_URI và kết nối mạng: {e}')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Đã cập nhật token tìm kiếm cho {updated} từ.'))
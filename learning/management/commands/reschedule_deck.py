@@ -0,0 +1,40 @@
+# File: learning/management/commands/reschedule_deck.py
+
+import time
+from django.core.management.base import BaseCommand, CommandError
+import pymongo.errors
+from learning.documents import User
+from learning.schedulers import SCHEDULERS, get_scheduler
+from learning.sr_logic import reschedule_deck
+
+
+class Command(BaseCommand):
+    help = (
+        'Tính lại lịch ôn tập của toàn bộ bộ từ theo một thuật toán lập lịch (vector hóa bằng NumPy). '
+        'Với --scheduler, thuật toán của người dùng cũng được đổi sang thuật toán đó.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', default=None, help='Chỉ xử lý user này (mặc định: tất cả).')
+        parser.add_argument('--scheduler', choices=tuple(SCHEDULERS), default=None,
+                            help='Đổi sang thuật toán này trước khi tính lại (mặc định: giữ thuật toán hiện tại).')
+
+    def handle(self, *args, **options):
+        try:
+            users = User.objects(email=options['email']) if options['email'] else User.objects
+            if options['email'] and not users.first():
+                raise CommandError(f"Không tìm thấy user '{options['email']}'.")
+
+            for user in users:
+                if options['scheduler'] and user.scheduler != options['scheduler']:
+                    user.scheduler = options['scheduler']
+                    user.save()
+                start = time.perf_counter()
+                updated = reschedule_deck(user.id, get_scheduler(user.scheduler))
+                self.stdout.write(
+                    f'{user.email}: {user.scheduler}, cập nhật {updated} từ ({time.perf_counter() - start:.2f}s)'
+                )
+        except pymongo.errors.ConnectionFailure as e:
+            raise CommandError(f'Lỗi kết nối MongoDB: Vui lòng kiểm tra MONGO_URI và kết nối mạng: {e}')
+
+        self.stdout.write(self.style.SUCCESS('✅ Đã tính lại lịch ôn tập.'))
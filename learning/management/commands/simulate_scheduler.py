@@ -0,0 +1,69 @@
+# File: learning/management/commands/simulate_scheduler.py
+
+import json
+from django.core.management.base import BaseCommand, CommandError
+from learning.schedulers import SCHEDULERS
+from learning.simulation import Deck, ForgettingCurveModel, simulate, summarize_simulation
+from learning.sr_logic import WRITES_PER_REVIEW
+
+
+class Command(BaseCommand):
+    help = (
+        'Mô phỏng offline (không cần MongoDB) số lượt ôn tập mỗi ngày, tỉ lệ nhớ và tốc độ cập nhật '
+        'của các thuật toán lập lịch trên một bộ từ tổng hợp hoặc một file xuất (export_vocabulary).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scheduler', action='append', choices=tuple(SCHEDULERS),
+                            help='Thuật toán cần mô phỏng (lặp lại để so sánh; mặc định: tất cả).')
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument('--deck', default=None, help='File CSV/JSONL(.gz) đã xuất; mặc định dùng bộ từ tổng hợp.')
+        parser.add_argument('--cards', type=int, default=5000, help='Số thẻ của bộ từ tổng hợp.')
+        parser.add_argument('--new-per-day', type=int, default=20, help='Số thẻ mới mỗi ngày của bộ từ tổng hợp.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--growth', type=float, default=2.5, help='Mức tăng độ bền trí nhớ sau mỗi lần nhớ đúng.')
+        parser.add_argument('--lapse', type=float, default=0.3, help='Hệ số độ bền còn lại sau khi quên.')
+        parser.add_argument('--load-balance', action='store_true', help='Bật cân bằng tải ngày ôn tập (SR_LOAD_BALANCING).')
+        parser.add_argument('--json', dest='json_path', default=None, help='Ghi kết quả (kèm số lượt ôn theo ngày) ra file JSON.')
+
+    def handle(self, *args, **options):
+        model = ForgettingCurveModel(growth=options['growth'], lapse=options['lapse'])
+        results = []
+
+        for name in options['scheduler'] or tuple(SCHEDULERS):
+            try:
+                if options['deck']:
+                    deck = Deck.from_export(options['deck'])
+                else:
+                    deck = Deck.synthetic(options['cards'], options['new_per_day'], model)
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f'Không đọc được bộ từ: {e}')
+
+            result = simulate(
+                deck, SCHEDULERS[name], options['days'], model,
+                seed=options['seed'], load_balance=options['load_balance'],
+            )
+            summary = summarize_simulation(result)
+            results.append((summary, result))
+
+            self.stdout.write(self.style.NOTICE(f"== {name}: {summary['cards']} thẻ, {summary['days']} ngày"))
+            self.stdout.write(
+                f"  Lượt ôn/ngày: TB {summary['reviews_per_day_mean']:.1f}, p95 {summary['reviews_per_day_p95']:.0f}, "
+                f"tối đa {summary['reviews_per_day_max']} (tổng {summary['total_reviews']})"
+            )
+            self.stdout.write(
+                f"  Ghi MongoDB/ngày (ước tính): TB {summary['reviews_per_day_mean'] * WRITES_PER_REVIEW:.0f}, "
+                f"tối đa {summary['reviews_per_day_max'] * WRITES_PER_REVIEW}"
+            )
+            self.stdout.write(f"  Độ lệch lượt ôn giữa các ngày (độ lệch chuẩn): {result['reviews'].std():.1f}")
+            self.stdout.write(f"  Tỉ lệ nhớ: {summary['retention']:.1%}")
+            self.stdout.write(f"  Tốc độ scheduler: {summary['updates_per_second']:,.0f} cập nhật/giây")
+            self.stdout.write(f"  Phân bố cấp độ cuối: {summary['level_counts']}")
+
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as output:
+                json.dump([
+                    dict(summary, daily_reviews=result['reviews'].tolist(), daily_correct=result['correct'].tolist())
+                    for summary, result in results
+                ], output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"✅ Đã ghi kết quả vào {options['json_path']}."))
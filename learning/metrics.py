@@ -0,0 +1,187 @@
+# File: learning/metrics.py
+#
+# Số đo dạng Prometheus, được gộp trên tất cả các worker của Gunicorn qua chế độ multiprocess
+# của prometheus_client: mỗi worker ghi giá trị vào file trong PROMETHEUS_MULTIPROC_DIR
+# (được đặt trong gunicorn_config.py TRƯỚC khi import prometheus_client), và /metrics đọc gộp tất cả.
+# Khi không có biến môi trường này (runserver, manage.py), số đo chỉ của tiến trình hiện tại.
+#
+#   - request: số request và histogram thời gian theo tên URL (url_name), phương thức và mã trạng thái;
+#   - pool kết nối MongoDB (pymongo ConnectionPoolListener): số lần lấy kết nối, thời gian chờ,
+#     số lần lấy thất bại, số kết nối đang dùng / đang mở và maxPoolSize của mỗi pool;
+#   - cache: số lần hit/miss của fragment cache và user cache (tỉ lệ hit = hit / (hit + miss));
+#   - ôn tập: số kết quả ôn tập đã ghi theo nguồn (rate() cho số lần ôn mỗi giây).
+#
+# Listener của pool phải được đăng ký (register_pool_listener) trước khi tạo MongoClient, giống
+# register_command_listener (xem learning/connection.py). Module này không import model của Django.
+
+import os
+import threading
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from prometheus_client import Counter, Gauge, Histogram
+from pymongo import monitoring
+
+HTTP_REQUESTS = Counter(
+    'srs_http_requests_total', 'Số request HTTP đã xử lý.', ['view', 'method', 'status'],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    'srs_http_request_duration_seconds', 'Thời gian xử lý request HTTP (giây).', ['view', 'method'],
+)
+
+MONGO_POOL_CHECKOUTS = Counter(
+    'srs_mongo_pool_checkouts_total', 'Số lần lấy kết nối từ pool MongoDB.', ['address'],
+)
+MONGO_POOL_CHECKOUT_FAILURES = Counter(
+    'srs_mongo_pool_checkout_failures_total', 'Số lần lấy kết nối từ pool thất bại (hết thời gian chờ, lỗi kết nối).',
+    ['address', 'reason'],
+)
+MONGO_POOL_CHECKOUT_WAIT = Histogram(
+    'srs_mongo_pool_checkout_wait_seconds', 'Thời gian chờ lấy kết nối từ pool MongoDB (giây).', ['address'],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+# Gauge 'livesum': tổng trên các worker đang sống
+MONGO_POOL_IN_USE = Gauge(
+    'srs_mongo_pool_connections_in_use', 'Số kết nối MongoDB đang được dùng.', ['address'],
+    multiprocess_mode='livesum',
+)
+MONGO_POOL_OPEN = Gauge(
+    'srs_mongo_pool_connections_open', 'Số kết nối MongoDB đang mở trong pool.', ['address'],
+    multiprocess_mode='livesum',
+)
+MONGO_POOL_MAX_SIZE = Gauge(
+    'srs_mongo_pool_max_size', 'maxPoolSize của các pool MongoDB.', ['address'],
+    multiprocess_mode='livesum',
+)
+
+CACHE_LOOKUPS = Counter(
+    'srs_cache_lookups_total', 'Số lần tra cache theo kết quả (hit/miss).', ['cache', 'result'],
+)
+
+# Phương thức HTTP được giữ nguyên trong nhãn; phương thức khác (do client tùy ý gửi) gộp thành 'other'
+# để số chuỗi thời gian không tăng theo request
+HTTP_METHODS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'))
+
+REVIEW_SUBMISSIONS = Counter(
+    'srs_review_submissions_total', 'Số kết quả ôn tập đã được ghi.', ['source'],
+)
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def record_reviews(source: str, count: int = 1):
+    if count:
+        REVIEW_SUBMISSIONS.labels(source).inc(count)
+
+
+def _address(event):
+    host, port = event.address
+    return f'{host}:{port}'
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Chuyển các sự kiện pool kết nối của pymongo thành số đo Prometheus."""
+
+    def __init__(self):
+        # Việc lấy kết nối diễn ra đồng bộ trên thread gọi lệnh: lưu thời điểm bắt đầu theo thread
+        self._local = threading.local()
+
+    def pool_created(self, event):
+        MONGO_POOL_MAX_SIZE.labels(_address(event)).set(event.options.get('maxPoolSize') or 0)
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        MONGO_POOL_MAX_SIZE.labels(_address(event)).set(0)
+
+    def connection_created(self, event):
+        MONGO_POOL_OPEN.labels(_address(event)).inc()
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        MONGO_POOL_OPEN.labels(_address(event)).dec()
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def _wait(self, event):
+        started = getattr(self._local, 'started', None)
+        self._local.started = None
+        if started is not None:
+            MONGO_POOL_CHECKOUT_WAIT.labels(_address(event)).observe(time.perf_counter() - started)
+
+    def connection_check_out_failed(self, event):
+        self._wait(event)
+        MONGO_POOL_CHECKOUT_FAILURES.labels(_address(event), str(event.reason)).inc()
+
+    def connection_checked_out(self, event):
+        self._wait(event)
+        address = _address(event)
+        MONGO_POOL_CHECKOUTS.labels(address).inc()
+        MONGO_POOL_IN_USE.labels(address).inc()
+
+    def connection_checked_in(self, event):
+        MONGO_POOL_IN_USE.labels(_address(event)).dec()
+
+
+_registered = False
+
+
+def register_pool_listener():
+    """Đăng ký listener pool toàn cục của pymongo (một lần). Gọi trước khi tạo MongoClient."""
+    global _registered
+    if not _registered:
+        monitoring.register(PoolMetricsListener())
+        _registered = True
+
+
+def multiprocess_enabled():
+    return bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+
+def exposition():
+    """(nội dung, content type) của trang /metrics, gộp các worker khi chạy ở chế độ multiprocess."""
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest, multiprocess
+
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class PrometheusMiddleware:
+    """Đếm request và đo thời gian xử lý theo tên URL (không theo path, để số nhãn không tăng theo id)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        return self._observe(request, response, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        return self._observe(request, response, time.perf_counter() - start)
+
+    def _observe(self, request, response, duration):
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name or match.url_name) if match else 'unmatched'
+        method = request.method if request.method in HTTP_METHODS else 'other'
+        HTTP_REQUEST_DURATION.labels(view, method).observe(duration)
+        HTTP_REQUESTS.labels(view, method, str(response.status_code)).inc()
+        return response
@@ -2,6 +2,7 @@
 
 from django.utils.deprecation import MiddlewareMixin
 from django.contrib.auth import SESSION_KEY, BACKEND_SESSION_KEY
+from django.middleware.csrf import rotate_token
 from .auth_backend import CustomMongoEngineBackend
 from .documents import User
 from django.utils.functional import SimpleLazyObject
@@ -48,6 +49,25 @@ def get_user_from_session(request):
                 
     return request._cached_user
 
+def login_user(request, user, backend='learning.auth_backend.CustomMongoEngineBackend'):
+    """
+    Tương đương django.contrib.auth.login cho User Document của MongoEngine
+    (hàm login chuẩn cần user._meta.pk của Django Model nên không dùng được).
+    """
+    if request.session.get(SESSION_KEY, str(user.id)) != str(user.id):
+        # Phiên của người dùng khác: xóa toàn bộ dữ liệu cũ
+        request.session.flush()
+    else:
+        # Đổi session key để tránh session fixation
+        request.session.cycle_key()
+
+    request.session[SESSION_KEY] = str(user.id)
+    request.session[BACKEND_SESSION_KEY] = backend
+    request.user = user
+    request._cached_user = user
+    rotate_token(request)
+
+
 class CustomAuthMiddleware(MiddlewareMixin):
     """
     Middleware thay thế request.user bằng User Document từ MongoEngine,
@@ -0,0 +1,140 @@
+# File: learning/pagination.py
+#
+# Phân trang theo khóa (keyset / cursor) cho QuerySet MongoEngine.
+# Thay vì count() + skip(n * per_page), mỗi trang chỉ lọc "sau (giá trị, _id) cuối cùng"
+# trên index (user, field, _id), nên trang sâu tốn chi phí như trang đầu.
+
+import base64
+import json
+from datetime import date, datetime
+from bson import ObjectId
+
+# Hướng của cursor: trang sau / trang trước
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+def encode_cursor(value, object_id, direction=NEXT):
+    """Mã hóa (giá trị sắp xếp, _id, hướng) thành chuỗi an toàn cho URL."""
+    if isinstance(value, date) and not isinstance(value, datetime):
+        # DateField được lưu trong MongoDB dưới dạng datetime lúc 00:00
+        value = datetime(value.year, value.month, value.day)
+    payload = json.dumps([value.isoformat(), str(object_id), direction], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Giải mã cursor. Ném ValueError nếu cursor không hợp lệ."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, object_id, direction = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if direction not in (NEXT, PREVIOUS):
+            raise ValueError(direction)
+        return datetime.fromisoformat(value), ObjectId(object_id), direction
+    except Exception as e:
+        raise ValueError(f'Invalid cursor: {cursor}') from e
+
+
+class KeysetPage:
+    """Một trang kết quả, dùng trong template tương tự Page của Django."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+class KeysetQuery:
+    """
+    Phần điều kiện lọc và thứ tự sắp xếp của một trang, tách khỏi QuerySet để dùng được
+    cả với MongoEngine (đồng bộ) lẫn driver bất đồng bộ (async views).
+    """
+
+    def __init__(self, cursor, field, descending=False):
+        try:
+            value, object_id, direction = decode_cursor(cursor) if cursor else (None, None, NEXT)
+        except ValueError:
+            cursor, value, object_id, direction = None, None, None, NEXT
+
+        self.cursor = cursor
+        self.field = field
+        self.direction = direction
+
+        # Đi lùi (trang trước) = đảo chiều sắp xếp rồi đảo lại kết quả
+        self.ascending = descending == (direction == PREVIOUS)
+        comparison = '$gt' if self.ascending else '$lt'
+
+        self.filter = {}
+        if cursor:
+            self.filter = {'$or': [
+                {field: {comparison: value}},
+                {field: value, '_id': {comparison: object_id}},
+            ]}
+
+    @property
+    def sort(self):
+        """Thứ tự sắp xếp dạng pymongo: [(field, ±1), ('_id', ±1)]."""
+        order = 1 if self.ascending else -1
+        return [(self.field, order), ('_id', order)]
+
+    def build_page(self, rows, per_page):
+        """Tạo KeysetPage từ tối đa per_page + 1 dòng đã đọc theo `sort`."""
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        if self.direction == PREVIOUS:
+            rows.reverse()
+
+        if not rows:
+            return KeysetPage(rows)
+
+        first, last = rows[0], rows[-1]
+        if self.direction == PREVIOUS:
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, self.cursor is not None
+
+        return KeysetPage(
+            rows,
+            next_cursor=encode_cursor(getattr(last, self.field), last.id, NEXT) if has_next else None,
+            previous_cursor=encode_cursor(getattr(first, self.field), first.id, PREVIOUS) if has_previous else None,
+        )
+
+
+def paginate_by_keyset(request, queryset, field, descending=False, per_page=20, row_class=None):
+    """
+    Phân trang `queryset` theo cặp khóa (field, _id).
+    Cursor được đọc từ tham số `?cursor=`; cursor không hợp lệ sẽ quay về trang đầu.
+
+    Nếu có `row_class` (ví dụ `VocabularyRow`), chỉ các trường `row_class.FIELDS` được đọc
+    bằng as_pymongo() và mỗi dòng là một `row_class`, thay vì một Document đầy đủ.
+    """
+    query = KeysetQuery(request.GET.get('cursor'), field, descending)
+    if query.filter:
+        queryset = queryset.filter(__raw__=query.filter)
+
+    # Lấy thêm 1 bản ghi để biết còn trang tiếp theo theo hướng đang đi hay không
+    sign = '+' if query.ascending else '-'
+    queryset = queryset.order_by(f'{sign}{field}', f'{sign}id').limit(per_page + 1)
+    if row_class is not None:
+        rows = [row_class.from_son(son) for son in queryset.only(*row_class.FIELDS).as_pymongo()]
+    else:
+        rows = list(queryset)
+
+    return query.build_page(rows, per_page)
@@ -0,0 +1,151 @@
+# File: learning/query_shapes.py
+#
+# Danh sách các "dạng truy vấn" (query shape) mà views gửi tới MongoDB.
+# Lệnh `manage.py check_query_plans` chạy explain() trên từng dạng để phát hiện
+# COLLSCAN hoặc SORT trong bộ nhớ. Khi thêm truy vấn mới vào views, hãy thêm dạng tương ứng ở đây.
+
+from bson import SON
+from .documents import Vocabulary, VocabularyTombstone
+from .search import SEARCH_RESULT_LIMIT
+from .sync import SYNC_PAGE_SIZE
+from .sr_logic import to_mongo_date
+
+# Số từ mỗi trang của các trang danh sách
+PAGE_SIZE = 20
+
+
+def build_query_shapes(user_id, word_id, today):
+    """
+    Trả về danh sách (tên, mô tả, lệnh) với giá trị mẫu cho các tham số.
+    Lệnh ở dạng thô (find/count) để có thể bọc trong lệnh `explain`.
+    """
+    collection = Vocabulary._get_collection_name()
+    today = to_mongo_date(today)
+
+    return [
+        (
+            'deck_stats_rebuild',
+            'deck_stats.rebuild_deck_stats: $match theo user trước $facet (home_view khi chưa có thống kê)',
+            SON([('find', collection), ('filter', {'user': user_id}), ('projection', {'level': 1, 'next_review_date': 1})]),
+        ),
+        (
+            'review_session',
+            'review_session: trang đầu danh sách từ cần ôn tập',
+            SON([
+                ('find', collection),
+                ('filter', {'user': user_id, 'next_review_date': {'$lte': today}}),
+                ('sort', SON([('next_review_date', 1), ('_id', 1)])),
+                ('limit', PAGE_SIZE + 1),
+            ]),
+        ),
+        (
+            'review_session_cursor',
+            'review_session: trang sau theo cursor (next_review_date, _id)',
+            SON([
+                ('find', collection),
+                ('filter', {'user': user_id, 'next_review_date': {'$lte': today}, '$or': [
+                    {'next_review_date': {'$gt': today}},
+                    {'next_review_date': today, '_id': {'$gt': word_id}},
+                ]}),
+                ('sort', SON([('next_review_date', 1), ('_id', 1)])),
+                ('limit', PAGE_SIZE + 1),
+            ]),
+        ),
+        (
+            'vocabulary_list',
+            'vocabulary_list: trang đầu danh sách từ vựng mới nhất',
+            SON([
+                ('find', collection),
+                ('filter', {'user': user_id}),
+                ('sort', SON([('added_at', -1), ('_id', -1)])),
+                ('limit', PAGE_SIZE + 1),
+            ]),
+        ),
+        (
+            'vocabulary_list_cursor',
+            'vocabulary_list: trang sau theo cursor (added_at, _id)',
+            SON([
+                ('find', collection),
+                ('filter', {'user': user_id, '$or': [
+                    {'added_at': {'$lt': today}},
+                    {'added_at': today, '_id': {'$lt': word_id}},
+                ]}),
+                ('sort', SON([('added_at', -1), ('_id', -1)])),
+                ('limit', PAGE_SIZE + 1),
+            ]),
+        ),
+        (
+            'review_queue_start',
+            'review_queue.start_queue: chụp lại _id các từ đến hạn',
+            SON([
+                ('find', collection),
+                ('filter', {'user': user_id, 'next_review_date': {'$lte': today}}),
+                ('projection', {'_id': 1}),
+                ('sort', SON([('next_review_date', 1), ('_id', 1)])),
+            ]),
+        ),
+        (
+            'review_queue_batch',
+            'review_queue.next_batch: các thẻ của một batch',
+            SON([('find', collection), ('filter', {'_id': {'$in': [word_id]}, 'user': user_id})]),
+        ),
+        (
+            'word_by_id',
+            'word_detail_view / word_edit_view / check_word_view: một từ theo _id + user',
+            SON([('find', collection), ('filter', {'_id': word_id, 'user': user_id}), ('limit', 1)]),
+        ),
+        (
+            'review_batch',
+            'review_batch_view: trạng thái SR của các từ trong batch',
+            SON([('find', collection), ('filter', {'user': user_id, '_id': {'$in': [word_id]}})]),
+        ),
+        (
+            'search',
+            'search.search_vocabulary: từ vựng có đủ các token tìm kiếm, mới nhất trước',
+            SON([
+                ('find', collection),
+                ('filter', {'user': user_id, 'search_tokens': {'$all': ['k:ㅎㅏㄴ', 'v:han']}}),
+                ('sort', SON([('added_at', -1)])),
+                ('limit', SEARCH_RESULT_LIMIT + 1),
+            ]),
+        ),
+        (
+            'search_exact',
+            'search.search_vocabulary: từ trùng khớp theo khóa chuẩn hóa khi kết quả bị giới hạn',
+            SON([('find', collection), ('filter', {'user': user_id, 'word_key': '한국어'}), ('limit', 1)]),
+        ),
+        (
+            'export',
+            'exporter.iter_export_rows: toàn bộ bộ từ theo thứ tự thêm vào (export_vocabulary)',
+            SON([
+                ('find', collection),
+                ('filter', {'user': user_id}),
+                ('sort', SON([('added_at', 1), ('_id', 1)])),
+            ]),
+        ),
+        (
+            'sync',
+            'sync.changes_since: các từ đã thay đổi sau một revision (api/sync)',
+            SON([
+                ('find', collection),
+                ('filter', {'user': user_id, 'rev': {'$gt': 0}}),
+                ('sort', SON([('rev', 1)])),
+                ('limit', SYNC_PAGE_SIZE + 1),
+            ]),
+        ),
+        (
+            'sync_tombstones',
+            'sync.changes_since: các từ đã bị xóa sau một revision (api/sync)',
+            SON([
+                ('find', VocabularyTombstone._get_collection_name()),
+                ('filter', {'user': user_id, 'rev': {'$gt': 0}}),
+                ('sort', SON([('rev', 1)])),
+                ('limit', SYNC_PAGE_SIZE + 1),
+            ]),
+        ),
+        (
+            'sync_backfill',
+            'sync.backfill_revisions: các từ chưa có revision (lần đồng bộ đầu tiên)',
+            SON([('find', collection), ('filter', {'user': user_id, 'rev': None}), ('projection', {'_id': 1})]),
+        ),
+    ]
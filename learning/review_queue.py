@@ -0,0 +1,80 @@
+# File: learning/review_queue.py
+#
+# Hàng đợi ôn tập phía server. Khi bắt đầu buổi ôn tập, id các từ đến hạn được chụp lại
+# bằng MỘT truy vấn (chỉ lấy _id). Sau đó thẻ được phát theo batch: mỗi batch tốn 1 lệnh
+# $inc cursor + 1 truy vấn $in có projection, thay vì chạy lại truy vấn đến hạn + count()
+# sau mỗi thẻ như luồng dashboard → chi tiết → redirect.
+
+from datetime import date, datetime
+from pymongo import ReturnDocument
+from .documents import ReviewQueue, Vocabulary
+from .sr_logic import to_mongo_date
+
+# Số thẻ tối đa trong một hàng đợi
+MAX_QUEUE_SIZE = 500
+# Số thẻ mỗi batch được phát cho trình duyệt
+BATCH_SIZE = 10
+
+# Các trường của thẻ được gửi cho trình duyệt
+CARD_FIELDS = ('korean_word', 'hanja', 'vietnamese_meaning', 'example_sentence', 'notes', 'level')
+
+
+def start_queue(user_id, today: date = None, limit=MAX_QUEUE_SIZE):
+    """Chụp lại id các từ đến hạn (theo thứ tự ôn tập) thành hàng đợi mới. Trả về số thẻ."""
+    today = to_mongo_date(today or date.today())
+    cursor = (
+        Vocabulary._get_collection()
+        .find({'user': user_id, 'next_review_date': {'$lte': today}}, {'_id': True})
+        .sort([('next_review_date', 1), ('_id', 1)])
+        .limit(limit)
+    )
+    card_ids = [doc['_id'] for doc in cursor]
+
+    ReviewQueue._get_collection().replace_one(
+        {'_id': user_id},
+        {'card_ids': card_ids, 'cursor': 0, 'created_at': datetime.now()},
+        upsert=True,
+    )
+    return len(card_ids)
+
+
+def next_batch(user_id, size=BATCH_SIZE):
+    """
+    Phát batch thẻ tiếp theo và dời cursor (nguyên tử, nên hai tab không nhận trùng thẻ).
+    Trả về dict gồm `cards`, `remaining` (số thẻ chưa phát) và `total`, hoặc None nếu chưa có hàng đợi.
+    """
+    queue = ReviewQueue._get_collection().find_one_and_update(
+        {'_id': user_id},
+        {'$inc': {'cursor': size}},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if queue is None:
+        return None
+
+    card_ids = queue.get('card_ids', [])
+    start = min(queue.get('cursor', 0), len(card_ids))
+    batch_ids = card_ids[start:start + size]
+
+    cards = []
+    if batch_ids:
+        docs = {
+            doc['_id']: doc
+            for doc in Vocabulary._get_collection().find(
+                {'_id': {'$in': batch_ids}, 'user': user_id},
+                {field: True for field in CARD_FIELDS},
+            )
+        }
+        # Giữ đúng thứ tự của hàng đợi; bỏ qua từ đã bị xóa
+        for card_id in batch_ids:
+            doc = docs.get(card_id)
+            if doc is not None:
+                card = {field: doc.get(field) or '' for field in CARD_FIELDS}
+                card['id'] = str(card_id)
+                card['level'] = doc.get('level', 1)
+                cards.append(card)
+
+    return {
+        'cards': cards,
+        'remaining': len(card_ids) - start - len(batch_ids),
+        'total': len(card_ids),
+    }
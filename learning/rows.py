@@ -0,0 +1,38 @@
+# File: learning/rows.py
+#
+# Đối tượng "dòng" nhẹ cho các trang danh sách: đọc bằng .only() + as_pymongo(),
+# không tạo Document MongoEngine (không validate/hydrate, không tải notes/example_sentence).
+
+
+class VocabularyRow:
+    """Một dòng của trang danh sách từ vựng, chỉ chứa các trường template cần hiển thị."""
+
+    __slots__ = ('id', 'korean_word', 'hanja', 'vietnamese_meaning', 'level', 'next_review_date', 'added_at')
+
+    # Các trường được chiếu (projection) từ MongoDB; _id luôn được trả về
+    FIELDS = ('korean_word', 'hanja', 'vietnamese_meaning', 'level', 'next_review_date', 'added_at')
+
+    def __init__(self, id, korean_word='', hanja=None, vietnamese_meaning='', level=1,
+                 next_review_date=None, added_at=None):
+        self.id = id
+        self.korean_word = korean_word
+        self.hanja = hanja
+        self.vietnamese_meaning = vietnamese_meaning
+        self.level = level
+        self.next_review_date = next_review_date
+        self.added_at = added_at
+
+    @classmethod
+    def from_son(cls, son):
+        """Tạo dòng từ dict thô của pymongo."""
+        next_review_date = son.get('next_review_date')
+        return cls(
+            id=son['_id'],
+            korean_word=son.get('korean_word', ''),
+            hanja=son.get('hanja'),
+            vietnamese_meaning=son.get('vietnamese_meaning', ''),
+            level=son.get('level', 1),
+            # DateField được lưu dưới dạng datetime, trả về date giống Document
+            next_review_date=next_review_date.date() if next_review_date else None,
+            added_at=son.get('added_at'),
+        )
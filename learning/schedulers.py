@@ -0,0 +1,274 @@
+# File: learning/schedulers.py
+#
+# Các thuật toán lập lịch ôn tập (scheduler). Mỗi scheduler cung cấp cùng một quy tắc dưới 3 dạng:
+#   - next_state():       thuần Python, tính trạng thái mới của MỘT thẻ (dùng cho kết quả trả về, batch, mô phỏng);
+#   - update_pipeline():  update pipeline chạy trên MongoDB, để đọc + ghi trong một thao tác nguyên tử;
+#   - reschedule_arrays(): bản vector hóa bằng NumPy, tính lại khoảng ôn tập cho cả bộ từ trong một lượt.
+# Ba dạng phải cho cùng kết quả. Người dùng chọn scheduler qua trường User.scheduler.
+#
+# Module này không import documents/sr_logic để có thể được import từ bất cứ đâu.
+
+from datetime import date, timedelta
+
+# Khoảng thời gian lặp lại ngắt quãng theo cấp độ (ngày)
+# Cấp độ (Int): Khoảng thời gian ôn tập (Int)
+SR_INTERVALS = {
+    1: 1,  # Mới
+    2: 3,  # Đang học
+    3: 7,  # Tốt
+    4: 14, # Thành thạo
+}
+
+# Cấp độ hiển thị cao nhất (dùng cho thống kê và giao diện, chung cho mọi scheduler)
+MAX_LEVEL = 4
+
+MILLISECONDS_PER_DAY = 24 * 60 * 60 * 1000
+
+
+def _next_level_expr():
+    """Cấp độ sau khi trả lời ĐÚNG: tăng 1, tối đa MAX_LEVEL, giữ nguyên nếu đã > MAX_LEVEL."""
+    level = {'$ifNull': ['$level', 1]}
+    return {'$max': [level, {'$min': [{'$add': [level, 1]}, MAX_LEVEL]}]}
+
+
+class Scheduler:
+    """
+    Giao diện chung của các scheduler.
+
+    Trạng thái của một thẻ là dict gồm: level, consecutive_correct_count,
+    current_interval_days, ease_factor (các trường thiếu dùng giá trị mặc định).
+    """
+
+    name = None
+    label = None
+
+    def next_state(self, card: dict, is_correct: bool, today: date) -> dict:
+        """Trả về dict: level, consecutive_correct_count, current_interval_days, ease_factor, next_review_date."""
+        raise NotImplementedError
+
+    def update_pipeline(self, is_correct: bool, today, reviewed_at):
+        """Update (dict hoặc pipeline) tương đương next_state; `today` là datetime 00:00 (dạng lưu của DateField)."""
+        raise NotImplementedError
+
+    def reschedule_arrays(self, level, count, interval, ease):
+        """
+        Tính lại (current_interval_days, ease_factor) cho toàn bộ bộ từ từ các mảng NumPy
+        (level, consecutive_correct_count, current_interval_days, ease_factor), như thể
+        lịch sử ôn tập của từng thẻ đã được lập bởi scheduler này.
+        Giá trị ease_factor thiếu là NaN trong mảng đầu vào; ease_factor trả về là None nếu
+        scheduler không dùng hệ số dễ (giá trị đã lưu được giữ nguyên).
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _ease(card):
+        """Ease factor của thẻ; thiếu, None hoặc NaN (không phải số dương) dùng giá trị ban đầu của SM-2."""
+        ease = card.get('ease_factor')
+        return ease if ease is not None and ease > 0 else SM2Scheduler.INITIAL_EASE
+
+    @staticmethod
+    def _level_after(card, is_correct):
+        if not is_correct:
+            return 1
+        level = card.get('level', 1)
+        return level + 1 if level < MAX_LEVEL else level
+
+
+class LadderScheduler(Scheduler):
+    """Thang cố định SR_INTERVALS theo cấp độ; trả lời sai quay về cấp 1 (thuật toán ban đầu)."""
+
+    name = 'ladder'
+    label = 'Thang cố định (1 → 3 → 7 → 14 ngày)'
+
+    def next_state(self, card, is_correct, today):
+        level = self._level_after(card, is_correct)
+        count = card.get('consecutive_correct_count', 0) + 1 if is_correct else 0
+        # Mặc định là 14 ngày nếu cấp độ > 4
+        interval = SR_INTERVALS.get(level, SR_INTERVALS[MAX_LEVEL])
+        return {
+            'level': level,
+            'consecutive_correct_count': count,
+            'current_interval_days': interval,
+            'ease_factor': self._ease(card),
+            'next_review_date': today + timedelta(days=interval),
+        }
+
+    def update_pipeline(self, is_correct, today, reviewed_at):
+        # Trả lời SAI: mọi giá trị đều cố định, không phụ thuộc trạng thái cũ
+        if not is_correct:
+            return {'$set': {
+                'level': 1,
+                'consecutive_correct_count': 0,
+                'current_interval_days': SR_INTERVALS[1],
+                'next_review_date': today + timedelta(days=SR_INTERVALS[1]),
+                'last_reviewed_at': reviewed_at,
+            }}
+
+        # Trả lời ĐÚNG: tăng cấp rồi tra khoảng thời gian theo cấp mới
+        return [
+            {'$set': {
+                'level': _next_level_expr(),
+                'consecutive_correct_count': {'$add': [{'$ifNull': ['$consecutive_correct_count', 0]}, 1]},
+            }},
+            {'$set': {
+                'current_interval_days': {'$switch': {
+                    'branches': [{'case': {'$eq': ['$level', lvl]}, 'then': days} for lvl, days in SR_INTERVALS.items()],
+                    'default': SR_INTERVALS[MAX_LEVEL],
+                }},
+            }},
+            {'$set': {
+                'next_review_date': {'$add': [today, {'$multiply': ['$current_interval_days', MILLISECONDS_PER_DAY]}]},
+                'last_reviewed_at': {'$literal': reviewed_at},
+            }},
+        ]
+
+    def reschedule_arrays(self, level, count, interval, ease):
+        import numpy as np
+
+        table = np.array([SR_INTERVALS[lvl] for lvl in range(1, MAX_LEVEL + 1)])
+        return table[np.clip(level, 1, MAX_LEVEL) - 1], None
+
+
+class SM2Scheduler(Scheduler):
+    """
+    SM-2 (SuperMemo 2) với đánh giá nhị phân: đúng = chất lượng 4, sai = chất lượng 2.
+    Khoảng ôn tập: 1 ngày, 6 ngày, rồi nhân với hệ số dễ (ease factor) của thẻ sau mỗi lần đúng,
+    nên các thẻ đã thuộc được ôn thưa dần thay vì dừng ở 14 ngày. Trả lời sai: khoảng về 1 ngày,
+    ease giảm (tối thiểu 1.3). Cấp độ (level) vẫn được cập nhật như thang cố định để hiển thị/thống kê.
+    """
+
+    name = 'sm2'
+    label = 'SM-2 (hệ số dễ, khoảng ôn tập tăng dần)'
+
+    INITIAL_EASE = 2.5
+    MINIMUM_EASE = 1.3
+    CORRECT_QUALITY = 4
+    WRONG_QUALITY = 2
+    FIRST_INTERVAL = 1
+    SECOND_INTERVAL = 6
+    MAX_INTERVAL = 3650
+
+    @staticmethod
+    def ease_delta(quality):
+        """Thay đổi ease factor của SM-2 theo chất lượng câu trả lời (0-5)."""
+        return 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+
+    def next_state(self, card, is_correct, today):
+        ease = self._ease(card)
+        quality = self.CORRECT_QUALITY if is_correct else self.WRONG_QUALITY
+        ease = max(self.MINIMUM_EASE, ease + self.ease_delta(quality))
+
+        if is_correct:
+            count = card.get('consecutive_correct_count', 0) + 1
+            if count == 1:
+                interval = self.FIRST_INTERVAL
+            elif count == 2:
+                interval = self.SECOND_INTERVAL
+            else:
+                interval = min(self.MAX_INTERVAL, round(card.get('current_interval_days', 1) * ease))
+        else:
+            count = 0
+            interval = self.FIRST_INTERVAL
+
+        return {
+            'level': self._level_after(card, is_correct),
+            'consecutive_correct_count': count,
+            'current_interval_days': interval,
+            'ease_factor': ease,
+            'next_review_date': today + timedelta(days=interval),
+        }
+
+    def update_pipeline(self, is_correct, today, reviewed_at):
+        quality = self.CORRECT_QUALITY if is_correct else self.WRONG_QUALITY
+        # Như _ease(): NaN, null và trường thiếu đều nhỏ hơn mọi số dương theo thứ tự so sánh của BSON
+        current = {'$cond': [{'$gt': ['$ease_factor', 0]}, '$ease_factor', self.INITIAL_EASE]}
+        ease = {'$max': [self.MINIMUM_EASE, {'$add': [current, self.ease_delta(quality)]}]}
+
+        if not is_correct:
+            first = {
+                'level': 1,
+                'consecutive_correct_count': 0,
+                'current_interval_days': self.FIRST_INTERVAL,
+                'ease_factor': ease,
+            }
+            interval = None
+        else:
+            first = {
+                'level': _next_level_expr(),
+                'consecutive_correct_count': {'$add': [{'$ifNull': ['$consecutive_correct_count', 0]}, 1]},
+                'ease_factor': ease,
+            }
+            interval = {'$switch': {
+                'branches': [
+                    {'case': {'$eq': ['$consecutive_correct_count', 1]}, 'then': self.FIRST_INTERVAL},
+                    {'case': {'$eq': ['$consecutive_correct_count', 2]}, 'then': self.SECOND_INTERVAL},
+                ],
+                # $round (làm tròn về số chẵn gần nhất) khớp với round() của Python
+                'default': {'$min': [self.MAX_INTERVAL, {'$toInt': {'$round': [
+                    {'$multiply': [{'$ifNull': ['$current_interval_days', 1]}, '$ease_factor']}, 0,
+                ]}}]},
+            }}
+
+        pipeline = [{'$set': first}]
+        if interval is not None:
+            pipeline.append({'$set': {'current_interval_days': interval}})
+        pipeline.append({'$set': {
+            'next_review_date': {'$add': [today, {'$multiply': ['$current_interval_days', MILLISECONDS_PER_DAY]}]},
+            'last_reviewed_at': {'$literal': reviewed_at},
+        }})
+        return pipeline
+
+    def reschedule_arrays(self, level, count, interval, ease):
+        import numpy as np
+
+        ease = np.where(np.nan_to_num(ease, nan=0.0) > 0, ease, self.INITIAL_EASE)
+        interval = np.where(count >= 2, self.SECOND_INTERVAL, self.FIRST_INTERVAL)
+        # Lặp lại phép nhân của các lần đúng thứ 3, 4, ... (np.rint làm tròn giống round())
+        for step in range(3, int(count.max(initial=0)) + 1):
+            grown = np.where(count >= step, np.minimum(self.MAX_INTERVAL, np.rint(interval * ease)), interval).astype(int)
+            # Không thẻ nào thay đổi nữa (đều đã chạm MAX_INTERVAL): các bước sau cũng không đổi
+            if (grown == interval).all():
+                break
+            interval = grown
+        return interval, ease
+
+
+# --- Cân bằng tải ngày ôn tập ("fuzz") ---
+# Các thẻ được thêm cùng lúc sẽ đến hạn cùng ngày mãi mãi nếu ngày ôn = hôm nay + khoảng.
+# Cân bằng tải dời ngày ôn trong một cửa sổ nhỏ quanh khoảng dự kiến, sang ngày có ít từ đến hạn nhất.
+
+# Khoảng ôn tập nhỏ hơn giá trị này không bị dời
+LOAD_BALANCE_MIN_INTERVAL = 3
+# Độ rộng cửa sổ mỗi bên: LOAD_BALANCE_RATIO × khoảng ôn tập, tối thiểu 1 và tối đa LOAD_BALANCE_MAX_DAYS ngày
+LOAD_BALANCE_RATIO = 0.15
+LOAD_BALANCE_MAX_DAYS = 7
+
+
+def load_balance_window(today: date, interval: int) -> list:
+    """Các ngày có thể chọn làm ngày ôn tiếp theo cho khoảng ôn tập `interval`."""
+    if interval < LOAD_BALANCE_MIN_INTERVAL:
+        return [today + timedelta(days=interval)]
+    spread = max(1, min(LOAD_BALANCE_MAX_DAYS, round(interval * LOAD_BALANCE_RATIO)))
+    return [today + timedelta(days=days) for days in range(interval - spread, interval + spread + 1)]
+
+
+def balance_due_date(today: date, interval: int, due_counts) -> date:
+    """
+    Chọn ngày trong cửa sổ có ít từ đến hạn nhất; hòa thì chọn ngày gần khoảng dự kiến nhất, rồi ngày sớm hơn.
+    `due_counts` là mapping date -> số từ đến hạn hiện có (ngày không có trong mapping = 0).
+    """
+    target = today + timedelta(days=interval)
+    return min(
+        load_balance_window(today, interval),
+        key=lambda day: (due_counts.get(day, 0), abs((day - target).days), day),
+    )
+
+
+SCHEDULERS = {scheduler.name: scheduler for scheduler in (LadderScheduler(), SM2Scheduler())}
+SCHEDULER_CHOICES = tuple((name, scheduler.label) for name, scheduler in SCHEDULERS.items())
+DEFAULT_SCHEDULER = LadderScheduler.name
+
+
+def get_scheduler(name=None) -> Scheduler:
+    """Trả về scheduler theo tên (User.scheduler); tên không hợp lệ dùng scheduler mặc định."""
+    return SCHEDULERS.get(name or DEFAULT_SCHEDULER, SCHEDULERS[DEFAULT_SCHEDULER])
@@ -0,0 +1,70 @@
+# File: learning/search.py
+#
+# Tìm kiếm từ vựng của một người dùng bằng các token đã tính sẵn khi ghi (Vocabulary.search_tokens).
+# Truy vấn chỉ dùng index (user, search_tokens, -added_at) và đọc tối đa SEARCH_RESULT_LIMIT dòng,
+# nên thời gian tìm kiếm không phụ thuộc vào kích thước bộ từ. Kết quả được xếp hạng trong Python.
+# Từ trùng khớp (cùng khóa chuẩn hóa word_key) được đọc riêng qua index (user, word_key), nên luôn
+# đứng đầu kết quả kể cả khi nó không nằm trong SEARCH_RESULT_LIMIT từ mới nhất khớp với truy vấn.
+
+import unicodedata
+from .documents import Vocabulary
+from .hangul import decompose, fold_vietnamese, initials, query_tokens, word_key
+from .rows import VocabularyRow
+
+# Số kết quả tối đa được đọc và xếp hạng (các từ mới nhất khớp với truy vấn)
+SEARCH_RESULT_LIMIT = 200
+
+
+def _rank(row, query, query_jamo, folded_terms):
+    """Điểm xếp hạng (càng nhỏ càng tốt) của một kết quả."""
+    word = unicodedata.normalize('NFC', row.korean_word or '')
+    if word == query:
+        return 0
+    if query_jamo and decompose(word).startswith(query_jamo):
+        return 1
+    if initials(word).startswith(query):
+        return 2
+    if row.hanja and query in row.hanja:
+        return 3
+    meaning_words = fold_vietnamese(row.vietnamese_meaning or '').split()
+    if folded_terms and all(term in meaning_words for term in folded_terms):
+        return 4
+    return 5
+
+
+def search_vocabulary(user_id, query: str, limit: int = SEARCH_RESULT_LIMIT):
+    """
+    Các từ vựng của người dùng khớp với `query` (VocabularyRow), đã xếp hạng:
+    trùng khớp từ tiếng Hàn, tiền tố jamo, tiền tố 초성, Hán tự, trùng nguyên từ của nghĩa, rồi các kết quả khác;
+    cùng hạng thì từ ngắn hơn trước, rồi từ mới thêm trước.
+    Trả về (kết quả, capped): capped là True nếu có nhiều hơn `limit` từ khớp (chỉ `limit` từ mới nhất được xếp hạng).
+    """
+    tokens = query_tokens(query)
+    if not tokens:
+        return [], False
+
+    collection = Vocabulary._get_collection()
+    projection = dict({field: True for field in VocabularyRow.FIELDS}, word_key=True)
+    son_rows = list(
+        collection.find({'user': user_id, 'search_tokens': {'$all': tokens}}, projection)
+        .sort([('added_at', -1)])
+        .limit(limit + 1)
+    )
+    capped = len(son_rows) > limit
+    son_rows = son_rows[:limit]
+
+    key = word_key(query)
+    if capped and key and not any(son.get('word_key') == key for son in son_rows):
+        # Từ trùng khớp có thể nằm ngoài các kết quả mới nhất: đọc riêng (tối đa 1 từ, index unique)
+        exact = collection.find_one({'user': user_id, 'word_key': key}, projection)
+        if exact is not None:
+            son_rows.insert(0, exact)
+
+    # Đã sắp xếp từ mới nhất; sort() của Python ổn định nên thứ tự này được giữ trong cùng hạng
+    rows = [VocabularyRow.from_son(son) for son in son_rows]
+
+    query = unicodedata.normalize('NFC', query.strip())
+    query_jamo = decompose(query.replace(' ', ''))
+    folded_terms = fold_vietnamese(query).split()
+    rows.sort(key=lambda row: (_rank(row, query, query_jamo, folded_terms), len(row.korean_word or '')))
+    return rows, capped
@@ -0,0 +1,127 @@
+# File: learning/sessions.py
+#
+# Session engine lưu session trong MongoDB, dùng lại kết nối MongoEngine hiện có.
+# Cấu hình: SESSION_ENGINE = 'learning.sessions'
+#
+# - Hết hạn bằng TTL index trên expire_date (không cần chạy clearsessions).
+# - Dữ liệu lưu dạng JSON nhị phân (nén zlib khi lớn), không base64 + chữ ký như backend DB mặc định.
+# - Chỉ ghi khi dữ liệu thực sự thay đổi; tạo session mới bằng 1 lệnh insert (không kiểm tra exists() trước).
+
+import logging
+import zlib
+from bson import Binary
+from django.conf import settings
+from django.contrib.sessions.backends.base import CreateError, SessionBase, UpdateError
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from pymongo.errors import DuplicateKeyError
+from .documents import MongoSession
+
+logger = logging.getLogger(__name__)
+
+# Dữ liệu session lớn hơn ngưỡng này (byte) sẽ được nén
+COMPRESS_THRESHOLD = 512
+
+VALID_KEY_CHARS = 'abcdefghijklmnopqrstuvwxyz0123456789'
+
+
+class SessionStore(SessionBase):
+    """Session store dùng collection `sessions` của MongoDB."""
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        # Payload đã đọc từ DB, để bỏ qua lệnh ghi nếu dữ liệu không đổi
+        self._loaded_payload = None
+
+    @staticmethod
+    def _collection():
+        return MongoSession._get_collection()
+
+    def _encode_payload(self, data):
+        payload = self.serializer().dumps(data)
+        if len(payload) > COMPRESS_THRESHOLD:
+            return zlib.compress(payload), True
+        return payload, False
+
+    def _decode_payload(self, doc):
+        payload = bytes(doc.get('data') or b'')
+        if doc.get('compressed'):
+            payload = zlib.decompress(payload)
+        return self.serializer().loads(payload) if payload else {}
+
+    def load(self):
+        doc = None
+        if self.session_key:
+            doc = self._collection().find_one({'_id': self.session_key, 'expire_date': {'$gt': timezone.now()}})
+        if doc is None:
+            self._session_key = None
+            return {}
+
+        try:
+            data = self._decode_payload(doc)
+        except Exception as e:
+            # Dữ liệu hỏng: coi như session trống (giống hành vi của backend mặc định)
+            logger.warning(f'Không đọc được session {self.session_key}: {e}')
+            self._session_key = None
+            return {}
+
+        self._loaded_payload = bytes(doc.get('data') or b'')
+        return data
+
+    def exists(self, session_key):
+        return self._collection().count_documents({'_id': session_key}, limit=1) > 0
+
+    def _get_new_session_key(self):
+        # Không gọi exists(): trùng khóa (rất hiếm) được phát hiện bởi DuplicateKeyError khi insert
+        return get_random_string(32, VALID_KEY_CHARS)
+
+    def create(self):
+        while True:
+            self._session_key = self._get_new_session_key()
+            try:
+                self.save(must_create=True)
+            except CreateError:
+                # Key wasn't unique. Try again.
+                continue
+            self.modified = True
+            return
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+
+        data = self._get_session(no_load=must_create)
+        payload, compressed = self._encode_payload(data)
+
+        # Dữ liệu không đổi so với lúc đọc: bỏ qua lệnh ghi
+        if not must_create and payload == self._loaded_payload and not settings.SESSION_SAVE_EVERY_REQUEST:
+            return
+
+        doc = {
+            'data': Binary(payload),
+            'compressed': compressed,
+            'expire_date': self.get_expiry_date(),
+        }
+        if must_create:
+            try:
+                self._collection().insert_one(dict(doc, _id=self._get_or_create_session_key()))
+            except DuplicateKeyError:
+                raise CreateError
+        else:
+            result = self._collection().update_one({'_id': self.session_key}, {'$set': doc})
+            if result.matched_count == 0:
+                # Session đã bị xóa (ví dụ: đăng xuất ở tab khác) trong lúc xử lý request
+                raise UpdateError
+        self._loaded_payload = payload
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        self._collection().delete_one({'_id': session_key})
+
+    @classmethod
+    def clear_expired(cls):
+        # TTL index đã tự xóa session hết hạn; lệnh này chỉ dọn ngay lập tức khi cần
+        cls._collection().delete_many({'expire_date': {'$lt': timezone.now()}})
@@ -0,0 +1,205 @@
+# File: learning/simulation.py
+#
+# Mô phỏng offline việc ôn tập của một bộ từ trong nhiều ngày, để đánh giá một thay đổi của
+# thuật toán lập lịch (SR_INTERVALS, schedulers, sr_logic) trước khi đưa lên production:
+# số lượt ôn mỗi ngày (≈ số lệnh ghi vào MongoDB), tỉ lệ nhớ và tốc độ của scheduler.
+#
+# Trạng thái bộ từ, việc chọn thẻ đến hạn và việc "trả lời" (theo mô hình xác suất nhớ) được
+# vector hóa bằng NumPy; mỗi thẻ đến hạn được cập nhật bằng đúng `next_sr_state` của sr_logic.
+# Không truy vấn cơ sở dữ liệu.
+
+import csv
+import json
+import time
+from collections import Counter
+from datetime import date, timedelta
+import numpy as np
+from .schedulers import Scheduler, balance_due_date
+from .sr_logic import next_sr_state
+
+# Các trường trạng thái SR được mô phỏng
+STATE_FIELDS = ('level', 'consecutive_correct_count', 'current_interval_days', 'ease_factor')
+
+
+class ForgettingCurveModel:
+    """
+    Mô hình xác suất nhớ: p = retention_at_stability ** (số ngày kể từ lần ôn trước / độ bền).
+    Độ bền (stability, ngày) tăng sau mỗi lần nhớ đúng (ít hơn nếu ôn sớm), giảm khi quên;
+    mỗi thẻ có độ khó ngẫu nhiên (phân phối log-normal) nhân vào mức tăng.
+    """
+
+    def __init__(self, initial_stability=1.0, growth=2.5, lapse=0.3, retention_at_stability=0.9,
+                 difficulty_sigma=0.3, minimum_stability=0.5):
+        self.initial_stability = initial_stability
+        self.growth = growth
+        self.lapse = lapse
+        self.retention_at_stability = retention_at_stability
+        self.difficulty_sigma = difficulty_sigma
+        self.minimum_stability = minimum_stability
+
+    def difficulty(self, rng, size):
+        return rng.lognormal(0.0, self.difficulty_sigma, size)
+
+    def recall_probability(self, elapsed, stability):
+        return self.retention_at_stability ** (elapsed / stability)
+
+    def update_stability(self, stability, elapsed, recalled, difficulty):
+        # Ôn sớm hơn độ bền hiện tại thì độ bền tăng ít hơn (hiệu ứng giãn cách)
+        spacing = np.minimum(1.0, elapsed / stability)
+        grown = stability * (1 + (self.growth / difficulty - 1) * spacing)
+        return np.where(recalled, np.maximum(stability, grown), np.maximum(self.minimum_stability, stability * self.lapse))
+
+
+class Deck:
+    """Trạng thái của bộ từ mô phỏng dưới dạng các mảng NumPy (mỗi phần tử là một thẻ)."""
+
+    def __init__(self, level, count, interval, ease, due_day, added_day, stability):
+        self.level = np.asarray(level, dtype=int)
+        self.count = np.asarray(count, dtype=int)
+        self.interval = np.asarray(interval, dtype=int)
+        self.ease = np.asarray(ease, dtype=float)
+        self.due_day = np.asarray(due_day, dtype=int)
+        self.added_day = np.asarray(added_day, dtype=int)
+        self.stability = np.asarray(stability, dtype=float)
+        # Ngày ôn gần nhất; thẻ chưa ôn lần nào tính từ ngày được thêm
+        self.last_review_day = self.added_day.copy()
+
+    def __len__(self):
+        return len(self.level)
+
+    @classmethod
+    def synthetic(cls, cards, new_per_day, model):
+        """Bộ từ mới: `cards` thẻ, mỗi ngày thêm `new_per_day` thẻ (đến hạn ngay ngày được thêm)."""
+        added_day = np.arange(cards) // max(1, new_per_day)
+        return cls(
+            level=np.ones(cards), count=np.zeros(cards), interval=np.ones(cards),
+            ease=np.full(cards, 2.5), due_day=added_day, added_day=added_day,
+            stability=np.full(cards, model.initial_stability),
+        )
+
+    @classmethod
+    def from_export(cls, path, today=None):
+        """Bộ từ từ file xuất (CSV/JSONL, có thể .gz) của `manage.py export_vocabulary` hoặc /export/."""
+        import gzip
+
+        today = today or date.today()
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8', newline='') as stream:
+            if '.jsonl' in path:
+                rows = [json.loads(line) for line in stream if line.strip()]
+            else:
+                rows = list(csv.DictReader(stream))
+
+        def column(field, default, cast):
+            return [cast(row[field]) if row.get(field) not in (None, '') else default for row in rows]
+
+        due = [
+            (date.fromisoformat(value) - today).days if value else 0
+            for value in (row.get('next_review_date') for row in rows)
+        ]
+        interval = column('current_interval_days', 1, int)
+        return cls(
+            level=column('level', 1, int),
+            count=column('consecutive_correct_count', 0, int),
+            interval=interval,
+            ease=column('ease_factor', 2.5, float),
+            due_day=np.maximum(0, due),
+            # Thẻ có sẵn: coi như lần ôn gần nhất là (ngày đến hạn - khoảng ôn tập), độ bền ≈ khoảng ôn tập
+            added_day=np.array(due) - np.array(interval),
+            stability=np.maximum(1, interval),
+        )
+
+
+class _DueCounts:
+    """Histogram ngày đến hạn theo chỉ số ngày mô phỏng, dùng như mapping date -> số thẻ cho balance_due_date."""
+
+    def __init__(self, due_day, start):
+        self.counts = Counter(due_day.tolist())
+        self.start = start
+
+    def get(self, day, default=0):
+        return self.counts.get((day - self.start).days, default)
+
+    def move(self, old_day, new_day):
+        self.counts[old_day] -= 1
+        self.counts[new_day] += 1
+
+
+def simulate(deck, scheduler: Scheduler, days, model=None, seed=0, start=None, load_balance=False):
+    """
+    Mô phỏng `days` ngày ôn tập (ôn hết các thẻ đến hạn mỗi ngày).
+    Với load_balance=True, ngày ôn được cân bằng tải như khi bật settings.SR_LOAD_BALANCING.
+    Trả về dict gồm các mảng theo ngày (reviews, correct) và tổng hợp (xem summarize_simulation).
+    """
+    model = model or ForgettingCurveModel()
+    rng = np.random.default_rng(seed)
+    start = start or date.today()
+    difficulty = model.difficulty(rng, len(deck))
+
+    reviews = np.zeros(days, dtype=int)
+    correct = np.zeros(days, dtype=int)
+    scheduler_seconds = 0.0
+    due_counts = _DueCounts(deck.due_day, start) if load_balance else None
+
+    for day in range(days):
+        due = np.flatnonzero((deck.due_day <= day) & (deck.added_day <= day))
+        if not len(due):
+            continue
+
+        elapsed = np.maximum(0, day - deck.last_review_day[due])
+        recalled = rng.random(len(due)) < model.recall_probability(elapsed, deck.stability[due])
+        deck.stability[due] = model.update_stability(deck.stability[due], elapsed, recalled, difficulty[due])
+
+        # Đúng đường cập nhật của ứng dụng: next_sr_state cho từng thẻ
+        today = start + timedelta(days=day)
+        tick = time.perf_counter()
+        for i, is_correct in zip(due.tolist(), recalled.tolist()):
+            state = next_sr_state(
+                int(deck.level[i]), int(deck.count[i]), is_correct, today, scheduler,
+                current_interval_days=int(deck.interval[i]), ease_factor=float(deck.ease[i]),
+            )
+            deck.level[i] = state['level']
+            deck.count[i] = state['consecutive_correct_count']
+            deck.interval[i] = state['current_interval_days']
+            deck.ease[i] = state['ease_factor']
+            next_review_date = state['next_review_date']
+            if due_counts is not None:
+                next_review_date = balance_due_date(today, state['current_interval_days'], due_counts)
+                due_counts.move(int(deck.due_day[i]), day + (next_review_date - today).days)
+            deck.due_day[i] = day + (next_review_date - today).days
+        scheduler_seconds += time.perf_counter() - tick
+
+        deck.last_review_day[due] = day
+        reviews[day] = len(due)
+        correct[day] = int(recalled.sum())
+
+    return {
+        'scheduler': scheduler.name,
+        'days': days,
+        'cards': len(deck),
+        'load_balance': load_balance,
+        'reviews': reviews,
+        'correct': correct,
+        'scheduler_seconds': scheduler_seconds,
+        'level_counts': {int(level): int(n) for level, n in zip(*np.unique(deck.level, return_counts=True))},
+    }
+
+
+def summarize_simulation(result):
+    """Các chỉ số tổng hợp (dạng JSON được) của một lần mô phỏng."""
+    reviews, correct = result['reviews'], result['correct']
+    total = int(reviews.sum())
+    active = reviews[reviews > 0]
+    return {
+        'scheduler': result['scheduler'],
+        'days': result['days'],
+        'cards': result['cards'],
+        'load_balance': result['load_balance'],
+        'total_reviews': total,
+        'reviews_per_day_mean': float(reviews.mean()) if len(reviews) else 0.0,
+        'reviews_per_day_p95': float(np.percentile(active, 95)) if len(active) else 0.0,
+        'reviews_per_day_max': int(reviews.max(initial=0)),
+        'retention': float(correct.sum() / total) if total else 0.0,
+        'updates_per_second': total / result['scheduler_seconds'] if result['scheduler_seconds'] else 0.0,
+        'level_counts': result['level_counts'],
+    }
@@ -1,53 +1,329 @@
 # File: learning/sr_logic.py (Tạo file mới để tách logic)
 
-from datetime import date, timedelta
-import datetime
+import math
+from datetime import date, timedelta, datetime
+from pymongo import UpdateOne, ReturnDocument
+from pymongo.errors import BulkWriteError
+from django.conf import settings
 from .documents import Vocabulary
+from . import deck_stats
+# Các thuật toán lập lịch; SR_INTERVALS được giữ ở đây để tương thích với code cũ
+from .schedulers import SR_INTERVALS, Scheduler, SM2Scheduler, balance_due_date, get_scheduler, load_balance_window
 
-# Khoảng thời gian lặp lại ngắt quãng theo cấp độ (ngày)
-# Cấp độ (Int): Khoảng thời gian ôn tập (Int)
-SR_INTERVALS = {
-    1: 1,  # Mới
-    2: 3,  # Đang học
-    3: 7,  # Tốt
-    4: 14, # Thành thạo
-}
+# Số câu trả lời tối đa trong một lần gửi batch
+MAX_REVIEW_BATCH_SIZE = 200
+# Số lệnh ghi MongoDB của một câu trả lời (apply_review_atomic), có hay không cân bằng tải:
+# cấp revision (findAndModify trên deck_stats), find_one_and_update (từ vựng), $inc thống kê (deck_stats)
+WRITES_PER_REVIEW = 3
 
-def update_spaced_repetition(vocabulary_doc: Vocabulary, is_correct: bool):
+
+def to_mongo_date(value: date) -> datetime:
+    """DateField của MongoEngine lưu ngày dưới dạng datetime lúc 00:00."""
+    return datetime(value.year, value.month, value.day)
+
+
+def review_timestamp(value: datetime = None) -> datetime:
+    """Thời điểm trả lời, làm tròn xuống mili giây (độ chính xác của datetime trong BSON) để so sánh được với giá trị đã lưu."""
+    value = value or datetime.now()
+    return value.replace(microsecond=value.microsecond // 1000 * 1000)
+
+
+def next_sr_state(level: int, consecutive_correct_count: int, is_correct: bool, today: date = None,
+                  scheduler: Scheduler = None, current_interval_days: int = 1, ease_factor: float = None) -> dict:
+    """
+    Tính trạng thái SR mới từ trạng thái hiện tại (thuần Python, không truy vấn DB).
+    Dùng chung cho cập nhật từng từ và cập nhật theo batch; mặc định dùng thang cố định.
+    """
+    card = {
+        'level': level,
+        'consecutive_correct_count': consecutive_correct_count,
+        'current_interval_days': current_interval_days,
+    }
+    if ease_factor is not None:
+        card['ease_factor'] = ease_factor
+    return (scheduler or get_scheduler()).next_state(card, is_correct, today or date.today())
+
+
+# Các trường SR được trả về sau mỗi lần cập nhật
+SR_FIELDS = (
+    'level', 'consecutive_correct_count', 'current_interval_days', 'ease_factor',
+    'next_review_date', 'last_reviewed_at',
+)
+
+
+def sr_update_pipeline(is_correct: bool, today: date = None, reviewed_at: datetime = None, scheduler: Scheduler = None):
+    """
+    Trả về update (pipeline) thực hiện đúng quy tắc của `next_sr_state` ngay trên server,
+    để việc đọc trạng thái cũ và ghi trạng thái mới diễn ra trong MỘT thao tác nguyên tử.
+    """
+    today = to_mongo_date(today or date.today())
+    reviewed_at = reviewed_at or datetime.now()
+    return (scheduler or get_scheduler()).update_pipeline(is_correct, today, reviewed_at)
+
+
+def state_after_review(before: dict, is_correct: bool, answered_at: datetime, scheduler: Scheduler = None) -> dict:
+    """Trạng thái SR mới suy ra từ bản ghi trước khi cập nhật (before-image của find_one_and_update)."""
+    after = (scheduler or get_scheduler()).next_state(before, is_correct, answered_at.date())
+    after['last_reviewed_at'] = answered_at
+    return after
+
+
+def load_balancing_enabled() -> bool:
+    """Cân bằng tải ngày ôn tập (settings.SR_LOAD_BALANCING)."""
+    return getattr(settings, 'SR_LOAD_BALANCING', False)
+
+
+def with_revision(update, rev: int):
+    """Thêm vào update (dạng {'$set': ...} hoặc pipeline) việc ghi revision `rev` của lần ghi (xem learning/sync.py)."""
+    if isinstance(update, dict):
+        return dict(update, **{'$set': dict(update.get('$set', {}), rev=rev)})
+    return update + [{'$set': {'rev': rev}}]
+
+
+def with_balanced_due_date(update, predicted: date, balanced: date):
+    """
+    Thêm vào update SR một bước dời ngày ôn tập từ `predicted` sang `balanced`, áp dụng nguyên tử
+    chỉ khi server tính ra đúng ngày `predicted` (tức trạng thái trước khớp với trạng thái đã đọc).
+    """
+    if isinstance(update, dict):
+        update = [{'$set': {field: {'$literal': value} for field, value in update['$set'].items()}}]
+    return update + [{'$set': {'next_review_date': {'$cond': [
+        {'$eq': ['$next_review_date', to_mongo_date(predicted)]},
+        to_mongo_date(balanced),
+        '$next_review_date',
+    ]}}}]
+
+
+def apply_review_atomic(user_id, word_id, is_correct: bool, answered_at: datetime = None, scheduler: Scheduler = None):
+    """
+    Cập nhật SR của một từ bằng một lệnh `find_one_and_update` có điều kiện (_id + user).
+    Không cần đọc trước rồi `save()`, nên hai tab trả lời cùng lúc không làm mất cập nhật.
+
+    Trả về (trạng thái trước, trạng thái sau) hoặc None nếu không tìm thấy từ.
+    Trạng thái sau được suy ra từ đúng bản ghi mà server đã dùng để cập nhật.
+
+    Nếu bật cân bằng tải, ngày ôn tập được dời sang ngày ít từ đến hạn nhất trong cửa sổ ngay trong pipeline
+    cập nhật (như apply_review_batch): trạng thái hiện tại được đọc trước để biết cửa sổ, histogram được đọc
+    cùng lệnh cấp revision. Tổng cộng 3 lệnh (cấp revision, cập nhật, $inc thống kê), thêm 1 lần đọc khi cân bằng tải.
+    """
+    answered_at = review_timestamp(answered_at)
+    today = answered_at.date()
+    scheduler = scheduler or get_scheduler()
+    collection = Vocabulary._get_collection()
+    update = sr_update_pipeline(is_correct, today, answered_at, scheduler)
+
+    rev = predicted = balanced = None
+    if load_balancing_enabled():
+        current = collection.find_one({'_id': word_id, 'user': user_id}, {field: True for field in SR_FIELDS})
+        if current is None:
+            return None
+        expected = scheduler.next_state(current, is_correct, today)
+        window = load_balance_window(today, expected['current_interval_days'])
+        if len(window) > 1:
+            rev, counts = deck_stats.reserve_revisions_with_due_counts(user_id, days=window)
+            predicted = expected['next_review_date']
+            balanced = balance_due_date(today, expected['current_interval_days'], counts)
+            if balanced != predicted:
+                update = with_balanced_due_date(update, predicted, balanced)
+    if rev is None:
+        rev = deck_stats.reserve_revisions(user_id)
+
+    before = collection.find_one_and_update(
+        {'_id': word_id, 'user': user_id},
+        with_revision(update, rev),
+        projection={field: True for field in SR_FIELDS},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if before is None:
+        return None
+
+    after = state_after_review(before, is_correct, answered_at, scheduler)
+    # Bước dời ngày chỉ có hiệu lực khi server tính ra đúng ngày dự kiến (không có lần ôn khác chen vào sau lần đọc)
+    if balanced is not None and after['next_review_date'] == predicted:
+        after['next_review_date'] = balanced
+
+    # Cập nhật thống kê bộ từ (số từ theo cấp độ, histogram ngày đến hạn)
+    deck_stats.record_reviews(user_id, [(before, after)])
+    return before, after
+
+
+def update_spaced_repetition(vocabulary_doc: Vocabulary, is_correct: bool, scheduler: Scheduler = None):
     """
     Cập nhật các trường SR của từ vựng dựa trên kết quả kiểm tra.
+    Ghi nguyên tử trên server, sau đó đồng bộ lại các trường của document đang có trong bộ nhớ.
+    """
+    # Lấy ObjectId của user mà không cần dereference ReferenceField (tránh thêm 1 truy vấn)
+    updated = apply_review_atomic(vocabulary_doc.to_mongo()['user'], vocabulary_doc.id, is_correct, scheduler=scheduler)
+    if updated is None:
+        raise Vocabulary.DoesNotExist(f'Vocabulary {vocabulary_doc.id} no longer exists')
+
+    for field, value in updated[1].items():
+        setattr(vocabulary_doc, field, value)
+
+
+def apply_review_batch(user, items):
+    """
+    Áp dụng một loạt kết quả ôn tập của một người dùng.
+
+    `items` là danh sách dict đã được kiểm tra định dạng, mỗi dict gồm
+    `word_id` (ObjectId), `is_correct` (bool) và `answered_at` (datetime).
+    Chỉ tốn 1 truy vấn đọc (kiểm tra quyền sở hữu và tính kết quả trả về) và
+    1 lệnh `bulk_write` gồm các update pipeline nguyên tử, nên một request khác
+    cập nhật cùng từ trong lúc đó không bị ghi đè. Trả về danh sách kết quả theo đúng thứ tự `items`.
+    Thuật toán lập lịch là scheduler người dùng đã chọn (User.scheduler).
     """
-    
-    # 1. Xử lý khi trả lời ĐÚNG
-    if is_correct:
-        # Tăng số lần trả lời đúng liên tiếp
-        vocabulary_doc.consecutive_correct_count += 1
-        
-        # Nếu chưa đạt cấp 4, tăng cấp độ
-        if vocabulary_doc.level < 4:
-            vocabulary_doc.level += 1
-            
-        # Lấy khoảng thời gian ôn tập mới dựa trên cấp độ mới
-        interval = SR_INTERVALS.get(vocabulary_doc.level, SR_INTERVALS[4]) # Mặc định là 14 ngày nếu cấp độ > 4
-        
-        vocabulary_doc.current_interval_days = interval
-        
-    # 2. Xử lý khi trả lời SAI
-    else:
-        # Quay về Cấp 1
-        vocabulary_doc.level = 1
-        vocabulary_doc.consecutive_correct_count = 0
-        
-        # Khoảng thời gian sẽ là 1 ngày
-        interval = SR_INTERVALS[1] 
-        vocabulary_doc.current_interval_days = interval
-
-    # 3. Cập nhật ngày ôn tập tiếp theo
-    vocabulary_doc.next_review_date = date.today() + timedelta(days=vocabulary_doc.current_interval_days)
-    vocabulary_doc.last_reviewed_at = datetime.now()
-    
-    # Lưu lại vào MongoDB
-    vocabulary_doc.save()
+    results = [None] * len(items)
+    if not items:
+        return results
+    scheduler = get_scheduler(user.scheduler)
+
+    # 1. Đọc trạng thái SR hiện tại của tất cả các từ trong batch (1 truy vấn)
+    word_ids = list({item['word_id'] for item in items})
+    current = {
+        doc['_id']: doc
+        for doc in Vocabulary.objects(user=user, id__in=word_ids)
+        .only('level', 'consecutive_correct_count', 'current_interval_days', 'ease_factor', 'next_review_date')
+        .as_pymongo()
+    }
+
+    # Mỗi lần ghi trong batch có revision riêng, tăng theo thứ tự ghi; histogram ngày đến hạn cho cân bằng tải
+    # được đọc trong cùng lệnh cấp revision
+    found = sum(1 for item in items if item['word_id'] in current)
+    next_rev = due_counts = None
+    if found and load_balancing_enabled():
+        next_rev, due_counts = deck_stats.reserve_revisions_with_due_counts(user.id, found)
+    elif found:
+        next_rev = deck_stats.reserve_revisions(user.id, found)
+
+    # 2. Áp dụng các câu trả lời theo thứ tự thời gian; mỗi câu trả lời là một update nguyên tử
+    order = sorted(range(len(items)), key=lambda i: items[i]['answered_at'])
+    operations, operation_items, transitions = [], [], []
+    for i in order:
+        item = items[i]
+        doc = current.get(item['word_id'])
+        if doc is None:
+            results[i] = {'success': False, 'error': 'Word not found or unauthorized'}
+            continue
+
+        today = item['answered_at'].date()
+        state = scheduler.next_state(doc, item['is_correct'], today)
+        state['last_reviewed_at'] = item['answered_at']
+        update = sr_update_pipeline(item['is_correct'], today, item['answered_at'], scheduler)
+        if due_counts is not None:
+            predicted = state['next_review_date']
+            balanced = balance_due_date(today, state['current_interval_days'], due_counts)
+            if balanced != predicted:
+                update = with_balanced_due_date(update, predicted, balanced)
+                state['next_review_date'] = balanced
+            # Các từ sau trong batch thấy histogram đã tính cả từ này
+            previous = doc.get('next_review_date')
+            if previous:
+                previous = previous.date() if isinstance(previous, datetime) else previous
+                due_counts[previous] = due_counts.get(previous, 0) - 1
+            due_counts[balanced] = due_counts.get(balanced, 0) + 1
+
+        transitions.append((dict(doc), state))
+        # Câu trả lời tiếp theo của cùng một từ sẽ dựa trên trạng thái vừa tính
+        doc.update(state)
+
+        operations.append(UpdateOne({'_id': item['word_id'], 'user': user.id}, with_revision(update, next_rev)))
+        next_rev += 1
+        operation_items.append(i)
+        results[i] = {
+            'success': True,
+            'new_level': state['level'],
+            'next_review_date': state['next_review_date'].isoformat(),
+        }
+
+    if not operations:
+        return results
+
+    # 3. Ghi toàn bộ batch trong 1 lệnh bulk_write.
+    # ordered=True để các câu trả lời của cùng một từ được áp dụng đúng thứ tự thời gian.
+    try:
+        Vocabulary._get_collection().bulk_write(operations, ordered=True)
+    except BulkWriteError as e:
+        errors = {error['index']: error.get('errmsg', 'Write failed') for error in e.details.get('writeErrors', [])}
+        first_failed = min(errors) if errors else 0
+        # Với ordered=True, các lệnh sau lệnh lỗi đầu tiên không được thực thi
+        for position, i in enumerate(operation_items[first_failed:], start=first_failed):
+            results[i] = {'success': False, 'error': errors.get(position, 'Not applied: an earlier write in the batch failed')}
+        transitions = transitions[:first_failed]
+
+    # 4. Cập nhật thống kê bộ từ cho cả batch trong 1 lệnh $inc
+    deck_stats.record_reviews(user.id, transitions)
+    return results
+
+
+# Số lệnh UpdateOne mỗi lần bulk_write khi tính lại lịch cả bộ từ
+RESCHEDULE_WRITE_BATCH_SIZE = 1000
+
+
+def reschedule_deck(user_id, scheduler: Scheduler, today: date = None) -> int:
+    """
+    Tính lại khoảng ôn tập và ngày ôn tập tiếp theo của TOÀN BỘ bộ từ theo `scheduler`
+    (ví dụ sau khi người dùng đổi thuật toán), vector hóa bằng NumPy trong một lượt.
+
+    Ngày ôn tập mới = ngày ôn gần nhất + khoảng mới, chỉ cho các thẻ đã trả lời đúng ít nhất một lần
+    và chưa đến hạn. Thẻ chưa ôn lần nào (last_reviewed_at mặc định là lúc thêm từ) hoặc vừa trả lời sai
+    (consecutive_correct_count = 0, khoảng 1 ngày ở mọi scheduler) và thẻ đã đến hạn giữ nguyên ngày ôn tập:
+    chúng được lập lịch theo scheduler mới ở lần ôn tiếp theo. Mỗi update có điều kiện last_reviewed_at không đổi, nên thẻ vừa được ôn trong lúc
+    tính lại sẽ giữ kết quả ôn tập đó. Trả về số từ đã được cập nhật.
+    """
+    import numpy as np
+
+    today = today or date.today()
+    collection = Vocabulary._get_collection()
+    cards = list(collection.find(
+        {'user': user_id},
+        {'level': True, 'consecutive_correct_count': True, 'current_interval_days': True,
+         'ease_factor': True, 'next_review_date': True, 'last_reviewed_at': True},
+    ))
+    if not cards:
+        return 0
+
+    level = np.fromiter((card.get('level', 1) for card in cards), dtype=int, count=len(cards))
+    count = np.fromiter((card.get('consecutive_correct_count', 0) for card in cards), dtype=int, count=len(cards))
+    interval = np.fromiter((card.get('current_interval_days', 1) for card in cards), dtype=int, count=len(cards))
+    # Ease thiếu (None) thành NaN; scheduler tự thay bằng giá trị ban đầu
+    ease = np.array([card.get('ease_factor') for card in cards], dtype=float)
+    new_interval, new_ease = scheduler.reschedule_arrays(level, count, interval, ease)
+    if new_ease is None:
+        # Scheduler không dùng ease: giữ giá trị đã lưu, chỉ thay giá trị không hợp lệ (thiếu/NaN)
+        new_ease = np.where(np.nan_to_num(ease, nan=0.0) > 0, np.nan, SM2Scheduler.INITIAL_EASE)
+
+    changed, updated = [], 0
+
+    def flush():
+        # Một lần cấp revision cho cả nhóm lệnh ghi
+        first_rev = deck_stats.reserve_revisions(user_id, len(changed))
+        operations = [
+            UpdateOne(query, {'$set': dict(changes, rev=first_rev + offset)})
+            for offset, (query, changes) in enumerate(changed)
+        ]
+        changed.clear()
+        return collection.bulk_write(operations, ordered=False).modified_count
+
+    for card, days, ease_factor in zip(cards, new_interval.tolist(), new_ease.tolist()):
+        changes = {'current_interval_days': days}
+        due = card.get('next_review_date')
+        if card.get('consecutive_correct_count', 0) > 0 and card.get('last_reviewed_at') and not (due and due.date() <= today):
+            changes['next_review_date'] = to_mongo_date(card['last_reviewed_at'].date() + timedelta(days=days))
+        # NaN: không ghi ease_factor (không bao giờ ghi NaN vào MongoDB)
+        if not math.isnan(ease_factor):
+            changes['ease_factor'] = ease_factor
+        if all(card.get(field) == value for field, value in changes.items()):
+            continue
+        changed.append(({'_id': card['_id'], 'user': user_id, 'last_reviewed_at': card.get('last_reviewed_at')}, changes))
+        if len(changed) >= RESCHEDULE_WRITE_BATCH_SIZE:
+            updated += flush()
+    if changed:
+        updated += flush()
+
+    # Histogram ngày đến hạn thay đổi hàng loạt: tính lại thống kê một lần
+    if updated:
+        deck_stats.rebuild_deck_stats(user_id)
+    return updated
 
 # --- Ví dụ về hàm kiểm tra (sẽ được gọi trong views.py) ---
 # def check_word_view(request, word_id, answer_result):
@@ -61,4 +337,4 @@ def update_spaced_repetition(vocabulary_doc: Vocabulary, is_correct: bool):
 #     update_spaced_repetition(word, is_correct=(answer_result == 'correct'))
 #
 #     # 3. Trả về kết quả
-#     return JsonResponse({'message': 'Review successfully recorded', 'next_review': word.next_review_date})
\ No newline at end of file
+#     return JsonResponse({'message': 'Review successfully recorded', 'next_review': word.next_review_date})
@@ -0,0 +1,127 @@
+# File: learning/stats.py
+#
+# Trang thống kê chi tiết của một người dùng: phân bố cấp độ, dự báo số từ đến hạn 30 ngày tới,
+# độ "chín" của các từ, chuỗi ngày học và tỉ lệ nhớ. Các số liệu của bộ từ được tính bằng MỘT lệnh
+# aggregation ($facet) trên phần dữ liệu của người dùng (index bắt đầu bằng `user`), không duyệt
+# Document trong Python. Chuỗi ngày học và tỉ lệ nhớ dùng bộ đếm lượt ôn theo ngày
+# (DeckStats.review_days, được $inc cùng lúc với thống kê bộ từ, xem deck_stats.review_increments):
+# last_reviewed_at chỉ giữ lần ôn gần nhất của mỗi từ nên không cho biết các ngày đã ôn trước đó.
+# Kết quả được cache theo người dùng, revision của bộ từ (DeckStats.revision, tăng ở mọi luồng ghi) và ngày,
+# như learning/fragment_cache.py: một lần ghi làm mục cũ không bao giờ được đọc lại ở MỌI worker, không cần xóa
+# (cache 'default' là bộ nhớ riêng của từng worker nên cache.delete chỉ có hiệu lực ở worker đã ghi).
+
+from datetime import date, datetime, timedelta
+from django.conf import settings
+from django.core.cache import cache
+from .documents import DeckStats, Vocabulary
+
+# Số ngày của biểu đồ dự báo
+FORECAST_DAYS = 30
+# Khoảng ôn tập (ngày) từ đó một từ được coi là "đã thuộc" (mature)
+MATURE_INTERVAL_DAYS = 21
+# Số ngày gần đây được xét cho chuỗi ngày học và tỉ lệ nhớ
+ACTIVITY_DAYS = 60
+RETENTION_DAYS = 30
+
+
+def _cache_key(user_id, revision, today: date):
+    return f'learning:stats:{user_id}:{revision}:{today.isoformat()}'
+
+
+def stats_pipeline(user_id, today: date):
+    """Pipeline aggregation: $match theo user rồi $facet cho từng nhóm số liệu."""
+    today = datetime(today.year, today.month, today.day)
+    day = {'format': '%Y-%m-%d'}
+    return [
+        {'$match': {'user': user_id}},
+        {'$facet': {
+            'total': [{'$count': 'n'}],
+            'levels': [
+                {'$group': {'_id': {'$ifNull': ['$level', 1]}, 'n': {'$sum': 1}}},
+                {'$sort': {'_id': 1}},
+            ],
+            # Dự báo: các từ quá hạn được tính vào hôm nay
+            'forecast': [
+                {'$match': {'next_review_date': {'$lt': today + timedelta(days=FORECAST_DAYS)}}},
+                {'$group': {
+                    '_id': {'$dateToString': dict(day, date={'$max': ['$next_review_date', today]})},
+                    'n': {'$sum': 1},
+                }},
+                {'$sort': {'_id': 1}},
+            ],
+            'maturity': [
+                {'$group': {
+                    '_id': {'$gte': [{'$ifNull': ['$current_interval_days', 1]}, MATURE_INTERVAL_DAYS]},
+                    'n': {'$sum': 1},
+                }},
+            ],
+        }},
+    ]
+
+
+def _streak(active_days, today: date) -> int:
+    """Số ngày liên tiếp có ôn tập, tính lùi từ hôm nay (hoặc từ hôm qua nếu hôm nay chưa ôn)."""
+    day = today if today.isoformat() in active_days else today - timedelta(days=1)
+    streak = 0
+    while day.isoformat() in active_days:
+        streak += 1
+        day -= timedelta(days=1)
+    return streak
+
+
+def review_history(user_id, today: date) -> dict:
+    """
+    Lượt ôn theo ngày ('YYYY-MM-DD' -> {'reviews', 'correct'}) trong ACTIVITY_DAYS ngày gần nhất, bằng 1 lần đọc
+    theo _id. Các ngày cũ hơn không còn được dùng và bị xóa khỏi DeckStats để document không lớn dần.
+    """
+    collection = DeckStats._get_collection()
+    days = (collection.find_one({'_id': user_id}, {'review_days': True}) or {}).get('review_days', {})
+    oldest = (today - timedelta(days=max(ACTIVITY_DAYS, RETENTION_DAYS))).isoformat()
+    expired = [day for day in days if day < oldest]
+    if expired:
+        collection.update_one({'_id': user_id}, {'$unset': {f'review_days.{day}': '' for day in expired}})
+    return {day: counts for day, counts in days.items() if day >= oldest}
+
+
+def build_stats(user_id, today: date = None) -> dict:
+    """Chạy aggregation, đọc lượt ôn theo ngày và chuyển kết quả thành dữ liệu cho template."""
+    today = today or date.today()
+    result = next(Vocabulary._get_collection().aggregate(stats_pipeline(user_id, today)))
+    history = review_history(user_id, today)
+
+    total = result['total'][0]['n'] if result['total'] else 0
+    forecast_counts = {row['_id']: row['n'] for row in result['forecast']}
+    forecast = [
+        {'date': today + timedelta(days=offset), 'count': forecast_counts.get((today + timedelta(days=offset)).isoformat(), 0)}
+        for offset in range(FORECAST_DAYS)
+    ]
+    maturity = {row['_id']: row['n'] for row in result['maturity']}
+    # Tỉ lệ nhớ: số lượt trả lời đúng trên tổng số lượt ôn trong RETENTION_DAYS ngày gần nhất
+    since = (today - timedelta(days=RETENTION_DAYS)).isoformat()
+    recent = [counts for day, counts in history.items() if day > since]
+    reviewed = sum(counts.get('reviews', 0) for counts in recent)
+    correct = sum(counts.get('correct', 0) for counts in recent)
+
+    return {
+        'total_words': total,
+        'levels': [{'level': row['_id'], 'count': row['n']} for row in result['levels']],
+        'forecast': forecast,
+        'forecast_max': max((day['count'] for day in forecast), default=0),
+        'due_today': forecast[0]['count'],
+        'mature_count': maturity.get(True, 0),
+        'young_count': maturity.get(False, 0),
+        'streak_days': _streak({day for day, counts in history.items() if counts.get('reviews', 0) > 0}, today),
+        'reviewed_recently': reviewed,
+        'retention': correct / reviewed if reviewed else None,
+    }
+
+
+def get_stats(user_id, revision, today: date = None) -> dict:
+    """Thống kê của người dùng ở revision `revision` của bộ từ, lấy từ cache nếu có (cùng revision, cùng ngày)."""
+    today = today or date.today()
+    key = _cache_key(user_id, revision, today)
+    stats = cache.get(key)
+    if stats is None:
+        stats = build_stats(user_id, today)
+        cache.set(key, stats, settings.STATS_CACHE_TTL)
+    return stats
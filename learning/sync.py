@@ -0,0 +1,90 @@
+# File: learning/sync.py
+#
+# Đồng bộ theo thay đổi (delta sync) cho client ngoại tuyến (API /api/sync/).
+# Mỗi lần ghi từ vựng của một người dùng được gắn một revision lấy từ bộ đếm tăng dần của người dùng đó
+# (DeckStats.revision, xem deck_stats.reserve_revisions) vào Vocabulary.rev; từ bị xóa để lại một
+# VocabularyTombstone với revision của lần xóa. Client gửi revision cao nhất đã nhận (watermark) và chỉ
+# nhận các từ đã thay đổi / bị xóa sau đó, đọc bằng index (user, rev).
+#
+# Revision được cấp ngay trước lần ghi tương ứng, nên một lần ghi đang diễn ra (revision nhỏ hơn) có thể xuất
+# hiện SAU một revision lớn hơn. Watermark trả về vì vậy không vượt quá revision ổn định
+# (deck_stats.settled_revision: các revision được cấp từ SYNC_SAFETY_LAG_SECONDS giây trước); các thay đổi
+# mới hơn vẫn được gửi kèm và được gửi lại ở lần đồng bộ sau (client ghi đè theo id nên nhận lại không sao).
+
+from datetime import datetime
+from pymongo import UpdateOne
+from .documents import Vocabulary, VocabularyTombstone
+from . import deck_stats
+
+# Số thay đổi tối đa mỗi lần trả về (client gọi tiếp khi `more` là true)
+SYNC_PAGE_SIZE = 500
+
+# Các trường của từ vựng được gửi cho client
+SYNC_FIELDS = (
+    'korean_word', 'vietnamese_meaning', 'hanja', 'example_sentence', 'notes',
+    'level', 'consecutive_correct_count', 'current_interval_days', 'ease_factor',
+    'next_review_date', 'last_reviewed_at', 'added_at', 'rev',
+)
+# Trường DateField (lưu dạng datetime 00:00) được gửi dưới dạng ngày 'YYYY-MM-DD'
+DATE_FIELDS = ('next_review_date',)
+
+
+def backfill_revisions(user_id) -> int:
+    """Gắn revision cho các từ được ghi trước khi có đồng bộ (chưa có `rev`). Trả về số từ đã gắn."""
+    collection = Vocabulary._get_collection()
+    word_ids = [son['_id'] for son in collection.find({'user': user_id, 'rev': None}, {'_id': True})]
+    if not word_ids:
+        return 0
+    first_rev = deck_stats.reserve_revisions(user_id, len(word_ids))
+    operations = [
+        UpdateOne({'_id': word_id, 'rev': None}, {'$set': {'rev': first_rev + offset}})
+        for offset, word_id in enumerate(word_ids)
+    ]
+    return collection.bulk_write(operations, ordered=False).modified_count
+
+
+def serialize_word(son: dict) -> dict:
+    """Dạng gọn của một từ vựng cho client: bỏ các trường rỗng, ngày giờ theo ISO 8601."""
+    word = {'id': str(son['_id'])}
+    for field in SYNC_FIELDS:
+        value = son.get(field)
+        if value is None or value == '':
+            continue
+        if isinstance(value, datetime):
+            value = value.date().isoformat() if field in DATE_FIELDS else value.isoformat(timespec='milliseconds')
+        word[field] = value
+    return word
+
+
+def changes_since(user_id, since: int = 0, limit: int = SYNC_PAGE_SIZE) -> dict:
+    """
+    Các thay đổi của bộ từ sau revision `since`, theo thứ tự revision, tối đa `limit` thay đổi:
+    {'revision': watermark mới, 'more': còn thay đổi, 'words': [...], 'deleted': [id, ...]}.
+    since=0 là lần đồng bộ đầu tiên: toàn bộ bộ từ, không kèm tombstone.
+    Watermark không vượt quá revision ổn định; `more` chỉ báo các thay đổi ổn định chưa được gửi.
+    """
+    if since <= 0:
+        since = 0
+        backfill_revisions(user_id)
+    # Đọc trước các thay đổi: một lần ghi hoàn tất sau lần đọc này vẫn có revision lớn hơn watermark
+    settled = deck_stats.settled_revision(user_id)
+
+    query = {'user': user_id, 'rev': {'$gt': since}}
+    words = Vocabulary._get_collection().find(query, {field: True for field in SYNC_FIELDS}).sort([('rev', 1)]).limit(limit + 1)
+    changes = [(son['rev'], son) for son in words]
+    if since:
+        tombstones = VocabularyTombstone._get_collection().find(query, {'word_id': True, 'rev': True}).sort([('rev', 1)]).limit(limit + 1)
+        changes += [(son['rev'], {'_id': son['word_id'], 'deleted': True}) for son in tombstones]
+        changes.sort(key=lambda change: change[0])
+
+    stable = [change for change in changes if change[0] <= settled]
+    if len(stable) > limit:
+        page, revision, more = stable[:limit], stable[limit - 1][0], True
+    else:
+        page, revision, more = changes[:limit], max(since, settled), False
+    return {
+        'revision': revision,
+        'more': more,
+        'words': [serialize_word(son) for rev, son in page if not son.get('deleted')],
+        'deleted': [str(son['_id']) for rev, son in page if son.get('deleted')],
+    }
@@ -0,0 +1,42 @@
+# File: learning/testing.py
+#
+# Công cụ cho test: giới hạn số lệnh MongoDB ("query budget") của một view hoặc một đoạn code,
+# để các lỗi N+1 (một truy vấn cho mỗi dòng) làm test thất bại. Dựa trên các sự kiện lệnh của pymongo
+# (learning/db_instrumentation.py). mongomock không phát sự kiện: learning/tests.py ghi từng thao tác
+# của collection qua record_command để giới hạn vẫn có hiệu lực khi test trên mongomock.
+#
+#     class VocabularyListTests(MongoQueryBudgetMixin, TestCase):
+#         def test_list_page(self):
+#             with self.assertMaxMongoCommands(3):
+#                 self.client.get(reverse('vocabulary_list'))
+
+from contextlib import contextmanager
+from .db_instrumentation import capture_mongo_commands
+
+
+def _describe(commands):
+    return '\n'.join(f'  {index}. {collection}.{command} ({ms:.1f} ms)' for index, (command, collection, ms) in enumerate(commands, 1))
+
+
+@contextmanager
+def assert_max_mongo_commands(limit: int, command: str = None, collection: str = None):
+    """
+    Khối `with` thất bại (AssertionError, kèm danh sách lệnh) nếu số lệnh MongoDB chạy bên trong vượt `limit`.
+    Có thể chỉ đếm một loại lệnh (`command`, ví dụ 'find') và/hoặc một `collection`.
+    """
+    with capture_mongo_commands() as stats:
+        yield stats
+
+    commands = [
+        entry for entry in stats.commands
+        if (command is None or entry[0] == command) and (collection is None or entry[1] == collection)
+    ]
+    if len(commands) > limit:
+        raise AssertionError(f'{len(commands)} Mongo commands executed, budget is {limit}:\n{_describe(commands)}')
+
+
+class MongoQueryBudgetMixin:
+    """Mixin cho TestCase: self.assertMaxMongoCommands(n) giống assertNumQueries của Django."""
+
+    def assertMaxMongoCommands(self, limit, command=None, collection=None):
+        return assert_max_mongo_commands(limit, command=command, collection=collection)
@@ -11,9 +11,17 @@ urlpatterns = [
     # Core Application
     path('', views.home_view, name='home'), # Trang chủ/Dashboard
     path('add/', views.add_vocabulary, name='add_vocabulary'), # Thêm từ mới
+    path('stats/', views.stats_view, name='stats'), # Thống kê chi tiết
+    path('words/', views.vocabulary_list, name='vocabulary_list'), # Toàn bộ từ vựng
+    path('import/', views.import_vocabulary_view, name='import_vocabulary'), # Nhập từ file
+    path('export/', views.export_vocabulary_view, name='export_vocabulary'), # Xuất bộ từ (CSV/JSONL)
+    path('settings/scheduler/', views.scheduler_settings_view, name='scheduler_settings'), # Chọn thuật toán lập lịch
     
     # Danh sách các từ cần ôn tập (Dashboard List)
     path('review/', views.review_session, name='review_session'), 
+
+    # Buổi ôn tập liên tục dùng hàng đợi phía server (phải nằm TRƯỚC review/<str:word_id>/)
+    path('review/queue/', views.review_queue_view, name='review_queue'),
     
     # Trang chi tiết/Quiz cho một từ cụ thể
     # Dùng <str:word_id> vì ObjectId của MongoDB là chuỗi (24 ký tự hex)
@@ -27,4 +35,18 @@ urlpatterns = [
     # nếu không Django sẽ hiểu 'check' là một word_id.
     # Tuy nhiên, cách an toàn hơn là đặt nó ở một prefix khác:
     path('api/check/<str:word_id>/<str:result>/', views.check_word_view, name='check_word'), 
+
+    # API gửi nhiều kết quả ôn tập cùng lúc (1 bulk_write cho cả batch)
+    path('api/review/batch/', views.review_batch_view, name='review_batch'),
+    # API lấy batch thẻ tiếp theo của hàng đợi ôn tập
+    path('api/review/queue/next/', views.review_queue_next_view, name='review_queue_next'),
+    # API đồng bộ theo thay đổi (delta sync) cho client ngoại tuyến
+    path('api/sync/', views.sync_view, name='sync'),
+    # Số đo Prometheus, gộp trên các worker của Gunicorn
+    path('metrics', views.metrics_view, name='metrics'),
+    # Readiness probe (ping MongoDB, kết quả được cache vài giây)
+    path('health/ready/', views.readiness_view, name='readiness'),
+
+    # Phiên bản bất đồng bộ của Dashboard và luồng ôn tập chỉ được mount dưới ASGI
+    # (learning/async_urls.py, config/asgi.py)
 ]
@@ -0,0 +1,78 @@
+# File: learning/user_cache.py
+#
+# Cache User trong bộ nhớ của từng worker (giới hạn kích thước, có TTL), dùng cho việc
+# lấy request.user từ session ở mỗi request. Lưu bản "son" (dict thô) chứ không lưu Document,
+# để mỗi request nhận một Document riêng và các thread không dùng chung một đối tượng.
+#
+# User.save()/delete() sẽ xóa mục tương ứng trong cache của worker hiện tại; các worker khác
+# sẽ thấy thay đổi sau tối đa USER_CACHE_TTL giây.
+
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from .metrics import record_cache_lookup
+
+
+class UserCache:
+    """Cache LRU có TTL, an toàn với nhiều thread, kèm bộ đếm hit/miss."""
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id):
+        """Trả về bản son đã cache của user, hoặc None nếu không có/đã hết hạn."""
+        key = str(user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                son = None
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                son = entry[1]
+        record_cache_lookup('user', son is not None)
+        return son
+
+    def set(self, user_id, son):
+        key = str(user_id)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, son)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+user_cache = UserCache(
+    max_size=getattr(settings, 'USER_CACHE_MAX_SIZE', 1024),
+    ttl=getattr(settings, 'USER_CACHE_TTL', 60),
+)
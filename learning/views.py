@@ -1,39 +1,63 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse, Http404
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.http import HttpResponse, JsonResponse, Http404, StreamingHttpResponse
 # SỬ DỤNG HÀM CHUẨN ĐỂ ĐẢM BẢO TÍNH TƯƠNG THÍCH VỚI HỆ THỐNG AUTHENTICATION CỦA DJANGO
-from django.contrib.auth import authenticate, login, logout 
+from django.contrib.auth import authenticate, logout 
+# Đăng nhập với User Document của MongoEngine
+from .middleware import login_user
 from datetime import date, datetime
 # Đảm bảo import Model MongoEngine, giả định các models này nằm trong .documents
 from .documents import User, Vocabulary 
 # Import logic SR
-from .sr_logic import update_spaced_repetition
+from .sr_logic import apply_review_atomic, apply_review_batch, reschedule_deck, MAX_REVIEW_BATCH_SIZE
+from .schedulers import get_scheduler
 # Import Forms
-from .forms import RegisterForm, LoginForm, VocabularyForm
+from .forms import RegisterForm, LoginForm, VocabularyForm, ImportVocabularyForm, SchedulerForm
 import json
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from django.utils.crypto import constant_time_compare
+from django.utils.dateparse import parse_datetime
+from django.core.paginator import Paginator
+from django.views.decorators.gzip import gzip_page
 # ĐẢM BẢO CÓ BSON.ObjectId CHO MONGODB
 from bson import ObjectId 
+from mongoengine.errors import NotUniqueError
+# Phân trang theo cursor (keyset)
+from .pagination import paginate_by_keyset
+# Dòng nhẹ (không hydrate Document) cho các trang danh sách
+from .rows import VocabularyRow
+# Tìm kiếm theo token (jamo, 초성, Hán tự, nghĩa bỏ dấu)
+from .search import SEARCH_RESULT_LIMIT, search_vocabulary
+# Thống kê bộ từ được cập nhật tăng dần
+from . import deck_stats
+# ETag / Last-Modified theo revision của bộ từ
+from .conditional import deck_conditional, deck_revision
+# Cache HTML của phần danh sách theo revision của bộ từ
+from .fragment_cache import fragment_cache
+# Trang thống kê chi tiết (aggregation $facet, có cache)
+from .stats import get_stats
+# Hàng đợi ôn tập phía server
+from . import review_queue
+# Nhập từ vựng hàng loạt
+from .importer import ImportWriteError, import_vocabulary, open_text
+# Xuất bộ từ vựng theo luồng
+from .exporter import CONTENT_TYPES, EXPORT_FORMATS, export_filename, iter_export
+# Phát hiện / gộp từ trùng theo khóa chuẩn hóa
+from .dedupe import MERGE, SKIP, find_duplicate, merge_words
+# Số đo Prometheus (/metrics)
+from . import metrics
+# Health check (ping MongoDB có cache)
+from .connection import readiness
+# Đồng bộ theo thay đổi cho client ngoại tuyến
+from .sync import changes_since
 
 
 # ========================
 # 1. REUSABLE UTILITY FUNCTION
 # ========================
 
-def _paginate_queryset(request, queryset, per_page=20):
-    """
-    Hàm tiện ích giúp phân trang cho QuerySet (sử dụng được cho MongoEngine)
-    """
-    paginator = Paginator(queryset, per_page)
-    page_number = request.GET.get('page', 1)
-
-    try:
-        page_obj = paginator.page(page_number)
-    except PageNotAnInteger:
-        page_obj = paginator.page(1)
-    except EmptyPage:
-        page_obj = paginator.page(paginator.num_pages)
-
-    return page_obj, paginator
+# Số từ mỗi trang của các trang danh sách
+PAGE_SIZE = 20
 
 
 # ========================
@@ -90,9 +114,9 @@ def login_view(request):
         user = authenticate(request, username=email, password=password)
 
         if user is not None:
-            # 2. SỬ DỤNG HÀM LOGIN CHUẨN CỦA DJANGO
-            # Thiết lập session cho người dùng đã xác thực
-            login(request, user)
+            # 2. Thiết lập session cho người dùng đã xác thực
+            # (hàm login chuẩn của Django không hỗ trợ User Document của MongoEngine)
+            login_user(request, user)
             return redirect('home')
         else:
             form.add_error(None, 'Email hoặc mật khẩu không đúng hoặc tài khoản chưa kích hoạt.')
@@ -103,81 +127,226 @@ def login_view(request):
 # C. FUNCTIONAL VIEWS
 # ========================
 
+@deck_conditional
 def home_view(request):
     """Trang chủ, hiển thị tổng quan và số từ cần ôn tập."""
     if not request.user.is_authenticated: 
         return redirect('login')
 
-    # Query tất cả từ vựng của người dùng hiện tại
-    vocab = Vocabulary.objects(user=request.user)
-    today = date.today()
+    # Đọc thống kê bộ từ của người dùng (1 lần đọc theo khóa chính, không count() trên vocabularies)
+    stats = deck_stats.get_deck_stats(request.user.id)
 
     context = {
-        'total_words': vocab.count(),
-        # Đếm số từ có ngày ôn tập <= hôm nay
-        'words_to_review_count': vocab(next_review_date__lte=today).count(),
+        'total_words': stats['total_words'],
+        # Số từ có ngày ôn tập <= hôm nay
+        'words_to_review_count': stats['due_count'],
         # Lấy tên hoặc email của người dùng
         'user_name': request.user.full_name or request.user.email,
     }
     return render(request, 'learning/home.html', context)
 
+def stats_view(request):
+    """Thống kê chi tiết: phân bố cấp độ, dự báo 30 ngày, độ thuộc, chuỗi ngày học, tỉ lệ nhớ."""
+    if not request.user.is_authenticated: return redirect('login')
+
+    return render(request, 'learning/stats.html', {'stats': get_stats(request.user.id, deck_revision(request)[0])})
+
 def add_vocabulary(request):
     """Thêm một từ vựng mới vào bộ sưu tập."""
     if not request.user.is_authenticated: return redirect('login')
 
     form = VocabularyForm(request.POST or None)
+    duplicate = None
     if request.method == 'POST' and form.is_valid():
-        # Tạo và lưu document Vocabulary mới
-        Vocabulary(
-            user=request.user,
-            korean_word=form.cleaned_data['korean_word'],
-            vietnamese_meaning=form.cleaned_data['vietnamese_meaning'],
-            hanja=form.cleaned_data['hanja'],
-            example_sentence=form.cleaned_data['example_sentence'],
-            notes=form.cleaned_data['notes'],
-        ).save()
-        # Có thể redirect về trang chi tiết của từ vừa thêm hoặc danh sách
-        return redirect('vocabulary_list') 
-
-    return render(request, 'learning/add_vocabulary.html', {'form': form})
+        # Từ đã có trong bộ từ (cùng khóa chuẩn hóa): người dùng chọn gộp hoặc bỏ qua
+        duplicate = find_duplicate(request.user.id, form.cleaned_data['korean_word'])
+        action = request.POST.get('on_duplicate')
+        if duplicate and action == MERGE:
+            merge_words(request.user.id, duplicate, [form.cleaned_data])
+            return redirect('word_detail', word_id=str(duplicate['_id']))
+        if duplicate and action == SKIP:
+            return redirect('word_detail', word_id=str(duplicate['_id']))
+
+        if not duplicate:
+            # Tạo và lưu document Vocabulary mới
+            word = Vocabulary(
+                user=request.user,
+                korean_word=form.cleaned_data['korean_word'],
+                vietnamese_meaning=form.cleaned_data['vietnamese_meaning'],
+                hanja=form.cleaned_data['hanja'],
+                example_sentence=form.cleaned_data['example_sentence'],
+                notes=form.cleaned_data['notes'],
+            )
+            word.rev = deck_stats.reserve_revisions(request.user.id)
+            try:
+                word.save()
+            except NotUniqueError:
+                # Cùng từ vừa được thêm từ nơi khác (index unique (user, word_key))
+                duplicate = find_duplicate(request.user.id, word.korean_word)
+            else:
+                deck_stats.record_added(request.user.id, [(word.level, word.next_review_date)])
+                # Có thể redirect về trang chi tiết của từ vừa thêm hoặc danh sách
+                return redirect('vocabulary_list') 
+
+    return render(request, 'learning/add_vocabulary.html', {'form': form, 'duplicate': duplicate})
+
+def import_vocabulary_view(request):
+    """Nhập hàng loạt từ vựng từ file CSV / TSV / Anki."""
+    if not request.user.is_authenticated: return redirect('login')
 
-def vocabulary_list(request):
-    """Hiển thị toàn bộ danh sách từ vựng đã thêm (không phân trang trong ví dụ này)."""
+    form = ImportVocabularyForm(request.POST or None, request.FILES or None)
+    report = None
+    if request.method == 'POST' and form.is_valid():
+        upload = form.cleaned_data['file']
+        # Đọc file theo luồng, không nạp toàn bộ vào bộ nhớ
+        try:
+            report = import_vocabulary(
+                request.user.id,
+                open_text(upload.file),
+                fmt=form.cleaned_data['format'],
+                filename=upload.name,
+            )
+        except ImportWriteError as e:
+            # Các từ đã ghi trước lỗi vẫn được giữ: hiển thị kết quả tới thời điểm lỗi
+            report = e.report
+            form.add_error(None, f'Lỗi ghi dữ liệu, việc nhập đã dừng lại: {e}')
+
+    return render(request, 'learning/import_vocabulary.html', {'form': form, 'report': report})
+
+def export_vocabulary_view(request):
+    """
+    Tải xuống toàn bộ bộ từ vựng (kèm trường SR) dưới dạng CSV hoặc JSONL, có thể nén gzip.
+    Tham số: ?format=csv|jsonl&gzip=1. Nội dung được stream, không nạp cả bộ từ vào bộ nhớ.
+    """
     if not request.user.is_authenticated: return redirect('login')
 
-    # Lấy tất cả từ vựng của người dùng, sắp xếp theo thời gian tạo mới nhất
-    words = Vocabulary.objects(user=request.user).order_by('-created_at')
-    
-    # Bạn có thể phân trang danh sách từ vựng chung ở đây nếu cần
-    page_obj, paginator = _paginate_queryset(request, words, per_page=20)
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return JsonResponse({'error': f'Invalid format. Use one of: {", ".join(EXPORT_FORMATS)}'}, status=400)
+    compress = request.GET.get('gzip') in ('1', 'true')
 
+    response = StreamingHttpResponse(
+        iter_export(request.user.id, fmt, compress),
+        content_type='application/gzip' if compress else CONTENT_TYPES[fmt],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(fmt, compress)}"'
+    return response
 
+@deck_conditional
+def vocabulary_list(request):
+    """
+    Hiển thị toàn bộ danh sách từ vựng đã thêm, phân trang theo cursor (added_at, _id).
+    Với ?q=, hiển thị kết quả tìm kiếm đã xếp hạng, phân trang theo số trang (?page=).
+    """
+    if not request.user.is_authenticated: return redirect('login')
+
+    query = request.GET.get('q', '').strip()
+    if query:
+        # Kết quả tìm kiếm có giới hạn (SEARCH_RESULT_LIMIT) nên phân trang trong bộ nhớ
+        rows, capped = search_vocabulary(request.user.id, query, SEARCH_RESULT_LIMIT)
+        page_obj = Paginator(rows, PAGE_SIZE).get_page(request.GET.get('page'))
+        rows_html = render_to_string('learning/vocabulary_table.html', {
+            'page_obj': page_obj, 'query': query, 'capped': capped, 'result_limit': SEARCH_RESULT_LIMIT,
+        }, request)
+        return render(request, 'learning/vocabulary_list.html', {'rows_html': rows_html, 'query': query})
+
+    def render_rows():
+        # Lấy tất cả từ vựng của người dùng, sắp xếp theo thời gian thêm mới nhất
+        words = Vocabulary.objects(user=request.user)
+        page_obj = paginate_by_keyset(request, words, 'added_at', descending=True, per_page=PAGE_SIZE, row_class=VocabularyRow)
+        return render_to_string('learning/vocabulary_table.html', {'page_obj': page_obj}, request)
+
+    # Bảng + phân trang chỉ được truy vấn và render lại khi bộ từ thay đổi (khóa: revision + cursor)
+    rows_html = fragment_cache.get_or_render(request, 'vocabulary_list', render_rows, request.GET.get('cursor', ''))
     return render(request, 'learning/vocabulary_list.html', {
-        'page_obj': page_obj,
-        'paginator': paginator,
-        'words': words # Giữ nguyên biến words nếu bạn không dùng page_obj trong template
+        'rows_html': rows_html,
     })
 
 def review_session(request):
-    """Dashboard hiển thị danh sách từ cần ôn tập hôm nay, có phân trang."""
+    """Dashboard hiển thị danh sách từ cần ôn tập hôm nay, phân trang theo cursor (next_review_date, _id)."""
     if not request.user.is_authenticated: return redirect('login')
 
     today = date.today()
-    # Lấy TẤT CẢ các từ cần ôn tập hôm nay, sắp xếp theo ngày ôn tập gần nhất
-    words_to_review = Vocabulary.objects(user=request.user, next_review_date__lte=today).order_by('next_review_date')
 
-    if not words_to_review:
-        return render(request, 'learning/review_done.html')
+    def render_rows():
+        # Lấy các từ cần ôn tập hôm nay, sắp xếp theo ngày ôn tập gần nhất
+        words_to_review = Vocabulary.objects(user=request.user, next_review_date__lte=today)
+
+        # Áp dụng phân trang 20 từ/trang
+        page_obj = paginate_by_keyset(request, words_to_review, 'next_review_date', per_page=PAGE_SIZE, row_class=VocabularyRow)
 
-    # Áp dụng phân trang 20 từ/trang
-    page_obj, paginator = _paginate_queryset(request, words_to_review, per_page=20)
+        # Chuỗi rỗng: không còn từ nào đến hạn (cũng được cache)
+        if not page_obj and 'cursor' not in request.GET:
+            return ''
+        return render_to_string('learning/review_list_table.html', {
+            'page_obj': page_obj,
+            'total_words': deck_stats.get_deck_stats(request.user.id, today)['due_count'],
+        }, request)
+
+    # Danh sách đổi theo ngày (từ đến hạn) và theo bộ từ (revision)
+    rows_html = fragment_cache.get_or_render(request, 'review_session', render_rows, today, request.GET.get('cursor', ''))
+    if not rows_html:
+        return render(request, 'learning/review_done.html')
 
     return render(request, 'learning/review_list_dashboard.html', {
-        'page_obj': page_obj,
-        'paginator': paginator,
-        'total_words': words_to_review.count(),
+        'rows_html': rows_html,
+    })
+
+def review_queue_view(request):
+    """
+    Buổi ôn tập liên tục: chụp lại các từ đến hạn thành hàng đợi phía server (1 truy vấn)
+    rồi hiển thị từng thẻ ngay trên trình duyệt, không tải lại trang sau mỗi thẻ.
+    """
+    if not request.user.is_authenticated: return redirect('login')
+
+    total = review_queue.start_queue(request.user.id)
+    if not total:
+        return render(request, 'learning/review_done.html')
+
+    batch = review_queue.next_batch(request.user.id)
+    return render(request, 'learning/review_queue.html', {
+        'batch': batch,
+        'batch_size': review_queue.BATCH_SIZE,
+    })
+
+def review_queue_next_view(request):
+    """
+    API Endpoint phát batch thẻ tiếp theo của hàng đợi ôn tập.
+    Chỉ nhận POST (có CSRF): mỗi lần gọi dời cursor của hàng đợi, nên không phải là GET an toàn
+    (trình duyệt prefetch hay crawler không được làm mất thẻ).
+    """
+    if not request.user.is_authenticated: return JsonResponse({'error': 'Unauthorized'}, status=401)
+
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed. Use POST.'}, status=405)
+
+    batch = review_queue.next_batch(request.user.id)
+    if batch is None:
+        return JsonResponse({'error': 'Review queue not started'}, status=404)
+    return JsonResponse(batch)
+
+def scheduler_settings_view(request):
+    """Chọn thuật toán lập lịch ôn tập; có thể tính lại lịch của toàn bộ bộ từ theo thuật toán mới."""
+    if not request.user.is_authenticated: return redirect('login')
+
+    user = request.user
+    form = SchedulerForm(request.POST or None, initial={'scheduler': user.scheduler})
+    rescheduled = None
+    if request.method == 'POST' and form.is_valid():
+        user.scheduler = form.cleaned_data['scheduler']
+        user.save()
+        if form.cleaned_data['reschedule']:
+            rescheduled = reschedule_deck(user.id, get_scheduler(user.scheduler))
+
+    return render(request, 'learning/scheduler_settings.html', {
+        'form': form,
+        'current': get_scheduler(user.scheduler),
+        'saved': request.method == 'POST' and form.is_valid(),
+        'rescheduled': rescheduled,
     })
 
+
+@deck_conditional
 def word_detail_view(request, word_id):
     """Xem chi tiết một từ vựng."""
     if not request.user.is_authenticated: 
@@ -224,11 +393,31 @@ def word_edit_view(request, word_id):
             word.example_sentence = form.cleaned_data['example_sentence']
             word.notes = form.cleaned_data['notes']
             
-            # Lưu thay đổi vào MongoDB
-            word.save()
-            
-            # Chuyển hướng người dùng về trang danh sách ôn tập
-            return redirect('review_session') 
+            # Sửa thành một từ khác đã có trong bộ từ: gộp hai từ hoặc bỏ qua thay đổi
+            duplicate = find_duplicate(request.user.id, word.korean_word, exclude_id=word.id)
+            action = request.POST.get('on_duplicate')
+            if duplicate and action == MERGE:
+                # Giữ lại từ được thêm trước, gộp từ còn lại vào rồi xóa nó
+                edited = dict(word.to_mongo().to_dict(), **form.cleaned_data)
+                survivor, other = sorted([duplicate, edited], key=lambda son: (son['added_at'], son['_id']))
+                if merge_words(request.user.id, survivor, [other]):
+                    deck_stats.rebuild_deck_stats(request.user.id)
+                return redirect('word_detail', word_id=str(survivor['_id']))
+            if duplicate and action == SKIP:
+                return redirect('word_detail', word_id=str(duplicate['_id']))
+
+            if not duplicate:
+                word.rev = deck_stats.reserve_revisions(request.user.id)
+                try:
+                    # Lưu thay đổi vào MongoDB
+                    word.save()
+                except NotUniqueError:
+                    duplicate = find_duplicate(request.user.id, word.korean_word, exclude_id=word.id)
+                else:
+                    # Chuyển hướng người dùng về trang danh sách ôn tập
+                    return redirect('review_session') 
+
+            return render(request, 'learning/word_edit.html', {'word': word, 'form': form, 'duplicate': duplicate})
         
     # --- LOGIC XỬ LÝ GET REQUEST (Hiển thị form) ---
     # Khi là GET request, tạo form với dữ liệu hiện tại của word để điền vào template
@@ -257,18 +446,173 @@ def check_word_view(request, word_id, result):
         return JsonResponse({'error': 'Invalid Word ID format'}, status=400)
 
 
-    # Tìm từ vựng và đảm bảo nó thuộc về người dùng
-    word = Vocabulary.objects(user=request.user, id=object_id).first()
-    if not word:
+    # Cập nhật logic lặp lại ngắt quãng trong MỘT lệnh nguyên tử
+    # (điều kiện user + id đảm bảo từ vựng thuộc về người dùng)
+    updated = apply_review_atomic(request.user.id, object_id, is_correct, scheduler=get_scheduler(request.user.scheduler))
+    if updated is None:
         return JsonResponse({'error': 'Word not found or unauthorized'}, status=404)
+    metrics.record_reviews('check')
+    new_state = updated[1]
 
-    # Cập nhật logic lặp lại ngắt quãng
-    update_spaced_repetition(word, is_correct)
-    
     # Trả về kết quả cho frontend (thường là qua AJAX)
     return JsonResponse({
         'success': True,
-        'new_level': word.level,
-        'next_review_date': word.next_review_date.isoformat(),
-        'message': f'Cấp độ mới: {word.level}. Ôn tập lại vào ngày: {word.next_review_date.strftime("%Y-%m-%d")}'
+        'new_level': new_state['level'],
+        'next_review_date': new_state['next_review_date'].isoformat(),
+        'message': f'Cấp độ mới: {new_state["level"]}. Ôn tập lại vào ngày: {new_state["next_review_date"].strftime("%Y-%m-%d")}'
     })
+
+
+# Các giá trị `result` hợp lệ cho API batch
+REVIEW_RESULTS = {'correct': True, 'incorrect': False, 'wrong': False}
+
+def _parse_review_item(raw):
+    """
+    Kiểm tra một phần tử của batch ôn tập.
+    Trả về (item, None) nếu hợp lệ, hoặc (None, thông báo lỗi).
+    """
+    if not isinstance(raw, dict):
+        return None, 'Item must be an object'
+
+    try:
+        word_id = ObjectId(str(raw.get('word_id')))
+    except Exception:
+        return None, 'Invalid Word ID format'
+
+    result = str(raw.get('result', '')).lower()
+    if result not in REVIEW_RESULTS:
+        return None, 'Invalid result. Use correct/incorrect.'
+
+    now = datetime.now()
+    answered_at = raw.get('answered_at')
+    if answered_at:
+        answered_at = parse_datetime(str(answered_at))
+        if answered_at is None:
+            return None, 'Invalid answered_at format (ISO 8601)'
+        if answered_at.tzinfo is not None:
+            # Quy về giờ địa phương dạng naive giống datetime.now() được dùng ở các trường khác
+            answered_at = answered_at.astimezone().replace(tzinfo=None)
+        # Không chấp nhận thời điểm trong tương lai
+        answered_at = min(answered_at, now)
+    else:
+        answered_at = now
+
+    return {'word_id': word_id, 'is_correct': REVIEW_RESULTS[result], 'answered_at': answered_at}, None
+
+
+def review_batch_view(request):
+    """
+    API Endpoint nhận nhiều kết quả ôn tập trong một request.
+    Body: {"items": [{"word_id": "...", "result": "correct", "answered_at": "ISO 8601"}, ...]}
+    """
+    if not request.user.is_authenticated: return JsonResponse({'error': 'Unauthorized'}, status=401)
+
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed. Use POST.'}, status=405)
+
+    try:
+        payload = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+
+    raw_items = payload.get('items') if isinstance(payload, dict) else payload
+    if not isinstance(raw_items, list):
+        return JsonResponse({'error': 'Body must contain a list of items'}, status=400)
+    if len(raw_items) > MAX_REVIEW_BATCH_SIZE:
+        return JsonResponse({'error': f'Too many items. Maximum is {MAX_REVIEW_BATCH_SIZE}.'}, status=400)
+
+    results = _apply_review_items(request.user, raw_items, 'batch')
+    return JsonResponse({
+        'success': all(result['success'] for result in results),
+        'processed': sum(1 for result in results if result['success']),
+        'results': results,
+    })
+
+
+def _apply_review_items(user, raw_items, source):
+    """
+    Kiểm tra và áp dụng các kết quả ôn tập (1 lần đọc + 1 bulk_write); trả về kết quả theo đúng thứ tự.
+    `source` là nhãn của số đo ôn tập (batch / sync).
+    """
+    # Kiểm tra từng phần tử, giữ lại vị trí để trả kết quả đúng thứ tự
+    results = [None] * len(raw_items)
+    valid_items, valid_positions = [], []
+    for position, raw in enumerate(raw_items):
+        item, error = _parse_review_item(raw)
+        if error:
+            results[position] = {'success': False, 'error': error}
+        else:
+            valid_items.append(item)
+            valid_positions.append(position)
+
+    # Cập nhật SR cho toàn bộ batch (1 lần đọc + 1 bulk_write)
+    for position, result in zip(valid_positions, apply_review_batch(user, valid_items)):
+        results[position] = result
+
+    for position, result in enumerate(results):
+        result['index'] = position
+        if isinstance(raw_items[position], dict):
+            result['word_id'] = raw_items[position].get('word_id')
+    metrics.record_reviews(source, sum(1 for result in results if result['success']))
+    return results
+
+
+# JSON gọn (không khoảng trắng, giữ nguyên Unicode) cho API đồng bộ
+COMPACT_JSON = {'separators': (',', ':'), 'ensure_ascii': False}
+
+@gzip_page
+def sync_view(request):
+    """
+    API đồng bộ theo thay đổi cho client ngoại tuyến (xem learning/sync.py).
+    GET ?since=<revision>: các từ đã thay đổi / bị xóa sau revision đó.
+    POST {"since": <revision>, "items": [<kết quả ôn tập như API batch>, ...]}: áp dụng các lần ôn đã xếp hàng
+    khi ngoại tuyến, rồi trả về kết quả cùng các thay đổi sau `since` (gồm trạng thái SR mới của các từ vừa ôn).
+    """
+    if not request.user.is_authenticated: return JsonResponse({'error': 'Unauthorized'}, status=401)
+
+    if request.method == 'GET':
+        payload, raw_items = request.GET, []
+    elif request.method == 'POST':
+        try:
+            payload = json.loads(request.body)
+        except (ValueError, UnicodeDecodeError):
+            return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+        if not isinstance(payload, dict):
+            return JsonResponse({'error': 'Body must be an object'}, status=400)
+        raw_items = payload.get('items', [])
+        if not isinstance(raw_items, list):
+            return JsonResponse({'error': 'items must be a list'}, status=400)
+        if len(raw_items) > MAX_REVIEW_BATCH_SIZE:
+            return JsonResponse({'error': f'Too many items. Maximum is {MAX_REVIEW_BATCH_SIZE}.'}, status=400)
+    else:
+        return JsonResponse({'error': 'Method not allowed. Use GET or POST.'}, status=405)
+
+    try:
+        since = int(payload.get('since') or 0)
+    except (TypeError, ValueError):
+        return JsonResponse({'error': 'Invalid since. Use the revision returned by the previous sync.'}, status=400)
+
+    response = {}
+    if raw_items:
+        response['results'] = _apply_review_items(request.user, raw_items, 'sync')
+    response.update(changes_since(request.user.id, since))
+    return JsonResponse(response, json_dumps_params=COMPACT_JSON)
+
+
+def metrics_view(request):
+    """Số đo Prometheus, gộp trên tất cả các worker (xem learning/metrics.py)."""
+    token = settings.METRICS_TOKEN
+    if not token and not settings.DEBUG:
+        # Chưa cấu hình token ở production: không để lộ trang số đo
+        return JsonResponse({'error': 'Not found'}, status=404)
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return JsonResponse({'error': 'Unauthorized'}, status=401)
+
+    content, content_type = metrics.exposition()
+    return HttpResponse(content, content_type=content_type)
+
+
+def readiness_view(request):
+    """Health check cho load balancer: 200 nếu worker truy vấn được MongoDB, 503 nếu không."""
+    result = readiness()
+    return JsonResponse(result, status=200 if result['ready'] else 503)